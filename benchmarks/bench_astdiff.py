@@ -0,0 +1,99 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import time
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.ast import Source, Description
+from pyverilog.vparser.parser import VerilogParser
+from pyverilog.utils.astdiff import diff, SubtreeHashes
+
+from gendesign import make_design
+
+
+def best(func, repeat):
+    """ Returns the best time of repeat calls, and the last result """
+    ret = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        ret = elapsed if ret is None else min(ret, elapsed)
+    return ret, result
+
+
+def change_one_statement(text, modules):
+    """ Returns the text with one statement of a module in the middle changed """
+    start = text.index('module mod%d ' % (modules // 2))
+    pos = text.index('state <= state + ', start)
+    return text[:pos] + 'state <= state - ' + text[pos + len('state <= state + '):]
+
+
+def main():
+    INFO = "Benchmark of the structural diff of two ASTs"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_astdiff.py [-m modules] [-n repeat]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-m", "--modules", dest="modules", type="int",
+                         default=1000, help="Number of modules, Default=1000")
+    optparser.add_option("-n", "--repeat", dest="repeat", type="int",
+                         default=3, help="Repeat count, Default=3")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    text, _ = make_design(modules=options.modules, generate=16, cases=64)
+    changed = change_one_statement(text, options.modules)
+    print('%d modules, %d lines' % (options.modules, text.count('\n')))
+
+    # two independent parses of the old and the new text
+    old = VerilogParser().parse(text)
+    new = VerilogParser().parse(changed)
+    same = VerilogParser().parse(text)
+
+    # the same texts with spans
+    span_old = VerilogParser(spans=True).parse(text)
+    span_new = VerilogParser(spans=True).parse(changed)
+
+    # the unchanged modules shared, as by a ParseSession
+    changed_name = 'mod%d' % (options.modules // 2)
+    shared = Source('', Description(tuple(
+        [n if n.name == changed_name else o
+         for o, n in zip(old.description.definitions, new.description.definitions)])))
+
+    # a SubtreeHashes kept from a diff of the same trees
+    hashes = SubtreeHashes()
+    diff(old, new, hashes)
+
+    rows = [
+        ('independent, identical', lambda: diff(old, same)),
+        ('independent, 1 change', lambda: diff(old, new)),
+        ('reused hashes', lambda: diff(old, new, hashes)),
+        ('spans', lambda: diff(span_old, span_new)),
+        ('shared modules', lambda: diff(old, shared)),
+    ]
+
+    print('%-24s %10s %8s' % ('trees', 'time[s]', 'edits'))
+    for label, func in rows:
+        elapsed, edits = best(func, options.repeat)
+        print('%-24s %10.4f %8d' % (label, elapsed, len(edits)))
+
+
+if __name__ == '__main__':
+    main()
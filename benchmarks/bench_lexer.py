@@ -0,0 +1,135 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import time
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.lexer import VerilogLexer, LEXER_ENGINES
+from pyverilog.vparser.fastlexer import FastVerilogLexer
+from pyverilog.vparser.parser import VerilogParser
+
+LEXERS = {'ply': VerilogLexer, 'fast': FastVerilogLexer}
+
+CELLS = (
+    ('NAND2X1', ('A', 'B'), 'Y'),
+    ('NOR2X1', ('A', 'B'), 'Y'),
+    ('INVX1', ('A',), 'Y'),
+    ('AOI21X1', ('A0', 'A1', 'B0'), 'Y'),
+    ('DFFX1', ('D', 'CK'), 'Q'),
+)
+
+
+def make_netlist(num_cells, cells_per_module=1000):
+    """ Returns a structural (gate-level) netlist of num_cells cell instances """
+    buf = []
+    index = 0
+    module = 0
+    while index < num_cells:
+        n = min(cells_per_module, num_cells - index)
+        buf.append('module block%d (CLK, in, out);\n' % module)
+        buf.append('  input CLK;\n  input [31:0] in;\n  output [31:0] out;\n')
+        for i in range(n):
+            buf.append('  wire n%d;\n' % i)
+        for i in range(n):
+            name, inputs, output = CELLS[(index + i) % len(CELLS)]
+            ports = []
+            for j, port in enumerate(inputs):
+                if port == 'CK':
+                    ports.append('.CK(CLK)')
+                elif i < 32:
+                    ports.append(".%s(in[%d])" % (port, (i + j) % 32))
+                else:
+                    ports.append(".%s(n%d)" % (port, (i * 7 + j * 13) % i))
+            ports.append('.%s(n%d)' % (output, i))
+            buf.append('  %s U%d ( %s );\n' % (name, i, ', '.join(ports)))
+        for i in range(32):
+            buf.append("  assign out[%d] = n%d;\n" % (i, n - 1 - i % n))
+        buf.append('endmodule\n\n')
+        index += n
+        module += 1
+    return ''.join(buf)
+
+
+def lex(engine, text):
+    lexer = LEXERS[engine](error_func=lambda msg, line, column: None)
+    lexer.build()
+    lexer.input(text)
+    token = lexer.token
+    num = 0
+    while token():
+        num += 1
+    return num
+
+
+def measure(func, repeat):
+    times = []
+    ret = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ret = func()
+        times.append(time.perf_counter() - start)
+    return min(times), ret
+
+
+def main():
+    INFO = "Benchmark of the lexer engines"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_lexer.py [-c cells] [-n repeat] [file ...]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-c", "--cells", dest="cells", type="int",
+                         default=50000, help="Number of cells of the generated netlist, Default=50000")
+    optparser.add_option("-n", "--repeat", dest="repeat", type="int",
+                         default=3, help="Number of runs per engine, Default=3")
+    optparser.add_option("--noparse", action="store_true", dest="noparse",
+                         default=False, help="Measure the lexer only")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    if args:
+        text = ''.join([open(f).read() for f in args])
+    else:
+        text = make_netlist(options.cells)
+
+    mbytes = len(text.encode()) / (1024.0 * 1024.0)
+    print('%.2f MB, %d lines' % (mbytes, text.count('\n')))
+
+    print('%-8s %10s %10s %14s %10s' % ('lexer', 'tokens', 'time[s]', 'tokens/s', 'MB/s'))
+    results = {}
+    for engine in LEXER_ENGINES:
+        elapsed, num = measure(lambda: lex(engine, text), options.repeat)
+        results[engine] = elapsed
+        print('%-8s %10d %10.3f %14.0f %10.2f' %
+              (engine, num, elapsed, num / elapsed, mbytes / elapsed))
+    print('lexer speedup (ply / fast): %.2fx' % (results['ply'] / results['fast']))
+
+    if options.noparse:
+        return
+
+    print('%-8s %10s %10s' % ('parse', 'time[s]', 'MB/s'))
+    results = {}
+    for engine in LEXER_ENGINES:
+        parser = VerilogParser(lexer_engine=engine)
+        elapsed, _ = measure(lambda: parser.parse(text), options.repeat)
+        results[engine] = elapsed
+        print('%-8s %10.3f %10.2f' % (engine, elapsed, mbytes / elapsed))
+    print('parse speedup (ply / fast): %.2fx' % (results['ply'] / results['fast']))
+
+
+if __name__ == '__main__':
+    main()
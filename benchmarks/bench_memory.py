@@ -0,0 +1,145 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import shutil
+import tempfile
+import resource
+import gc
+import tracemalloc
+import pickle
+import concurrent.futures
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.source import read_source
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
+from pyverilog.vparser.parser import parse
+from pyverilog.vparser.columnar import ColumnarAST
+
+from bench_lexer import make_netlist
+
+
+def peak_rss():
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run(stage, filename):
+    base = peak_rss()
+    if stage == 'open().read()':
+        with open(filename) as f:
+            ret = f.read()
+    elif stage == 'read_source':
+        ret = read_source(filename)
+    elif stage == 'preprocess':
+        ret = VerilogPreprocessor([filename], engine='python').preprocess_text()
+    else:
+        ret = parse([filename], preprocess_engine='python', netlist=(stage == 'parse netlist'),
+                    intern=(stage == 'parse intern'))
+    return peak_rss() - base
+
+
+def node_bytes(filename, intern=False):
+    """ Returns the number of the nodes of the AST, the number of the distinct
+    instances and their total size in bytes (with their __dict__ if any) """
+    ast, _ = parse([filename], preprocess_engine='python', intern=intern)
+    nodes = 0
+    size = 0
+    visited = set()
+    stack = [ast]
+    while stack:
+        n = stack.pop()
+        nodes += 1
+        stack.extend(n.children())
+        if id(n) in visited:
+            continue
+        visited.add(id(n))
+        size += sys.getsizeof(n)
+        if hasattr(n, '__dict__'):
+            size += sys.getsizeof(n.__dict__)
+    return nodes, len(visited), size
+
+
+def retained_bytes(filename, columnar=False):
+    """ Returns the number of the nodes of the AST and the memory it holds
+    in bytes, as node objects or as a ColumnarAST """
+    ast, _ = parse([filename], preprocess_engine='python')
+    nodes = len(ColumnarAST(ast))
+    tracemalloc.start()
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    # a copy of the tree, as the parser keeps references to the original
+    ret = pickle.loads(pickle.dumps(ast, pickle.HIGHEST_PROTOCOL))
+    if columnar:
+        ret = ColumnarAST(ret)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return nodes, size
+
+
+def main():
+    INFO = "Benchmark of the peak memory of the source ingestion and the AST"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_memory.py [-c cells] [--comments]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-c", "--cells", dest="cells", type="int",
+                         default=100000, help="Number of cells of the generated netlist, Default=100000")
+    optparser.add_option("--comments", action="store_true", dest="comments",
+                         default=False, help="Put a comment at the end of every line")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    directory = tempfile.mkdtemp(prefix='pyverilog_bench_')
+    try:
+        filename = os.path.join(directory, 'netlist.v')
+        text = make_netlist(options.cells)
+        if options.comments:
+            text = text.replace(';\n', '; // comment\n')
+        with open(filename, 'w') as f:
+            f.write(text)
+        del text
+        mbytes = os.path.getsize(filename) / (1024.0 * 1024.0)
+        print('%d cells, %.2f MB' % (options.cells, mbytes))
+
+        # each stage runs in a fresh process, as the peak RSS never goes down
+        print('%-16s %14s %10s' % ('stage', 'peak RSS[MB]', 'x file'))
+        for stage in ('open().read()', 'read_source', 'preprocess', 'parse', 'parse netlist',
+                      'parse intern'):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                rss = executor.submit(run, stage, filename).result() / (1024.0 * 1024.0)
+            print('%-16s %14.1f %10.1f' % (stage, rss, rss / mbytes))
+
+        for intern in (False, True):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                nodes, distinct, size = executor.submit(node_bytes, filename, intern).result()
+            print('AST%s: %d nodes, %d instances, %.1f bytes/node' %
+                  (' (interned)' if intern else '', nodes, distinct, size / float(nodes)))
+
+        for columnar in (False, True):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                nodes, size = executor.submit(retained_bytes, filename, columnar).result()
+            print('AST %s: %.1f MB held, %.1f bytes/node' %
+                  ('columnar' if columnar else 'objects', size / (1024.0 * 1024.0),
+                   size / float(nodes)))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
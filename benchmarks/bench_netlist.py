@@ -0,0 +1,75 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import time
+import concurrent.futures
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.parser import VerilogParser
+from pyverilog.vparser.netlist import NetlistParser
+
+from bench_lexer import make_netlist
+
+
+def run(reader, text, repeat):
+    if reader == 'netlist':
+        parser = NetlistParser(VerilogParser(lexer_engine='ply'))
+    else:
+        parser = VerilogParser(lexer_engine=reader)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ast = parser.parse(text)
+        times.append(time.perf_counter() - start)
+    return min(times), len(ast.description.definitions)
+
+
+def main():
+    INFO = "Benchmark of the structural netlist reader"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_netlist.py [-c cells] [-n repeat]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-c", "--cells", dest="cells", type="int",
+                         default=100000, help="Number of cells of the generated netlist, Default=100000")
+    optparser.add_option("-n", "--repeat", dest="repeat", type="int",
+                         default=1, help="Number of runs per reader, Default=1")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    text = make_netlist(options.cells)
+    mbytes = len(text.encode()) / (1024.0 * 1024.0)
+    print('%d cells, %.2f MB, %d lines' % (options.cells, mbytes, text.count('\n')))
+
+    # each reader runs in a fresh process, so that the heap left by one
+    # reader does not slow down the next one
+    print('%-10s %10s %12s %10s' % ('reader', 'time[s]', 'cells/s', 'MB/s'))
+    results = {}
+    for reader in ('ply', 'fast', 'netlist'):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            elapsed, _ = executor.submit(run, reader, text, options.repeat).result()
+        results[reader] = elapsed
+        print('%-10s %10.3f %12.0f %10.2f' %
+              (reader, elapsed, options.cells / elapsed, mbytes / elapsed))
+
+    print('speedup (ply / netlist): %.2fx' % (results['ply'] / results['netlist']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import time
+import shutil
+import tempfile
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.parser import parse
+
+MODULE = """\
+module counter%(index)d #
+  (
+   parameter WIDTH = %(width)d
+   )
+  (
+   input CLK,
+   input RST,
+   input [WIDTH-1:0] in,
+   output reg [WIDTH-1:0] count
+   );
+
+  always @(posedge CLK) begin
+    if(RST) begin
+      count <= 0;
+    end else begin
+      count <= count + in;
+    end
+  end
+endmodule
+"""
+
+
+def make_design(directory, numfiles, modules_per_file):
+    filelist = []
+    index = 0
+    for i in range(numfiles):
+        path = os.path.join(directory, 'file%d.v' % i)
+        with open(path, 'w') as f:
+            for _ in range(modules_per_file):
+                f.write(MODULE % {'index': index, 'width': 8 + index % 24})
+                index += 1
+        filelist.append(path)
+    return filelist
+
+
+def main():
+    INFO = "Benchmark of parallel per-file parsing"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_parallel.py [-f files] [-m modules] [-j max_jobs]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-f", "--files", dest="files", type="int",
+                         default=64, help="Number of files, Default=64")
+    optparser.add_option("-m", "--modules", dest="modules", type="int",
+                         default=20, help="Number of modules per file, Default=20")
+    optparser.add_option("-j", "--jobs", dest="jobs", type="int",
+                         default=os.cpu_count(), help="Maximum number of processes")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    directory = tempfile.mkdtemp(prefix='pyverilog_bench_')
+    try:
+        filelist = make_design(directory, options.files, options.modules)
+
+        jobs_list = [None, 1]
+        j = 2
+        while j <= options.jobs:
+            jobs_list.append(j)
+            j *= 2
+
+        print('%d files, %d modules, %d cpus' %
+              (options.files, options.files * options.modules, os.cpu_count()))
+        print('%-8s %10s %12s %8s' % ('jobs', 'time[s]', 'modules/s', 'speedup'))
+        base = None
+        for jobs in jobs_list:
+            start = time.perf_counter()
+            ast, directives = parse(filelist, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            num = len(ast.description.definitions)
+            if jobs == 1:
+                base = elapsed
+            speedup = '%.2fx' % (base / elapsed) if base is not None else '-'
+            print('%-8s %10.3f %12.1f %8s' % (jobs, elapsed, num / elapsed, speedup))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+
+ROOTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCE = os.path.join(ROOTDIR, 'verilogcode', 'led.v')
+
+# Each mode builds a parser in a fresh interpreter and parses one file.
+#  rebuild : generate the LALR tables from the grammar and write them out
+#            (what every start-up paid when no table was shipped)
+#  validate: load the shipped tables after a grammar-signature check (debug=True)
+#  prebuilt: load the shipped tables as is (default)
+MODES = {
+    'rebuild': ("from pyverilog.vparser.parser import VerilogParser, write_parsetab\n"
+                "write_parsetab(%(outputdir)r)\n"
+                "parser = VerilogParser()\n"),
+    'validate': ("from pyverilog.vparser.parser import VerilogParser\n"
+                 "parser = VerilogParser(outputdir=%(outputdir)r, debug=True)\n"),
+    'prebuilt': ("from pyverilog.vparser.parser import get_default_parser\n"
+                 "parser = get_default_parser()\n"),
+}
+
+PARSE = "parser.parse(open(%(source)r).read())\n"
+
+
+def run(mode, source, repeat):
+    times = []
+    for _ in range(repeat):
+        outputdir = tempfile.mkdtemp(prefix='pyverilog_bench_')
+        code = (MODES[mode] + PARSE) % {'outputdir': outputdir, 'source': source}
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([ROOTDIR, env.get('PYTHONPATH', '')])
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', code], cwd=outputdir, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+        written = sorted(os.listdir(outputdir))
+        shutil.rmtree(outputdir)
+    return min(times), sum(times) / len(times), written
+
+
+def main():
+    INFO = "Cold-start benchmark of VerilogParser construction"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_parser_startup.py [-n repeat] [file]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-n", "--repeat", dest="repeat", type="int",
+                         default=5, help="Number of cold starts per mode, Default=5")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    source = args[0] if args else DEFAULT_SOURCE
+
+    print('%-10s %10s %10s  %s' % ('mode', 'min[s]', 'mean[s]', 'files written'))
+    results = {}
+    for mode in ('rebuild', 'validate', 'prebuilt'):
+        best, mean, written = run(mode, source, options.repeat)
+        results[mode] = mean
+        print('%-10s %10.3f %10.3f  %s' % (mode, best, mean, ' '.join(written) or '-'))
+
+    print('speedup (rebuild / prebuilt): %.1fx' % (results['rebuild'] / results['prebuilt']))
+
+
+if __name__ == '__main__':
+    main()
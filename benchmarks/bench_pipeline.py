@@ -0,0 +1,223 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import time
+import json
+import shutil
+import tempfile
+import platform
+import subprocess
+import tracemalloc
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
+from pyverilog.vparser.parser import VerilogParser
+from pyverilog.dataflow.dataflow_analyzer import VerilogDataflowAnalyzer
+from pyverilog.dataflow.modulevisitor import IterativeModuleVisitor
+from pyverilog.dataflow.signalvisitor import SignalVisitor
+from pyverilog.dataflow.bindvisitor import BindVisitor
+from pyverilog.dataflow.optimizer import VerilogDataflowOptimizer
+from pyverilog.ast_code_generator.codegen import ASTCodeGenerator
+
+from bench_lexer import lex
+from gendesign import make_design, add_options, design_params
+
+STAGES = ('preprocess', 'lex', 'parse', 'signal', 'bind', 'optimize', 'codegen')
+
+
+def count_nodes(node):
+    num = 0
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        num += 1
+        stack.extend(n.children())
+    return num
+
+
+def git_commit():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        out = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=directory,
+                                      stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.decode().strip()
+
+
+def run_pipeline(filename, top, lexer_engine, stages, trace=False):
+    """ Runs the stages in order and returns a record per stage.
+    With trace=True, the memory allocated by each stage is measured by
+    tracemalloc (which slows the stages down): the peak during the stage
+    and the memory still held at its end, on top of the memory held
+    before the stage. """
+    results = []
+    state = {}
+
+    def stage(name, func, unit):
+        if name not in stages:
+            return
+        if trace:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        items = func()
+        elapsed = time.perf_counter() - start
+        record = {'stage': name, 'time': elapsed, 'items': items, 'unit': unit,
+                  'rate': items / elapsed if elapsed > 0 else None}
+        if trace:
+            current, peak = tracemalloc.get_traced_memory()
+            record['peak_memory'] = peak - base
+            record['retained_memory'] = current - base
+        results.append(record)
+
+    def preprocess():
+        pre = VerilogPreprocessor([filename], engine='python')
+        state['text'] = pre.preprocess_text()
+        return state['text'].count('\n')
+
+    def parse():
+        state['ast'] = VerilogParser(lexer_engine=lexer_engine).parse(state['text'])
+        state['nodes'] = count_nodes(state['ast'])
+        return state['nodes']
+
+    def signal():
+        module_visitor = IterativeModuleVisitor()
+        module_visitor.visit(state['ast'])
+        state['moduleinfotable'] = module_visitor.get_moduleinfotable()
+        signal_visitor = SignalVisitor(state['moduleinfotable'], top)
+        signal_visitor.start_visit()
+        state['frametable'] = signal_visitor.getFrameTable()
+        return state['nodes']
+
+    def bind():
+        bind_visitor = BindVisitor(state['moduleinfotable'], top, state['frametable'])
+        bind_visitor.start_visit()
+        dataflow = bind_visitor.getDataflows()
+        state['terms'] = dataflow.getTerms()
+        state['binddict'] = dataflow.getBinddict()
+        return state['nodes']
+
+    def optimize():
+        optimizer = VerilogDataflowOptimizer(state['terms'], state['binddict'])
+        optimizer.resolveConstant()
+        return sum(len(binds) for binds in state['binddict'].values())
+
+    def codegen():
+        ASTCodeGenerator().visit(state['ast'])
+        return state['nodes']
+
+    # every stage needs the output of the previous ones
+    needed = set(stages)
+    needed.add('preprocess')
+    if needed & set(['signal', 'bind', 'optimize', 'codegen']):
+        needed.add('parse')
+    if needed & set(['bind', 'optimize']):
+        needed.add('signal')
+    if 'optimize' in needed:
+        needed.add('bind')
+    stages = needed
+
+    stage('preprocess', preprocess, 'lines')
+    stage('lex', lambda: lex(lexer_engine, state['text']), 'tokens')
+    stage('parse', parse, 'nodes')
+    stage('signal', signal, 'nodes')
+    stage('bind', bind, 'nodes')
+    stage('optimize', optimize, 'binds')
+    stage('codegen', codegen, 'nodes')
+    return results
+
+
+def main():
+    INFO = "Benchmark of the whole analysis pipeline on a synthetic design"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_pipeline.py [options] [-o results.json]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-o", "--output", dest="outputfile",
+                         default="pipeline.json", help="Result JSON file, Default=pipeline.json")
+    optparser.add_option("-l", "--lexer", dest="lexer_engine",
+                         default="ply", help="Lexer engine, Default=ply")
+    optparser.add_option("--no-memory", action="store_false", dest="memory",
+                         default=True, help="Skip the memory measurement run")
+    optparser.add_option("--stages", dest="stages",
+                         default=','.join(STAGES),
+                         help="Comma-separated stages, Default=%s" % ','.join(STAGES))
+    add_options(optparser)
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    stages = options.stages.split(',')
+    for s in stages:
+        if s not in STAGES:
+            raise ValueError("unknown stage: '%s'" % s)
+
+    params = design_params(options)
+    text, top = make_design(**params)
+
+    directory = tempfile.mkdtemp(prefix='pyverilog_bench_')
+    try:
+        filename = os.path.join(directory, 'design.v')
+        with open(filename, 'w') as f:
+            f.write(text)
+        design = {'lines': text.count('\n'), 'bytes': len(text.encode())}
+        del text
+
+        # the times of an untraced run, then the memory of a traced run
+        results = run_pipeline(filename, top, options.lexer_engine, stages)
+        if options.memory:
+            tracemalloc.start()
+            try:
+                traced = run_pipeline(filename, top, options.lexer_engine, stages,
+                                      trace=True)
+            finally:
+                tracemalloc.stop()
+            for r, t in zip(results, traced):
+                r['peak_memory'] = t['peak_memory']
+                r['retained_memory'] = t['retained_memory']
+    finally:
+        shutil.rmtree(directory)
+
+    print('%d lines, %d bytes' % (design['lines'], design['bytes']))
+    # peak and retained: the memory allocated by the stage itself
+    print('%-12s %10s %12s %14s %12s %14s' %
+          ('stage', 'time[s]', 'peak[MB]', 'retained[MB]', 'items', 'items/s'))
+    mb = 1024.0 * 1024.0
+    for r in results:
+        memory = ('%12.1f %14.1f' % (r['peak_memory'] / mb, r['retained_memory'] / mb)
+                  if 'peak_memory' in r else '%12s %14s' % ('-', '-'))
+        print('%-12s %10.3f %s %12d %14.0f %s' %
+              (r['stage'], r['time'], memory, r['items'], r['rate'] or 0, r['unit']))
+
+    record = {
+        'pyverilog': VERSION,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'lexer': options.lexer_engine,
+        'params': params,
+        'design': design,
+        'stages': results,
+    }
+    with open(options.outputfile, 'w') as f:
+        json.dump(record, f, indent=2)
+        f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
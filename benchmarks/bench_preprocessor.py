@@ -0,0 +1,82 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import glob
+import time
+import shutil
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.preprocessor import VerilogPreprocessor, get_iverilog
+
+ROOTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CODEDIR = os.path.join(ROOTDIR, 'verilogcode')
+
+
+def run(engine, filelist, include, define, repeat):
+    times = []
+    nbytes = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        nbytes = 0
+        for f in filelist:
+            pre = VerilogPreprocessor([f], include=include, define=define, engine=engine)
+            nbytes += len(pre.preprocess_text())
+        times.append(time.perf_counter() - start)
+    return min(times), sum(times) / len(times), nbytes
+
+
+def main():
+    INFO = "Benchmark of the preprocessor engines"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_preprocessor.py [-n repeat] [file ...]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-n", "--repeat", dest="repeat", type="int",
+                         default=5, help="Number of runs per engine, Default=5")
+    optparser.add_option("-I", "--include", dest="include", action="append",
+                         default=[], help="Include path")
+    optparser.add_option("-D", dest="define", action="append",
+                         default=[], help="Macro Definition")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    if args:
+        filelist = args
+    else:
+        filelist = sorted(glob.glob(os.path.join(DEFAULT_CODEDIR, '*.v')))
+        options.include.append(DEFAULT_CODEDIR)
+        options.define.append('STEP=100')
+
+    print('%d files' % len(filelist))
+    print('%-10s %10s %10s %12s' % ('engine', 'min[s]', 'mean[s]', 'files/s'))
+    results = {}
+    for engine in ('iverilog', 'python'):
+        if engine == 'iverilog' and shutil.which(get_iverilog()) is None:
+            print('%-10s %s' % (engine, 'not installed'))
+            continue
+        best, mean, nbytes = run(engine, filelist, options.include, options.define,
+                                 options.repeat)
+        results[engine] = mean
+        print('%-10s %10.4f %10.4f %12.1f' % (engine, best, mean, len(filelist) / mean))
+
+    if len(results) == 2:
+        print('speedup (iverilog / python): %.1fx' % (results['iverilog'] / results['python']))
+
+
+if __name__ == '__main__':
+    main()
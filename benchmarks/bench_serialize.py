@@ -0,0 +1,82 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import io
+import time
+import pickle
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.parser import VerilogParser
+from pyverilog.vparser import serialize
+
+from gendesign import make_design
+
+
+def best(func, repeat):
+    """ Returns the best time of repeat calls """
+    ret = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        ret = elapsed if ret is None else min(ret, elapsed)
+    return ret
+
+
+def main():
+    INFO = "Benchmark of the binary AST format against pickle"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_serialize.py [-m modules] [-n repeat]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-m", "--modules", dest="modules", type="int",
+                         default=64, help="Number of modules, Default=64")
+    optparser.add_option("-n", "--repeat", dest="repeat", type="int",
+                         default=5, help="Repeat count, Default=5")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    text, _ = make_design(modules=options.modules, generate=16, cases=32)
+    ast = VerilogParser().parse(text)
+    name = ast.description.definitions[-1].name
+
+    pickled = pickle.dumps(ast, pickle.HIGHEST_PROTOCOL)
+    binary = serialize.dumps(ast)
+    binary_noline = serialize.dumps(ast, lineno=False)
+
+    rows = [
+        ('pickle', len(pickled),
+         best(lambda: pickle.dumps(ast, pickle.HIGHEST_PROTOCOL), options.repeat),
+         best(lambda: pickle.loads(pickled), options.repeat)),
+        ('binary', len(binary),
+         best(lambda: serialize.dumps(ast), options.repeat),
+         best(lambda: serialize.loads(binary), options.repeat)),
+        ('no lineno', len(binary_noline),
+         best(lambda: serialize.dumps(ast, lineno=False), options.repeat),
+         best(lambda: serialize.loads(binary_noline), options.repeat)),
+        ('1 module', len(binary), None,
+         best(lambda: serialize.loads(binary, name), options.repeat)),
+    ]
+
+    print('%-10s %10s %10s %10s' % ('format', 'bytes', 'dump[s]', 'load[s]'))
+    for fmt, size, dump, load in rows:
+        print('%-10s %10d %10s %10.4f' % (fmt, size, '-' if dump is None else '%.4f' % dump, load))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import io
+import time
+import concurrent.futures
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+from pyverilog.vparser.ast import Identifier, IntConst, Plus
+from pyverilog.vparser.parser import VerilogParser
+from pyverilog.dataflow.visit import NodeVisitor, IterativeVisitor, FusedVisitor
+from pyverilog.utils.identifiervisitor import IterativeIdentifierVisitor
+
+from gendesign import make_design
+
+
+class RecursiveCounter(NodeVisitor):
+    def __init__(self):
+        self.identifiers = 0
+
+    def visit_Identifier(self, node):
+        self.identifiers += 1
+
+
+class GetattrCounter(RecursiveCounter):
+    # building the method name on every node
+    def visit(self, node):
+        method = 'visit_' + node.__class__.__name__
+        visitor = getattr(self, method, self.generic_visit)
+        return visitor(node)
+
+
+class IterativeCounter(IterativeVisitor):
+    def __init__(self):
+        self.identifiers = 0
+
+    def visit_Identifier(self, node):
+        self.identifiers += 1
+
+
+VISITORS = {
+    'getattr': GetattrCounter,
+    'recursive': RecursiveCounter,
+    'iterative': IterativeCounter,
+}
+
+
+def make_chain(depth):
+    """ Returns an expression tree of depth levels: ((a + 1) + 1) + ... """
+    node = Identifier('a')
+    for _ in range(depth):
+        node = Plus(node, IntConst('1'))
+    return node
+
+
+def make_tree(kind, depth):
+    if kind == 'deep':
+        return make_chain(depth)
+    text, _ = make_design(modules=64, generate=16, cases=32)
+    return VerilogParser().parse(text)
+
+
+def run(kind, depth, visitor, repeat):
+    """ Returns the best time of repeat walks, or the error """
+    tree = make_tree(kind, depth)
+    if visitor == 'recursive':
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * depth))
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            if visitor == 'show':
+                tree.show(buf=io.StringIO())
+            elif visitor == 'two walks':
+                IterativeCounter().visit(tree)
+                IterativeIdentifierVisitor().visit(tree)
+            elif visitor == 'fused':
+                FusedVisitor([IterativeCounter(), IterativeIdentifierVisitor()]).visit(tree)
+            else:
+                VISITORS[visitor]().visit(tree)
+        except RecursionError:
+            return 'RecursionError'
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    INFO = "Benchmark of the recursive and iterative AST visitors"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python bench_visitor.py [-d depth] [-n repeat]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-d", "--depth", dest="depth", type="int",
+                         default=100000, help="Depth of the deep tree, Default=100000")
+    optparser.add_option("-n", "--repeat", dest="repeat", type="int",
+                         default=5, help="Repeat count, Default=5")
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    print('%-8s %-10s %14s' % ('tree', 'visitor', 'time[s]'))
+    for kind in ('wide', 'deep'):
+        if kind == 'wide':
+            visitors = ('getattr', 'recursive', 'iterative', 'show', 'two walks', 'fused')
+        else:
+            # the text of show() grows with the square of the depth
+            visitors = ('recursive', 'iterative')
+        for visitor in visitors:
+            # each run in a fresh process, as a deep recursion may crash it
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                try:
+                    ret = executor.submit(run, kind, options.depth, visitor,
+                                          options.repeat).result()
+                except concurrent.futures.process.BrokenProcessPool:
+                    ret = 'crashed'
+            if isinstance(ret, float):
+                ret = '%.4f' % ret
+            print('%-8s %-10s %14s' % (kind, visitor, ret))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import random
+from optparse import OptionParser
+
+# the next line can be removed after installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyverilog
+
+# standard cells of the netlist part: (name, inputs, output, function)
+CELLS = (
+    ('NAND2X1', ('A', 'B'), 'Y', '~(A & B)'),
+    ('NOR2X1', ('A', 'B'), 'Y', '~(A | B)'),
+    ('INVX1', ('A',), 'Y', '~A'),
+    ('AOI21X1', ('A0', 'A1', 'B0'), 'Y', '~((A0 & A1) | B0)'),
+    ('XOR2X1', ('A', 'B'), 'Y', 'A ^ B'),
+)
+
+OPERATORS = ('+', '-', '^', '&', '|')
+
+FANOUT = 2
+
+
+def make_design(modules=8, depth=3, generate=8, width=16, cases=8, cells=0, seed=0):
+    """ Returns (text, topmodule) of a synthetic design.
+    modules: number of module definitions (other than the top and the cells)
+    depth: levels of the module hierarchy below the top
+    generate: trip count of the generate loop of every module
+    width: bus width of the ports and registers
+    cases: number of items of the case statement of every module
+    cells: number of standard cell instances in a netlist module
+    The same arguments always give the same text. """
+
+    rand = random.Random(seed)
+    depth = max(1, min(depth, modules))
+    levels = [[] for _ in range(depth)]
+    for i in range(modules):
+        levels[i * depth // modules].append('mod%d' % i)
+
+    buf = []
+    for level, names in enumerate(levels):
+        children = levels[level + 1] if level + 1 < depth else []
+        for name in names:
+            subs = [children[rand.randrange(len(children))]
+                    for _ in range(FANOUT)] if children else []
+            buf.append(_module(name, subs, generate, width, cases, rand))
+
+    top_children = list(levels[0])
+    if cells > 0:
+        buf.append(_netlist('netlist', cells, width, rand))
+        buf.extend(_cell(*cell) for cell in CELLS)
+        top_children.append('netlist')
+    buf.append(_top('top', top_children, width))
+    return ''.join(buf), 'top'
+
+
+def _ports(width):
+    return ('  input CLK;\n  input RST;\n'
+            '  input [%d:0] in;\n  output [%d:0] out;\n' % (width - 1, width - 1))
+
+
+def _module(name, subs, generate, width, cases, rand):
+    w = width - 1
+    buf = []
+    buf.append('module %s (CLK, RST, in, out);\n' % name)
+    buf.append(_ports(width))
+    buf.append('  reg [%d:0] state;\n  reg [%d:0] acc;\n' % (w, w))
+
+    if generate > 0:
+        buf.append('  wire [%d:0] t;\n' % (generate - 1))
+        buf.append('  genvar i;\n  generate for (i = 0; i < %d; i = i + 1) begin: g\n' % generate)
+        buf.append('    assign t[i] = ^(in & (state >> i));\n')
+        buf.append('  end\n  endgenerate\n')
+
+    buf.append('  always @(posedge CLK) begin\n')
+    buf.append('    if (RST) begin\n      state <= 0;\n    end else begin\n')
+    buf.append('      state <= state + %d;\n    end\n  end\n' % rand.randrange(1, 16))
+
+    if cases > 0:
+        bits = max(1, (cases - 1).bit_length())
+        buf.append('  always @(posedge CLK) begin\n')
+        buf.append('    case (state[%d:0])\n' % (min(bits, width) - 1))
+        for c in range(cases):
+            op = OPERATORS[rand.randrange(len(OPERATORS))]
+            buf.append("      %d: acc <= acc %s (in >> %d);\n" % (c, op, c % width))
+        buf.append('      default: acc <= 0;\n    endcase\n  end\n')
+
+    terms = ['acc']
+    for j, sub in enumerate(subs):
+        buf.append('  wire [%d:0] w%d;\n' % (w, j))
+        buf.append('  %s u%d (.CLK(CLK), .RST(RST), .in(acc ^ in), .out(w%d));\n' % (sub, j, j))
+        terms.append('w%d' % j)
+    if generate > 0:
+        terms.append('{%d{^t}}' % width)
+    buf.append('  assign out = %s;\n' % ' ^ '.join(terms))
+    buf.append('endmodule\n\n')
+    return ''.join(buf)
+
+
+def _netlist(name, cells, width, rand):
+    w = width - 1
+    buf = []
+    buf.append('module %s (CLK, RST, in, out);\n' % name)
+    buf.append(_ports(width))
+    buf.append('  wire [%d:0] n;\n' % (cells - 1))
+    for i in range(cells):
+        cell, inputs, output, _ = CELLS[rand.randrange(len(CELLS))]
+        ports = []
+        for port in inputs:
+            if i < width or rand.randrange(8) == 0:
+                ports.append('.%s(in[%d])' % (port, rand.randrange(width)))
+            else:
+                ports.append('.%s(n[%d])' % (port, rand.randrange(i)))
+        ports.append('.%s(n[%d])' % (output, i))
+        buf.append('  %s U%d (%s);\n' % (cell, i, ', '.join(ports)))
+    for i in range(width):
+        buf.append('  assign out[%d] = n[%d];\n' % (i, cells - 1 - i % cells))
+    buf.append('endmodule\n\n')
+    return ''.join(buf)
+
+
+def _cell(name, inputs, output, function):
+    buf = []
+    buf.append('module %s (%s, %s);\n' % (name, ', '.join(inputs), output))
+    for port in inputs:
+        buf.append('  input %s;\n' % port)
+    buf.append('  output %s;\n' % output)
+    buf.append('  assign %s = %s;\n' % (output, function))
+    buf.append('endmodule\n\n')
+    return ''.join(buf)
+
+
+def _top(name, children, width):
+    w = width - 1
+    buf = []
+    buf.append('module %s (CLK, RST, in, out);\n' % name)
+    buf.append(_ports(width))
+    terms = []
+    for j, child in enumerate(children):
+        buf.append('  wire [%d:0] o%d;\n' % (w, j))
+        buf.append('  %s c%d (.CLK(CLK), .RST(RST), .in(in), .out(o%d));\n' % (child, j, j))
+        terms.append('o%d' % j)
+    buf.append('  assign out = %s;\n' % (' ^ '.join(terms) if terms else 'in'))
+    buf.append('endmodule\n')
+    return ''.join(buf)
+
+
+def add_options(optparser):
+    optparser.add_option("-m", "--modules", dest="modules", type="int",
+                         default=8, help="Number of modules, Default=8")
+    optparser.add_option("-d", "--depth", dest="depth", type="int",
+                         default=3, help="Depth of the module hierarchy, Default=3")
+    optparser.add_option("-g", "--generate", dest="generate", type="int",
+                         default=8, help="Trip count of the generate loops, Default=8")
+    optparser.add_option("-w", "--width", dest="width", type="int",
+                         default=16, help="Bus width, Default=16")
+    optparser.add_option("-c", "--cases", dest="cases", type="int",
+                         default=8, help="Number of case items, Default=8")
+    optparser.add_option("-n", "--cells", dest="cells", type="int",
+                         default=0, help="Number of netlist cell instances, Default=0")
+    optparser.add_option("-s", "--seed", dest="seed", type="int",
+                         default=0, help="Random seed, Default=0")
+
+
+def design_params(options):
+    return dict(modules=options.modules, depth=options.depth, generate=options.generate,
+                width=options.width, cases=options.cases, cells=options.cells,
+                seed=options.seed)
+
+
+def main():
+    INFO = "Synthetic Verilog design generator"
+    VERSION = pyverilog.__version__
+    USAGE = "Usage: python gendesign.py [options] [-o file]"
+
+    def showVersion():
+        print(INFO)
+        print(VERSION)
+        print(USAGE)
+        sys.exit()
+
+    optparser = OptionParser()
+    optparser.add_option("-v", "--version", action="store_true", dest="showversion",
+                         default=False, help="Show the version")
+    optparser.add_option("-o", "--output", dest="outputfile",
+                         default="design.v", help="Output File name, Default=design.v")
+    add_options(optparser)
+    (options, args) = optparser.parse_args()
+
+    if options.showversion:
+        showVersion()
+
+    text, top = make_design(**design_params(options))
+    with open(options.outputfile, 'w') as f:
+        f.write(text)
+    print('%s: top module %s, %d lines' % (options.outputfile, top, text.count('\n')))
+
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,8 @@ def main():
                          default=[], help="Include path")
     optparser.add_option("-D", dest="define", action="append",
                          default=[], help="Macro Definition")
+    optparser.add_option("-E", "--engine", dest="engine",
+                         default=None, help="Preprocessor engine (iverilog or python)")
     (options, args) = optparser.parse_args()
 
     filelist = args
@@ -42,7 +44,8 @@ def main():
     if len(filelist) == 0:
         showVersion()
 
-    text = preprocess(filelist, include=options.include, define=options.define)
+    text = preprocess(filelist, include=options.include, define=options.define,
+                      engine=options.engine)
 
     print(text)
 
@@ -29,6 +29,7 @@ from jinja2 import Environment, FileSystemLoader
 from pyverilog.vparser.ast import *
 from pyverilog.utils.op2mark import op2mark
 from pyverilog.utils.op2mark import op2order
+from pyverilog.utils.dispatch import visit_names
 
 DEFAULT_TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__)) + '/template/'
 
@@ -68,9 +69,10 @@ def indent_multiline_assign(text):
 
 class ConvertVisitor(object):
     def visit(self, node):
-        method = 'visit_' + node.__class__.__name__
-        visitor = getattr(self, method, self.generic_visit)
-        return visitor(node)
+        func = getattr(self, visit_names[node.__class__], None)
+        if func is None:
+            return self.generic_visit(node)
+        return func(node)
 
     def generic_visit(self, node):
         ret = []
@@ -131,6 +133,13 @@ class ASTCodeGenerator(ConvertVisitor):
         rslt = template.render(template_dict)
         return rslt
 
+    def visit_stream(self, nodes):
+        """ Generates the code of the definitions of an iterable one by one,
+        such as the ModuleStream of iter_modules().
+        The concatenation is the same as the code of the whole Description. """
+        for node in nodes:
+            yield self.visit(Description(definitions=(node,)))
+
     def visit_ModuleDef(self, node):
         filename = getfilename(node)
         template = self.get_template(filename)
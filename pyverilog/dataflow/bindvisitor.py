@@ -49,6 +49,17 @@ class BindVisitor(NodeVisitor):
         self.renamecnt = 0
         self.default_nettype = 'wire'
 
+        # the line of the innermost node being visited, for the new binds
+        self.lineno = None
+
+    def visit(self, node):
+        lineno = self.lineno
+        if getattr(node, 'lineno', None):
+            self.lineno = node.lineno
+        ret = NodeVisitor.visit(self, node)
+        self.lineno = lineno
+        return ret
+
     def getDataflows(self):
         return self.dataflow
 
@@ -1420,7 +1431,7 @@ class BindVisitor(NodeVisitor):
         tree = raw_tree
         if len(dst) > 1:
             tree = reorder.reorder(DFPartselect(raw_tree, part_msb, part_lsb))
-        bind = Bind(tree, name, msb, lsb, ptr, alwaysinfo)
+        bind = Bind(tree, name, msb, lsb, ptr, alwaysinfo, lineno=self.lineno)
         self.frames.addNonblockingAssign(name, bind)
 
     def getRenamedDst(self, dst):
@@ -1446,7 +1457,7 @@ class BindVisitor(NodeVisitor):
             if len(renamed_dst) > 1:
                 tree = reorder.reorder(
                     DFPartselect(tree, part_msb, part_lsb))
-            bind = Bind(tree, name, msb, lsb, ptr)
+            bind = Bind(tree, name, msb, lsb, ptr, lineno=self.lineno)
             self.dataflow.addBind(name, bind)
 
             value = self.optimize(tree)
@@ -1513,7 +1524,7 @@ class BindVisitor(NodeVisitor):
             tree = reorder.reorder(
                 DFPartselect(tree, part_msb, part_lsb))
 
-        return Bind(tree, name, msb, lsb, ptr, alwaysinfo, bindtype)
+        return Bind(tree, name, msb, lsb, ptr, alwaysinfo, bindtype, lineno=self.lineno)
 
     def diffBranchTree(self, tree, condlist, flowlist, matchflowlist=()):
         if len(condlist) == 0:
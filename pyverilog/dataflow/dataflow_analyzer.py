@@ -12,7 +12,7 @@ import sys
 import os
 
 from pyverilog.vparser.parser import VerilogCodeParser
-from pyverilog.dataflow.modulevisitor import ModuleVisitor
+from pyverilog.dataflow.modulevisitor import IterativeModuleVisitor
 from pyverilog.dataflow.signalvisitor import SignalVisitor
 from pyverilog.dataflow.bindvisitor import BindVisitor
 
@@ -23,7 +23,8 @@ sys.setrecursionlimit(16 * 1024)
 class VerilogDataflowAnalyzer(VerilogCodeParser):
     def __init__(self, filelist, topmodule='TOP', noreorder=False, nobind=False,
                  preprocess_include=None,
-                 preprocess_define=None):
+                 preprocess_define=None,
+                 preprocess_engine=None):
         self.topmodule = topmodule
         self.terms = {}
         self.binddict = {}
@@ -32,14 +33,15 @@ class VerilogDataflowAnalyzer(VerilogCodeParser):
             filelist, list) else [filelist]
         VerilogCodeParser.__init__(self, files,
                                    preprocess_include=preprocess_include,
-                                   preprocess_define=preprocess_define)
+                                   preprocess_define=preprocess_define,
+                                   preprocess_engine=preprocess_engine)
         self.noreorder = noreorder
         self.nobind = nobind
 
     def generate(self):
         ast = self.parse()
 
-        module_visitor = ModuleVisitor()
+        module_visitor = IterativeModuleVisitor()
         module_visitor.visit(ast)
         modulenames = module_visitor.get_modulenames()
         moduleinfotable = module_visitor.get_moduleinfotable()
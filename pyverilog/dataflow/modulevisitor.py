@@ -71,3 +71,8 @@ class ModuleVisitor(NodeVisitor):
 
     def get_moduleinfotable(self):
         return self.moduleinfotable
+
+
+class IterativeModuleVisitor(IterativeVisitor, ModuleVisitor):
+    """ ModuleVisitor walking with an explicit stack (see IterativeVisitor) """
+    pass
@@ -18,6 +18,7 @@ import pyverilog
 import pyverilog.utils.util as util
 import pyverilog.utils.verror as verror
 from pyverilog.utils.scope import ScopeLabel, ScopeChain
+from pyverilog.utils.dispatch import visit_names, leave_names
 from pyverilog.vparser.ast import *
 
 
@@ -43,14 +44,162 @@ primitives = {
 # Base Visitor
 class NodeVisitor(object):
     def visit(self, node):
-        method = 'visit_' + node.__class__.__name__
-        visitor = getattr(self, method, self.generic_visit)
-        return visitor(node)
+        func = getattr(self, visit_names[node.__class__], None)
+        if func is None:
+            return self.generic_visit(node)
+        return func(node)
 
     def generic_visit(self, node):
         for c in node.children():
             self.visit(c)
 
+    def visit_stream(self, nodes):
+        """ Visits every node of an iterable, such as the ModuleStream of iter_modules() """
+        for node in nodes:
+            self.visit(node)
+
+
+class IterativeVisitor(NodeVisitor):
+    """ NodeVisitor walking a tree with an explicit stack instead of the
+    recursion, so that the depth of the tree is not limited.
+    visit_<Class>(node) is called before the children of a node, and
+    leave_<Class>(node), if defined, after all of them.
+    generic_visit(node) schedules the children, to be visited after the
+    current method returns: a visit_<Class> method without it skips them.
+    A visit() call within a method walks its subtree at once. """
+
+    _stack = None
+
+    def visit(self, node):
+        outer = self._stack
+        self._stack = stack = [node]
+        ret = None
+        try:
+            while stack:
+                n = stack.pop()
+                cls = n.__class__
+                if cls is tuple:
+                    leave, n = n
+                    leave(n)
+                    continue
+                leave = getattr(self, leave_names[cls], None)
+                if leave is not None:
+                    stack.append((leave, n))
+                func = getattr(self, visit_names[cls], None)
+                if func is None:
+                    r = self.generic_visit(n)
+                else:
+                    r = func(n)
+                if n is node:
+                    ret = r
+        finally:
+            self._stack = outer
+        return ret
+
+    def generic_visit(self, node):
+        stack = self._stack
+        if stack is None:
+            # called out of visit()
+            for c in node.children():
+                self.visit(c)
+            return
+        stack.extend(reversed(node.children()))
+
+
+def _walks(visitor, name, generic):
+    """ Whether a visitor just walks the children of the nodes of a method name """
+    if getattr(visitor, name, None) is not None:
+        return False
+    return getattr(visitor.generic_visit, '__func__', None) is generic
+
+
+class FusedVisitor(object):
+    """ Runs several IterativeVisitors in a single walk of a tree.
+    Each visitor sees the same calls as in its own walk: a node is visited
+    by the visitors that scheduled it, and its subtree is walked once if
+    any of them did. """
+
+    def __init__(self, visitors):
+        self.visitors = tuple(visitors)
+
+    def visit(self, node):
+        generic = IterativeVisitor.generic_visit
+        everyone = self.visitors
+        # node classes on which all the visitors just walk the children
+        passing = set()
+        stack = [(node, everyone)]
+        outers = [v._stack for v in everyone]
+        try:
+            while stack:
+                n, visitors = stack.pop()
+                if visitors.__class__ is list:
+                    # (node, [leave]) after the subtree
+                    visitors[0](n)
+                    continue
+                cls = n.__class__
+
+                if visitors is everyone and cls in passing:
+                    stack.extend([(c, visitors) for c in reversed(n.children())])
+                    continue
+                visit_name = visit_names[cls]
+                leave_name = leave_names[cls]
+                if visitors is everyone and all(
+                        [_walks(v, visit_name, generic) and
+                         getattr(v, leave_name, None) is None for v in visitors]):
+                    passing.add(cls)
+                    stack.extend([(c, visitors) for c in reversed(n.children())])
+                    continue
+
+                for v in reversed(visitors):
+                    leave = getattr(v, leave_name, None)
+                    if leave is not None:
+                        stack.append((n, [leave]))
+
+                # the visitors walking the children, and the others with
+                # the nodes they scheduled
+                descend = []
+                others = []
+                for v in visitors:
+                    if _walks(v, visit_name, generic):
+                        descend.append(v)
+                        continue
+                    v._stack = captured = []
+                    func = getattr(v, visit_name, None)
+                    if func is None:
+                        v.generic_visit(n)
+                    else:
+                        func(n)
+                    v._stack = None
+                    if captured:
+                        others.append((v, captured))
+
+                if not descend and not others:
+                    continue
+                # in the order of the stack
+                children = list(reversed(n.children()))
+                for v, captured in others:
+                    if (len(captured) == len(children) and
+                            all([a is b for a, b in zip(captured, children)])):
+                        descend.append(v)
+                    else:
+                        owners = (v,)
+                        stack.extend([(c, owners) for c in captured])
+
+                if descend:
+                    if len(descend) == len(visitors):
+                        owners = visitors
+                    else:
+                        ids = set([id(v) for v in descend])
+                        owners = tuple([v for v in visitors if id(v) in ids])
+                    stack.extend([(c, owners) for c in children])
+        finally:
+            for v, outer in zip(self.visitors, outers):
+                v._stack = outer
+
+    def visit_stream(self, nodes):
+        for node in nodes:
+            self.visit(node)
+
 
 # Signal/Object Management Classes
 class AlwaysInfo(object):
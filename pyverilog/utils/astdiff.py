@@ -0,0 +1,391 @@
+# -------------------------------------------------------------------------------
+# astdiff.py
+#
+# Structural diff of two ASTs
+#
+# diff(old, new) returns the edit script (insert, delete, replace and move)
+# turning the definitions of old into those of new, and the items of the
+# modules of the same name: Always, Assign, Instance (an InstanceList is
+# split into its instances), and the other items such as Decl.
+# The line numbers are ignored.
+#
+# Two items are the same if they are the same object (as the unchanged
+# modules of a ParseSession), if their source texts are equal (with
+# spans=True), or else if they are structurally equal. Only the items
+# left unmatched between the common head and tail of a sequence are
+# hashed, to pair the moved ones. The hash of every inner node of a walked
+# subtree and the pairs found equal are cached in a SubtreeHashes, so that
+# a subtree shared by several trees (a ParseSession, rewriteIdentifiers)
+# is walked once, and it can be reused for the next diff of the same
+# trees. The hashes are the ones of Node.__hash__: the hash cached on an
+# interned node is used as is.
+#
+# Without spans, shared subtrees or a reused SubtreeHashes, the diff of two
+# independently parsed trees compares every node once: about 1 second for
+# 100k lines (benchmarks/bench_astdiff.py).
+#
+# Copyright (C) 2013, Shinya Takamaeda-Yamazaki and Contributors
+# License: Apache 2.0
+# -------------------------------------------------------------------------------
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import collections
+from bisect import bisect_left
+
+import pyverilog.vparser.ast as vast
+
+
+class Edit(object):
+    """ op is 'insert', 'delete', 'replace' or 'move'. module is the name of
+    the module of the item, or None for a definition. old and new are the
+    nodes in the old and the new AST (old is None for an insert, and new is
+    None for a delete). """
+
+    def __init__(self, op, module, old, new):
+        self.op = op
+        self.module = module
+        self.old = old
+        self.new = new
+
+    def node(self):
+        return self.new if self.new is not None else self.old
+
+    def __repr__(self):
+        node = self.node()
+        ret = [self.op, node.__class__.__name__]
+        name = getattr(node, 'name', None)
+        if name:
+            ret.append("'%s'" % name)
+        if self.module is not None:
+            ret.append("in '%s'" % self.module)
+        lines = []
+        if self.old is not None:
+            lines.append('line %s' % self.old.lineno)
+        if self.new is not None:
+            lines.append('line %s' % self.new.lineno)
+        ret.append('(%s)' % ' -> '.join(lines))
+        return ' '.join(ret)
+
+
+class SubtreeHashes(object):
+    """ Structural hashes of the subtrees, without the line numbers, by
+    id(node), and the pairs of them found equal. The hashed nodes are kept,
+    so that their ids stay valid. """
+
+    def __init__(self):
+        # id(node) -> hash
+        self.table = {}
+        self.nodes = []
+        # (id(node), id(node))
+        self.equal_pairs = set()
+
+    def __len__(self):
+        return len(self.table)
+
+    def clear(self):
+        self.table = {}
+        self.nodes = []
+        self.equal_pairs = set()
+
+    def equal(self, old, new):
+        """ equal(old, new), remembered for the next diff of the same trees """
+        key = (id(old), id(new))
+        if key in self.equal_pairs:
+            return True
+        if not equal(old, new):
+            return False
+        self.equal_pairs.add(key)
+        if key[0] not in self.table:
+            self.nodes.append(old)
+        if key[1] not in self.table:
+            self.nodes.append(new)
+        return True
+
+    def get(self, node):
+        h = self.table.get(id(node))
+        if h is not None:
+            return h
+        try:
+            return self._recursive(node)
+        except RecursionError:
+            return self._iterative(node)
+
+    def _recursive(self, root):
+        # about twice as fast as the explicit stack
+        table = self.table
+        lookup = table.get
+        keep = self.nodes.append
+
+        def walk(node):
+            children = node.children()
+            names = node.attr_names
+            if not children:
+                # a leaf is hashed again rather than kept
+                return hash((hash(tuple([getattr(node, a) for a in names])) if names else _EMPTY,
+                             _EMPTY))
+            h = lookup(id(node))
+            if h is None:
+                h = getattr(node, '_hash', None)
+                if h is None:
+                    h = hash((hash(tuple([getattr(node, a) for a in names])) if names else _EMPTY,
+                              hash(tuple([walk(c) for c in children]))))
+                table[id(node)] = h
+                keep(node)
+            return h
+        return walk(root)
+
+    def _iterative(self, root):
+        # a deeper subtree than the recursion limit
+        table = self.table
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in table:
+                continue
+            h = getattr(node, '_hash', None)
+            if h is None:
+                children = node.children()
+                if not ready:
+                    stack.append((node, True))
+                    stack.extend([(c, False) for c in children])
+                    continue
+                h = hash((hash(tuple([getattr(node, a) for a in node.attr_names])),
+                          hash(tuple([table[id(c)] for c in children]))))
+            table[id(node)] = h
+            self.nodes.append(node)
+        return table[id(root)]
+
+
+_EMPTY = hash(())
+
+
+def subtree_hash(node):
+    """ Returns the structural hash of a subtree, as hash(node) """
+    return SubtreeHashes().get(node)
+
+
+def equal(old, new):
+    """ Returns whether two subtrees are structurally equal, without the
+    line numbers """
+    if (isinstance(old, vast.ModuleDef) and isinstance(new, vast.ModuleDef) and
+            old.default_nettype != new.default_nettype):
+        return False
+    stack = [(old, new)]
+    pop = stack.pop
+    while stack:
+        a, b = pop()
+        if a is b:
+            continue
+        cls = a.__class__
+        if cls is not b.__class__:
+            return False
+        for n in cls.attr_names:
+            if getattr(a, n) != getattr(b, n):
+                return False
+        ca = a.children()
+        cb = b.children()
+        if len(ca) != len(cb):
+            return False
+        stack.extend(zip(ca, cb))
+    return True
+
+
+def module_items(moduledef):
+    """ Returns the items of a module, with the instances of an InstanceList """
+    ret = []
+    for item in moduledef.items or ():
+        if isinstance(item, vast.InstanceList):
+            ret.extend(item.instances)
+        else:
+            ret.append(item)
+    return ret
+
+
+def diff(old, new, hashes=None):
+    """ Returns the list of the Edits from a Source (or a ModuleDef) to another """
+    return ASTDiff(hashes).diff(old, new)
+
+
+class ASTDiff(object):
+    def __init__(self, hashes=None):
+        self.hashes = hashes if hashes is not None else SubtreeHashes()
+
+    def diff(self, old, new):
+        edits = []
+        if isinstance(old, vast.ModuleDef) and isinstance(new, vast.ModuleDef):
+            self._diff_module(old, new, edits)
+        else:
+            self._diff_sequence(old.description.definitions, new.description.definitions,
+                                None, edits)
+        return edits
+
+    def same(self, old, new):
+        if old is new:
+            return True
+        if old.__class__ is not new.__class__:
+            return False
+        if old.__class__ is vast.ModuleDef and old.default_nettype != new.default_nettype:
+            return False
+        old_span = getattr(old, 'span', None)
+        new_span = getattr(new, 'span', None)
+        if old_span is not None and new_span is not None and old_span.text() == new_span.text():
+            return True
+        # the hashes tell a difference only if both are known: hashing
+        # a subtree is a walk of its own, slower than the comparison
+        table = self.hashes.table
+        old_hash = table.get(id(old))
+        new_hash = table.get(id(new))
+        if old_hash is not None and new_hash is not None and old_hash != new_hash:
+            return False
+        return self.hashes.equal(old, new)
+
+    def _diff_module(self, old, new, edits):
+        if old is new:
+            return
+        old_span = getattr(old, 'span', None)
+        new_span = getattr(new, 'span', None)
+        if old_span is not None and new_span is not None and old_span.text() == new_span.text():
+            return
+        # the parts are compared one by one rather than the whole module
+        # first, so that an unchanged part is walked once
+        n = len(edits)
+        for name in ('paramlist', 'portlist'):
+            o = getattr(old, name)
+            w = getattr(new, name)
+            if o is None or w is None:
+                if o is not w:
+                    edits.append(Edit('replace', old.name, o, w))
+            elif not self.same(o, w):
+                edits.append(Edit('replace', old.name, o, w))
+        self._diff_sequence(module_items(old), module_items(new), old.name, edits)
+        if len(edits) == n and (old.default_nettype != new.default_nettype or
+                                [getattr(old, a) for a in old.attr_names] !=
+                                [getattr(new, a) for a in new.attr_names]):
+            # an attribute of the module (default_nettype)
+            edits.append(Edit('replace', None, old, new))
+
+    def _diff_sequence(self, old_items, new_items, module, edits):
+        old_items = list(old_items)
+        new_items = list(new_items)
+
+        # the common head and tail, mostly without hashing
+        start = 0
+        end = min(len(old_items), len(new_items))
+        while start < end and self.same(old_items[start], new_items[start]):
+            start += 1
+        tail = 0
+        while (tail < end - start and
+               self.same(old_items[len(old_items) - 1 - tail],
+                         new_items[len(new_items) - 1 - tail])):
+            tail += 1
+        old_items = old_items[start:len(old_items) - tail]
+        new_items = new_items[start:len(new_items) - tail]
+        if not old_items and not new_items:
+            return
+
+        # the identical items: unchanged or moved, by their source texts if
+        # all of them have one, or else by their hashes (a single item on
+        # both sides is known to differ, and is not hashed)
+        texts = all([getattr(item, 'span', None) is not None
+                     for items in (old_items, new_items) for item in items])
+        by_content = collections.defaultdict(collections.deque)
+        if len(old_items) > 1 or len(new_items) > 1:
+            for i, item in enumerate(old_items):
+                by_content[self._content(item, texts)].append(i)
+        pairs = []
+        new_rest = []
+        for j, item in enumerate(new_items):
+            if not by_content:
+                new_rest.append(j)
+                continue
+            candidates = by_content.get(self._content(item, texts), ())
+            for k, i in enumerate(candidates):
+                # the same hash of different subtrees is possible
+                if texts or self.hashes.equal(old_items[i], item):
+                    del candidates[k]
+                    pairs.append((i, j))
+                    break
+            else:
+                new_rest.append(j)
+        matched_old = set([i for i, _ in pairs])
+        old_rest = [i for i in range(len(old_items)) if i not in matched_old]
+
+        script = []
+        staying = set(_increasing(pairs))
+        for i, j in pairs:
+            if (i, j) not in staying:
+                script.append((j, Edit('move', module, old_items[i], new_items[j])))
+
+        # the changed items: replaced if an old item has the same key
+        by_key = collections.defaultdict(collections.deque)
+        for i in old_rest:
+            by_key[self._key(old_items[i])].append(i)
+        replaced = set()
+        for j in new_rest:
+            new_item = new_items[j]
+            candidates = by_key.get(self._key(new_item))
+            if not candidates:
+                script.append((j, Edit('insert', module, None, new_item)))
+                continue
+            i = candidates.popleft()
+            replaced.add(i)
+            old_item = old_items[i]
+            if isinstance(old_item, vast.ModuleDef):
+                sub = []
+                self._diff_module(old_item, new_item, sub)
+                script.extend([(j, e) for e in sub])
+            else:
+                script.append((j, Edit('replace', module, old_item, new_item)))
+        for i in old_rest:
+            if i not in replaced:
+                # before the new item at the same place
+                script.append((i - 0.5, Edit('delete', module, old_items[i], None)))
+
+        script.sort(key=lambda e: e[0])
+        edits.extend([e for _, e in script])
+
+    def _content(self, node, texts):
+        if texts:
+            return (node.__class__, getattr(node, 'default_nettype', None),
+                    node.span.text().tobytes())
+        return (node.__class__, self.hashes.get(node))
+
+    def _key(self, node):
+        """ The identity of an item, to pair a changed item with its old version """
+        name = getattr(node, 'name', None)
+        if isinstance(name, str) and name:
+            return (node.__class__, name)
+        if isinstance(node, (vast.Assign, vast.Substitution)):
+            return (node.__class__, self.hashes.get(node.left))
+        if isinstance(node, vast.Always):
+            return (node.__class__, self.hashes.get(node.sens_list)
+                    if node.sens_list is not None else None)
+        if isinstance(node, vast.Decl):
+            return (node.__class__, tuple([getattr(d, 'name', None) for d in node.list]))
+        return (node.__class__,)
+
+
+def _increasing(pairs):
+    """ Returns the longest subsequence of the (old index, new index) pairs,
+    in the order of the new index, whose old indices increase """
+    tails = []
+    tail_pairs = []
+    prev = {}
+    for pair in pairs:
+        i = pair[0]
+        k = bisect_left(tails, i)
+        if k == len(tails):
+            tails.append(i)
+            tail_pairs.append(pair)
+        else:
+            tails[k] = i
+            tail_pairs[k] = pair
+        prev[pair] = tail_pairs[k - 1] if k > 0 else None
+    ret = []
+    pair = tail_pairs[-1] if tail_pairs else None
+    while pair is not None:
+        ret.append(pair)
+        pair = prev[pair]
+    return ret
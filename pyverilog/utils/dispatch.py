@@ -0,0 +1,59 @@
+# -------------------------------------------------------------------------------
+# dispatch.py
+#
+# Dispatch of the AST visitors
+#
+# A visitor calls visit_<Class>(node) for a node of Class, or generic_visit(node)
+# without such a method. Instead of building the method name on every node,
+# the name is built once per node class and kept in a table; the method is
+# looked up on the visitor itself, so that the methods of an instance (or of
+# __getattr__) and the methods added to a class after its first visit are used.
+#
+# Copyright (C) 2013, Shinya Takamaeda-Yamazaki and Contributors
+# License: Apache 2.0
+# -------------------------------------------------------------------------------
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+
+
+class DispatchNames(dict):
+    """ node class -> the name of the method for the class, built on the first use """
+
+    def __init__(self, prefix):
+        dict.__init__(self)
+        self.prefix = prefix
+
+    def __missing__(self, node_class):
+        name = self.prefix + node_class.__name__
+        self[node_class] = name
+        return name
+
+
+# visit_<Class>
+visit_names = DispatchNames('visit_')
+
+# leave_<Class>
+leave_names = DispatchNames('leave_')
+
+
+def visit_method(visitor, node_class):
+    """ Returns the bound visit method of a visitor for a node class """
+    func = getattr(visitor, visit_names[node_class], None)
+    if func is None:
+        return visitor.generic_visit
+    return func
+
+
+def leave_method(visitor, node_class):
+    """ Returns the bound leave method of a visitor for a node class, or None """
+    return getattr(visitor, leave_names[node_class], None)
+
+
+def dispatch(visitor, node):
+    """ Calls the visit method of a visitor for a node """
+    func = getattr(visitor, visit_names[node.__class__], None)
+    if func is None:
+        return visitor.generic_visit(node)
+    return func(node)
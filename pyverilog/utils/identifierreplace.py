@@ -3,6 +3,12 @@
 #
 # Replaces identifier names based on a given dict
 #
+# replaceIdentifiers() modifies the tree in place. rewriteIdentifiers() leaves
+# it unchanged and returns a new tree, which shares every subtree without a
+# replaced identifier with the original: only the nodes on the paths to the
+# replaced identifiers are copied. rewriteIdentifiersBatch() applies several
+# dicts in one walk and returns a tree for each.
+#
 # Copyright (C) 2015, Shinya Takamaeda-Yamazaki
 # License: Apache 2.0
 # -------------------------------------------------------------------------------
@@ -12,7 +18,8 @@ import sys
 import os
 
 import pyverilog.vparser.ast as vast
-from pyverilog.vparser.ast import Node
+from pyverilog.vparser.ast import Node, slot_names
+from pyverilog.utils.dispatch import visit_names
 
 
 def replaceIdentifiers(node, ids):
@@ -20,29 +27,114 @@ def replaceIdentifiers(node, ids):
     return v.visit(node)
 
 
+def rewriteIdentifiers(node, ids):
+    return rewriteIdentifiersBatch(node, [ids])[0]
+
+
+def rewriteIdentifiersBatch(node, idslist):
+    """ Returns the trees of the node with the identifiers replaced by each dict """
+    idslist = list(idslist)
+    keys = set()
+    for ids in idslist:
+        keys.update(ids.keys())
+
+    # id(node) -> the new nodes for the dicts, only for the changed nodes
+    results = {}
+    stack = [(node, False)]
+    while stack:
+        n, ready = stack.pop()
+        if not ready:
+            if isinstance(n, vast.Identifier):
+                # the scope is not replaced
+                if n.name in keys:
+                    results[id(n)] = tuple([_renamed(n, ids) for ids in idslist])
+                continue
+            stack.append((n, True))
+            for name in n.child_names:
+                _push_nodes(stack, getattr(n, name, None))
+            continue
+
+        fields = [(name, getattr(n, name, None)) for name in n.child_names]
+        fields = [(name, value) for name, value in fields if _changed(value, results)]
+        if not fields:
+            continue
+        new_nodes = []
+        for i in range(len(idslist)):
+            changes = []
+            for name, value in fields:
+                new_value = _substitute(value, results, i)
+                if new_value is not value:
+                    changes.append((name, new_value))
+            new_nodes.append(_copy(n, changes) if changes else n)
+        results[id(n)] = tuple(new_nodes)
+
+    new_nodes = results.get(id(node))
+    if new_nodes is None:
+        return [node] * len(idslist)
+    return list(new_nodes)
+
+
+def _renamed(node, ids):
+    name = ids.get(node.name)
+    if name is None:
+        return node
+    return _copy(node, [('name', name)])
+
+
+def _copy(node, changes):
+    # a shallow copy (without the cached hash of an interned node)
+    cls = node.__class__
+    new = cls.__new__(cls)
+    for name in slot_names(cls):
+        try:
+            setattr(new, name, getattr(node, name))
+        except AttributeError:
+            pass
+    for name, value in changes:
+        setattr(new, name, value)
+    return new
+
+
+def _push_nodes(stack, value):
+    if isinstance(value, Node):
+        stack.append((value, False))
+    elif isinstance(value, (list, tuple)):
+        for v in reversed(value):
+            _push_nodes(stack, v)
+
+
+def _changed(value, results):
+    if isinstance(value, Node):
+        return id(value) in results
+    if isinstance(value, (list, tuple)):
+        for v in value:
+            if _changed(v, results):
+                return True
+    return False
+
+
+def _substitute(value, results, i):
+    if isinstance(value, Node):
+        new_nodes = results.get(id(value))
+        return value if new_nodes is None else new_nodes[i]
+    if isinstance(value, (list, tuple)):
+        items = [_substitute(v, results, i) for v in value]
+        for v, item in zip(value, items):
+            if v is not item:
+                return value.__class__(items)
+    return value
+
+
 def ischild(node, attr):
     if not isinstance(node, Node):
         return False
-    excludes = ('coord', 'attr_names',)
-    if attr.startswith('__'):
-        return False
-    if attr in excludes:
-        return False
-    attr_names = getattr(node, 'attr_names')
-    if attr in attr_names:
-        return False
-    attr_test = getattr(node, attr)
-    if hasattr(attr_test, '__call__'):
-        return False
-    return True
+    return attr in node.child_names
 
 
 def children_items(node):
-    children = [attr for attr in dir(node) if ischild(node, attr)]
-    ret = []
-    for c in children:
-        ret.append((c, getattr(node, c)))
-    return ret
+    if not isinstance(node, Node):
+        return []
+    return [(c, getattr(node, c, None)) for c in node.child_names]
 
 
 class IdentifierReplace(object):
@@ -50,9 +142,11 @@ class IdentifierReplace(object):
         self.ids = ids
 
     def visit(self, node):
-        method = 'visit_' + node.__class__.__name__
-        visitor = getattr(self, method, self.generic_visit)
-        ret = visitor(node)
+        func = getattr(self, visit_names[node.__class__], None)
+        if func is None:
+            ret = self.generic_visit(node)
+        else:
+            ret = func(node)
         if ret is None:
             return node
         return ret
@@ -11,11 +11,11 @@ from __future__ import print_function
 import sys
 import os
 
-from pyverilog.dataflow.visit import NodeVisitor
+from pyverilog.dataflow.visit import NodeVisitor, IterativeVisitor
 
 
 def getIdentifiers(node):
-    v = IdentifierVisitor()
+    v = IterativeIdentifierVisitor()
     v.visit(node)
     ids = v.getIdentifiers()
     return ids
@@ -33,3 +33,8 @@ class IdentifierVisitor(NodeVisitor):
 
     def visit_Identifier(self, node):
         self.identifiers.append(node.name)
+
+
+class IterativeIdentifierVisitor(IterativeVisitor, IdentifierVisitor):
+    """ IdentifierVisitor walking with an explicit stack (see IterativeVisitor) """
+    pass
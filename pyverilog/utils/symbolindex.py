@@ -0,0 +1,252 @@
+# -------------------------------------------------------------------------------
+# symbolindex.py
+#
+# Index of the identifiers and the instances of the modules of an AST
+#
+# Each module is walked once: its definitions (declarations, parameters,
+# ports, functions, tasks and instances), the uses of the identifiers, the
+# drivers of the signals (assignments and instance connections) and the
+# port connections of the instances are recorded in dictionaries.
+# Replacing or removing a module updates only the entries of the module.
+# The identifiers are indexed by name in a module, regardless of the scope.
+#
+# Copyright (C) 2013, Shinya Takamaeda-Yamazaki and Contributors
+# License: Apache 2.0
+# -------------------------------------------------------------------------------
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import collections
+
+import pyverilog.vparser.ast as vast
+from pyverilog.dataflow.visit import IterativeVisitor, primitives
+
+
+def targets(node):
+    """ Returns the names of the signals written by an lvalue (or a port
+    connection): a[i] and a[3:0] write a, not i """
+    ret = []
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, vast.Identifier):
+            ret.append(n.name)
+        elif isinstance(n, (vast.Lvalue, vast.Pointer, vast.Partselect)):
+            stack.append(n.var)
+        elif isinstance(n, vast.Concat):
+            stack.extend(reversed(n.list))
+    return ret
+
+
+def port_names(moduledef):
+    """ Returns the names of the ports of a module in order """
+    ret = []
+    if moduledef.portlist is None:
+        return ret
+    for port in moduledef.portlist.ports:
+        if isinstance(port, vast.Ioport):
+            ret.append(port.first.name)
+        else:
+            ret.append(port.name)
+    return ret
+
+
+class ModuleIndex(IterativeVisitor):
+    """ The entries of a module, built by one walk of its ModuleDef """
+
+    def __init__(self, moduledef):
+        self.moduledef = moduledef
+        self.name = moduledef.name
+        # name -> [node]
+        self.definitions = collections.defaultdict(list)
+        self.uses = collections.defaultdict(list)
+        self.drivers = collections.defaultdict(list)
+        # signal name -> [(Instance, PortArg)]
+        self.connected = collections.defaultdict(list)
+        # the Instance nodes (a gate primitive may be unnamed), and by name
+        self.instances = []
+        self.instance_names = {}
+        self.visit(moduledef)
+
+    def _visit_definition(self, node):
+        self.definitions[node.name].append(node)
+        self.generic_visit(node)
+
+    visit_Input = _visit_definition
+    visit_Output = _visit_definition
+    visit_Inout = _visit_definition
+    visit_Tri = _visit_definition
+    visit_Wire = _visit_definition
+    visit_Reg = _visit_definition
+    visit_Integer = _visit_definition
+    visit_Real = _visit_definition
+    visit_Genvar = _visit_definition
+    visit_Parameter = _visit_definition
+    visit_Localparam = _visit_definition
+    visit_Supply = _visit_definition
+    visit_Port = _visit_definition
+    visit_Function = _visit_definition
+    visit_Task = _visit_definition
+
+    def visit_Identifier(self, node):
+        self.uses[node.name].append(node)
+        self.generic_visit(node)
+
+    def _visit_assignment(self, node):
+        for name in targets(node.left):
+            self.drivers[name].append(node)
+        self.generic_visit(node)
+
+    visit_Assign = _visit_assignment
+    visit_BlockingSubstitution = _visit_assignment
+    visit_NonblockingSubstitution = _visit_assignment
+    visit_Substitution = _visit_assignment
+
+    def visit_Instance(self, node):
+        if node.name:
+            self.definitions[node.name].append(node)
+            self.instance_names[node.name] = node
+        self.instances.append(node)
+        for portarg in node.portlist:
+            if portarg.argname is None:
+                continue
+            for name in targets(portarg.argname):
+                self.connected[name].append((node, portarg))
+        self.generic_visit(node)
+
+
+class SymbolIndex(object):
+    """ Index of the definitions and the uses of the identifiers, and of
+    the instances and their connections, of the modules of an AST """
+
+    def __init__(self, ast=None):
+        # module name -> ModuleIndex
+        self.modules = collections.OrderedDict()
+        # module name -> {(parent module name, id(Instance)): Instance}
+        self.instantiated = collections.defaultdict(collections.OrderedDict)
+        if ast is not None:
+            self.add_all(ast)
+
+    def add_all(self, ast):
+        """ Indexes every ModuleDef of a Source (or an iterable of definitions) """
+        if isinstance(ast, vast.Source):
+            ast = ast.description.definitions
+        for definition in ast:
+            if isinstance(definition, vast.ModuleDef):
+                self.add(definition)
+
+    def add(self, moduledef):
+        """ Indexes a ModuleDef, replacing the module of the same name in
+        its place, and returns the replaced ModuleDef or None """
+        old = self.modules.get(moduledef.name)
+        if old is not None:
+            self._unlink(old)
+        entry = ModuleIndex(moduledef)
+        self.modules[entry.name] = entry
+        for instance in entry.instances:
+            self.instantiated[instance.module][(entry.name, id(instance))] = instance
+        return old.moduledef if old is not None else None
+
+    replace = add
+
+    def remove(self, name):
+        """ Removes the entries of a module """
+        entry = self.modules.pop(name, None)
+        if entry is not None:
+            self._unlink(entry)
+
+    def _unlink(self, entry):
+        for instance in entry.instances:
+            sites = self.instantiated[instance.module]
+            sites.pop((entry.name, id(instance)), None)
+            if not sites:
+                del self.instantiated[instance.module]
+
+    def get_modulenames(self):
+        return tuple(self.modules.keys())
+
+    def get_moduledef(self, module):
+        return self.modules[module].moduledef
+
+    def definitions(self, module, name):
+        """ Returns the nodes defining a name in a module """
+        return tuple(self.modules[module].definitions.get(name, ()))
+
+    def uses(self, module, name):
+        """ Returns the Identifier nodes of a name in a module """
+        return tuple(self.modules[module].uses.get(name, ()))
+
+    def drivers(self, module, name):
+        """ Returns the nodes writing a signal in a module: the assignments
+        (Assign, BlockingSubstitution, NonblockingSubstitution) and the
+        PortArg nodes connecting it to an output or inout port of an
+        instance of an indexed module """
+        entry = self.modules[module]
+        ret = list(entry.drivers.get(name, ()))
+        for instance, portarg in entry.connected.get(name, ()):
+            direction = self.port_direction(instance, portarg)
+            if direction in ('Output', 'Inout'):
+                ret.append(portarg)
+        return tuple(ret)
+
+    def instances(self, module):
+        """ Returns the Instance nodes in a module """
+        return tuple(self.modules[module].instances)
+
+    def instance(self, module, name):
+        return self.modules[module].instance_names[name]
+
+    def instantiations(self, module):
+        """ Returns the (parent module name, Instance) of a module """
+        return tuple((parent, instance) for (parent, _), instance
+                     in self.instantiated.get(module, {}).items())
+
+    def connections(self, module, instance):
+        """ Returns the port name -> PortArg of an instance (a name or an
+        Instance) in a module; the positional connections are named by the
+        ports of the instantiated module if it is indexed, or else numbered """
+        if not isinstance(instance, vast.Instance):
+            instance = self.modules[module].instance_names[instance]
+        ports = None
+        ret = collections.OrderedDict()
+        for i, portarg in enumerate(instance.portlist):
+            portname = portarg.portname
+            if portname is None:
+                if ports is None:
+                    child = self.modules.get(instance.module)
+                    ports = port_names(child.moduledef) if child is not None else []
+                portname = ports[i] if i < len(ports) else i
+            ret[portname] = portarg
+        return ret
+
+    def port_connections(self, module, port):
+        """ Returns the (parent module name, Instance, PortArg) connected to
+        a port of a module at its instantiation sites """
+        ret = []
+        for parent, instance in self.instantiations(module):
+            portarg = self.connections(parent, instance).get(port)
+            if portarg is not None:
+                ret.append((parent, instance, portarg))
+        return tuple(ret)
+
+    def port_direction(self, instance, portarg):
+        """ Returns the class name of the declaration of the port of an
+        instance (Input, Output, Inout), or None if it is not known; the
+        first port of a gate primitive is its output """
+        index = [i for i, p in enumerate(instance.portlist) if p is portarg][0]
+        if instance.module in primitives:
+            return 'Output' if index == 0 else 'Input'
+        child = self.modules.get(instance.module)
+        if child is None:
+            return None
+        portname = portarg.portname
+        if portname is None:
+            ports = port_names(child.moduledef)
+            if index >= len(ports):
+                return None
+            portname = ports[index]
+        for node in child.definitions.get(portname, ()):
+            if isinstance(node, (vast.Input, vast.Output, vast.Inout)):
+                return node.__class__.__name__
+        return None
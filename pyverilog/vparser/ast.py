@@ -22,40 +22,69 @@ import re
 
 class Node(object):
     """ Abstact class for every element in parser """
+    # every class declares its own fields in __slots__, so that a node has
+    # no __dict__; end_lineno is left unset on the nodes without it
+    # _hash is the cached hash of an interned node (see intern.py)
+    # span is the Span of the node in the parsed text (see source.py),
+    # recorded by VerilogParser(spans=True)
+    __slots__ = ('lineno', 'end_lineno', '_hash', 'span')
+    attr_names = ()
+    # the fields holding a node or a tuple of nodes
+    child_names = ()
 
     def children(self):
         pass
 
+    def source_text(self):
+        """ Returns the memoryview of the UTF-8 bytes of the node in the
+        parsed text, or None without the span """
+        span = getattr(self, 'span', None)
+        if span is None:
+            return None
+        return span.text()
+
     def show(self, buf=sys.stdout, offset=0, attrnames=False, showlineno=True):
         indent = 2
-        lead = ' ' * offset
-
-        buf.write(lead + self.__class__.__name__ + ': ')
-
-        if self.attr_names:
-            if attrnames:
-                nvlist = [(n, getattr(self, n)) for n in self.attr_names]
-                attrstr = ', '.join('%s=%s' % (n, v) for (n, v) in nvlist)
-            else:
-                vlist = [getattr(self, n) for n in self.attr_names]
-                attrstr = ', '.join('%s' % v for v in vlist)
-            buf.write(attrstr)
-
-        if showlineno:
-            if hasattr(self, 'end_lineno'):
-                buf.write(' (from %s to %s)' % (self.lineno, self.end_lineno))
-            else:
-                buf.write(' (at %s)' % self.lineno)
-
-        buf.write('\n')
-
-        for c in self.children():
-            c.show(buf, offset + indent, attrnames, showlineno)
+        # an explicit stack instead of the recursion: no limit of the depth
+        stack = [(self, offset)]
+        while stack:
+            node, offset = stack.pop()
+            lead = ' ' * offset
+
+            buf.write(lead + node.__class__.__name__ + ': ')
+
+            if node.attr_names:
+                if attrnames:
+                    nvlist = [(n, getattr(node, n)) for n in node.attr_names]
+                    attrstr = ', '.join('%s=%s' % (n, v) for (n, v) in nvlist)
+                else:
+                    vlist = [getattr(node, n) for n in node.attr_names]
+                    attrstr = ', '.join('%s' % v for v in vlist)
+                buf.write(attrstr)
+
+            if showlineno:
+                if hasattr(node, 'end_lineno'):
+                    buf.write(' (from %s to %s)' % (node.lineno, node.end_lineno))
+                else:
+                    buf.write(' (at %s)' % node.lineno)
+
+            buf.write('\n')
+
+            for c in reversed(node.children()):
+                stack.append((c, offset + indent))
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if type(self) != type(other):
             return False
 
+        self_hash = getattr(self, '_hash', None)
+        if self_hash is not None:
+            other_hash = getattr(other, '_hash', None)
+            if other_hash is not None and other_hash != self_hash:
+                return False
+
         self_attrs = tuple([getattr(self, a) for a in self.attr_names])
         other_attrs = tuple([getattr(other, a) for a in other.attr_names])
 
@@ -73,15 +102,69 @@ class Node(object):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __getstate__(self):
+        state = {}
+        for name in slot_names(self.__class__):
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        # the attributes of a subclass without __slots__
+        d = getattr(self, '__dict__', None)
+        if d:
+            state.update(d)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def __hash__(self):
+        h = getattr(self, '_hash', None)
+        if h is not None:
+            return h
         s = hash(tuple([getattr(self, a) for a in self.attr_names]))
-        c = hash(self.children())
+        # the hashes of the children, so that a table of the hashes of the
+        # subtrees (see astdiff.py) gets the same values
+        c = hash(tuple([hash(n) for n in self.children()]))
         return hash((s, c))
 
 
+_slot_names = {}
+
+
+def slot_names(cls):
+    """ Returns the names of the fields of a node class """
+    names = _slot_names.get(cls)
+    if names is None:
+        names = []
+        for c in reversed(cls.__mro__):
+            names.extend(vars(c).get('__slots__', ()))
+        # a cached hash is not valid in another process, and a span refers
+        # to the text in this process
+        names.remove('_hash')
+        names.remove('span')
+        names = _slot_names[cls] = tuple(names)
+    return names
+
+
+_field_names = {}
+
+
+def field_names(cls):
+    """ Returns the names of the fields of a node class but the line numbers """
+    names = _field_names.get(cls)
+    if names is None:
+        names = _field_names[cls] = tuple(n for n in slot_names(cls)
+                                          if n not in ('lineno', 'end_lineno'))
+    return names
+
+
 # ------------------------------------------------------------------------------
 class Source(Node):
+    __slots__ = ('name', 'description')
     attr_names = ('name',)
+    child_names = ('description',)
 
     def __init__(self, name, description, lineno=0):
         self.lineno = lineno
@@ -96,7 +179,9 @@ class Source(Node):
 
 
 class Description(Node):
+    __slots__ = ('definitions',)
     attr_names = ()
+    child_names = ('definitions',)
 
     def __init__(self, definitions, lineno=0):
         self.lineno = lineno
@@ -110,7 +195,9 @@ class Description(Node):
 
 
 class ModuleDef(Node):
+    __slots__ = ('name', 'paramlist', 'portlist', 'items', 'default_nettype')
     attr_names = ('name',)
+    child_names = ('paramlist', 'portlist', 'items')
 
     def __init__(self, name, paramlist, portlist, items, default_nettype='wire', lineno=0):
         self.lineno = lineno
@@ -132,7 +219,9 @@ class ModuleDef(Node):
 
 
 class Paramlist(Node):
+    __slots__ = ('params',)
     attr_names = ()
+    child_names = ('params',)
 
     def __init__(self, params, lineno=0):
         self.lineno = lineno
@@ -146,7 +235,9 @@ class Paramlist(Node):
 
 
 class Portlist(Node):
+    __slots__ = ('ports',)
     attr_names = ()
+    child_names = ('ports',)
 
     def __init__(self, ports, lineno=0):
         self.lineno = lineno
@@ -160,7 +251,11 @@ class Portlist(Node):
 
 
 class Port(Node):
+    __slots__ = ('name', 'width', 'dimensions', 'type')
     attr_names = ('name', 'type',)
+    # dimensions is always None (set by the parser for the non-ANSI ports),
+    # and is not returned by children()
+    child_names = ('width',)
 
     def __init__(self, name, width, dimensions, type, lineno=0):
         self.lineno = lineno
@@ -177,7 +272,9 @@ class Port(Node):
 
 
 class Width(Node):
+    __slots__ = ('msb', 'lsb')
     attr_names = ()
+    child_names = ('msb', 'lsb')
 
     def __init__(self, msb, lsb, lineno=0):
         self.lineno = lineno
@@ -194,11 +291,13 @@ class Width(Node):
 
 
 class Length(Width):
-    pass
+    __slots__ = ()
 
 
 class Dimensions(Node):
+    __slots__ = ('lengths',)
     attr_names = ()
+    child_names = ('lengths',)
 
     def __init__(self, lengths, lineno=0):
         self.lineno = lineno
@@ -212,7 +311,9 @@ class Dimensions(Node):
 
 
 class Identifier(Node):
+    __slots__ = ('name', 'scope')
     attr_names = ('name',)
+    child_names = ('scope',)
 
     def __init__(self, name, scope=None, lineno=0):
         self.lineno = lineno
@@ -232,7 +333,9 @@ class Identifier(Node):
 
 
 class Value(Node):
+    __slots__ = ('value',)
     attr_names = ()
+    child_names = ('value',)
 
     def __init__(self, value, lineno=0):
         self.lineno = lineno
@@ -246,7 +349,9 @@ class Value(Node):
 
 
 class Constant(Value):
+    __slots__ = ()
     attr_names = ('value',)
+    child_names = ()
 
     def __init__(self, value, lineno=0):
         self.lineno = lineno
@@ -261,19 +366,21 @@ class Constant(Value):
 
 
 class IntConst(Constant):
-    pass
+    __slots__ = ()
 
 
 class FloatConst(Constant):
-    pass
+    __slots__ = ()
 
 
 class StringConst(Constant):
-    pass
+    __slots__ = ()
 
 
 class Variable(Value):
+    __slots__ = ('name', 'width', 'signed', 'dimensions')
     attr_names = ('name', 'signed')
+    child_names = ('width', 'dimensions', 'value')
 
     def __init__(self, name, width=None, signed=False, dimensions=None, value=None, lineno=0):
         self.lineno = lineno
@@ -295,43 +402,45 @@ class Variable(Value):
 
 
 class Input(Variable):
-    pass
+    __slots__ = ()
 
 
 class Output(Variable):
-    pass
+    __slots__ = ()
 
 
 class Inout(Variable):
-    pass
+    __slots__ = ()
 
 
 class Tri(Variable):
-    pass
+    __slots__ = ()
 
 
 class Wire(Variable):
-    pass
+    __slots__ = ()
 
 
 class Reg(Variable):
-    pass
+    __slots__ = ()
 
 
 class Integer(Variable):
-    pass
+    __slots__ = ()
 
 
 class Real(Variable):
-    pass
+    __slots__ = ()
 
 
 class Genvar(Variable):
-    pass
+    __slots__ = ()
 
 
 class Ioport(Node):
+    __slots__ = ('first', 'second')
     attr_names = ()
+    child_names = ('first', 'second')
 
     def __init__(self, first, second=None, lineno=0):
         self.lineno = lineno
@@ -348,7 +457,11 @@ class Ioport(Node):
 
 
 class Parameter(Node):
+    __slots__ = ('name', 'value', 'width', 'signed', 'dimensions')
     attr_names = ('name', 'signed')
+    # dimensions is always None (the grammar has no parameter arrays),
+    # and is not returned by children()
+    child_names = ('value', 'width')
 
     def __init__(self, name, value, width=None, signed=False, lineno=0):
         self.lineno = lineno
@@ -368,15 +481,17 @@ class Parameter(Node):
 
 
 class Localparam(Parameter):
-    pass
+    __slots__ = ()
 
 
 class Supply(Parameter):
-    pass
+    __slots__ = ()
 
 
 class Decl(Node):
+    __slots__ = ('list',)
     attr_names = ()
+    child_names = ('list',)
 
     def __init__(self, list, lineno=0):
         self.lineno = lineno
@@ -390,7 +505,9 @@ class Decl(Node):
 
 
 class Concat(Node):
+    __slots__ = ('list',)
     attr_names = ()
+    child_names = ('list',)
 
     def __init__(self, list, lineno=0):
         self.lineno = lineno
@@ -404,11 +521,13 @@ class Concat(Node):
 
 
 class LConcat(Concat):
-    pass
+    __slots__ = ()
 
 
 class Repeat(Node):
+    __slots__ = ('value', 'times')
     attr_names = ()
+    child_names = ('value', 'times')
 
     def __init__(self, value, times, lineno=0):
         self.lineno = lineno
@@ -425,7 +544,9 @@ class Repeat(Node):
 
 
 class Partselect(Node):
+    __slots__ = ('var', 'msb', 'lsb')
     attr_names = ()
+    child_names = ('var', 'msb', 'lsb')
 
     def __init__(self, var, msb, lsb, lineno=0):
         self.lineno = lineno
@@ -445,7 +566,9 @@ class Partselect(Node):
 
 
 class Pointer(Node):
+    __slots__ = ('var', 'ptr')
     attr_names = ()
+    child_names = ('var', 'ptr')
 
     def __init__(self, var, ptr, lineno=0):
         self.lineno = lineno
@@ -462,7 +585,9 @@ class Pointer(Node):
 
 
 class Lvalue(Node):
+    __slots__ = ('var',)
     attr_names = ()
+    child_names = ('var',)
 
     def __init__(self, var, lineno=0):
         self.lineno = lineno
@@ -476,7 +601,9 @@ class Lvalue(Node):
 
 
 class Rvalue(Node):
+    __slots__ = ('var',)
     attr_names = ()
+    child_names = ('var',)
 
     def __init__(self, var, lineno=0):
         self.lineno = lineno
@@ -491,7 +618,9 @@ class Rvalue(Node):
 
 # ------------------------------------------------------------------------------
 class Operator(Node):
+    __slots__ = ('left', 'right')
     attr_names = ()
+    child_names = ('left', 'right')
 
     def __init__(self, left, right, lineno=0):
         self.lineno = lineno
@@ -515,7 +644,9 @@ class Operator(Node):
 
 
 class UnaryOperator(Operator):
+    __slots__ = ()
     attr_names = ()
+    child_names = ('right',)
 
     def __init__(self, right, lineno=0):
         self.lineno = lineno
@@ -530,153 +661,157 @@ class UnaryOperator(Operator):
 
 # Level 1 (Highest Priority)
 class Uplus(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Uminus(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Ulnot(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Unot(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Uand(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Unand(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Uor(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Unor(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Uxor(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Uxnor(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 # Level 2
 class Power(Operator):
-    pass
+    __slots__ = ()
 
 
 class Times(Operator):
-    pass
+    __slots__ = ()
 
 
 class Divide(Operator):
-    pass
+    __slots__ = ()
 
 
 class Mod(Operator):
-    pass
+    __slots__ = ()
 
 
 # Level 3
 class Plus(Operator):
-    pass
+    __slots__ = ()
 
 
 class Minus(Operator):
-    pass
+    __slots__ = ()
 
 
 # Level 4
 class Sll(Operator):
-    pass
+    __slots__ = ()
 
 
 class Srl(Operator):
-    pass
+    __slots__ = ()
 
 
 class Sla(Operator):
-    pass
+    __slots__ = ()
 
 
 class Sra(Operator):
-    pass
+    __slots__ = ()
 
 
 # Level 5
 class LessThan(Operator):
-    pass
+    __slots__ = ()
 
 
 class GreaterThan(Operator):
-    pass
+    __slots__ = ()
 
 
 class LessEq(Operator):
-    pass
+    __slots__ = ()
 
 
 class GreaterEq(Operator):
-    pass
+    __slots__ = ()
 
 
 # Level 6
 class Eq(Operator):
-    pass
+    __slots__ = ()
 
 
 class NotEq(Operator):
-    pass
+    __slots__ = ()
 
 
 class Eql(Operator):
+    __slots__ = ()
     pass  # ===
 
 
 class NotEql(Operator):
+    __slots__ = ()
     pass  # !==
 
 
 # Level 7
 class And(Operator):
-    pass
+    __slots__ = ()
 
 
 class Xor(Operator):
-    pass
+    __slots__ = ()
 
 
 class Xnor(Operator):
-    pass
+    __slots__ = ()
 
 
 # Level 8
 class Or(Operator):
-    pass
+    __slots__ = ()
 
 
 # Level 9
 class Land(Operator):
-    pass
+    __slots__ = ()
 
 
 # Level 10
 class Lor(Operator):
-    pass
+    __slots__ = ()
 
 
 # Level 11
 class Cond(Operator):
+    __slots__ = ('cond', 'true_value', 'false_value')
     attr_names = ()
+    child_names = ('cond', 'true_value', 'false_value')
 
     def __init__(self, cond, true_value, false_value, lineno=0):
         self.lineno = lineno
@@ -696,7 +831,9 @@ class Cond(Operator):
 
 
 class Assign(Node):
+    __slots__ = ('left', 'right', 'ldelay', 'rdelay')
     attr_names = ()
+    child_names = ('left', 'right', 'ldelay', 'rdelay')
 
     def __init__(self, left, right, ldelay=None, rdelay=None, lineno=0):
         self.lineno = lineno
@@ -719,7 +856,9 @@ class Assign(Node):
 
 
 class Always(Node):
+    __slots__ = ('sens_list', 'statement')
     attr_names = ()
+    child_names = ('sens_list', 'statement')
 
     def __init__(self, sens_list, statement, lineno=0):
         self.lineno = lineno
@@ -736,19 +875,21 @@ class Always(Node):
 
 
 class AlwaysFF(Always):
-    pass
+    __slots__ = ()
 
 
 class AlwaysComb(Always):
-    pass
+    __slots__ = ()
 
 
 class AlwaysLatch(Always):
-    pass
+    __slots__ = ()
 
 
 class SensList(Node):
+    __slots__ = ('list',)
     attr_names = ()
+    child_names = ('list',)
 
     def __init__(self, list, lineno=0):
         self.lineno = lineno
@@ -762,7 +903,9 @@ class SensList(Node):
 
 
 class Sens(Node):
+    __slots__ = ('sig', 'type')
     attr_names = ('type',)
+    child_names = ('sig',)
 
     def __init__(self, sig, type='posedge', lineno=0):
         self.lineno = lineno
@@ -777,7 +920,9 @@ class Sens(Node):
 
 
 class Substitution(Node):
+    __slots__ = ('left', 'right', 'ldelay', 'rdelay')
     attr_names = ()
+    child_names = ('left', 'right', 'ldelay', 'rdelay')
 
     def __init__(self, left, right, ldelay=None, rdelay=None, lineno=0):
         self.lineno = lineno
@@ -800,15 +945,17 @@ class Substitution(Node):
 
 
 class BlockingSubstitution(Substitution):
-    pass
+    __slots__ = ()
 
 
 class NonblockingSubstitution(Substitution):
-    pass
+    __slots__ = ()
 
 
 class IfStatement(Node):
+    __slots__ = ('cond', 'true_statement', 'false_statement')
     attr_names = ()
+    child_names = ('cond', 'true_statement', 'false_statement')
 
     def __init__(self, cond, true_statement, false_statement, lineno=0):
         self.lineno = lineno
@@ -828,7 +975,9 @@ class IfStatement(Node):
 
 
 class ForStatement(Node):
+    __slots__ = ('pre', 'cond', 'post', 'statement')
     attr_names = ()
+    child_names = ('pre', 'cond', 'post', 'statement')
 
     def __init__(self, pre, cond, post, statement, lineno=0):
         self.lineno = lineno
@@ -851,7 +1000,9 @@ class ForStatement(Node):
 
 
 class WhileStatement(Node):
+    __slots__ = ('cond', 'statement')
     attr_names = ()
+    child_names = ('cond', 'statement')
 
     def __init__(self, cond, statement, lineno=0):
         self.lineno = lineno
@@ -868,7 +1019,9 @@ class WhileStatement(Node):
 
 
 class CaseStatement(Node):
+    __slots__ = ('comp', 'caselist')
     attr_names = ()
+    child_names = ('comp', 'caselist')
 
     def __init__(self, comp, caselist, lineno=0):
         self.lineno = lineno
@@ -885,19 +1038,21 @@ class CaseStatement(Node):
 
 
 class CasexStatement(CaseStatement):
-    pass
+    __slots__ = ()
 
 
 class CasezStatement(CaseStatement):
-    pass
+    __slots__ = ()
 
 
 class UniqueCaseStatement(CaseStatement):
-    pass
+    __slots__ = ()
 
 
 class Case(Node):
+    __slots__ = ('cond', 'statement')
     attr_names = ()
+    child_names = ('cond', 'statement')
 
     def __init__(self, cond, statement, lineno=0):
         self.lineno = lineno
@@ -914,7 +1069,9 @@ class Case(Node):
 
 
 class Block(Node):
+    __slots__ = ('statements', 'scope')
     attr_names = ('scope',)
+    child_names = ('statements',)
 
     def __init__(self, statements, scope=None, lineno=0):
         self.lineno = lineno
@@ -929,7 +1086,9 @@ class Block(Node):
 
 
 class Initial(Node):
+    __slots__ = ('statement',)
     attr_names = ()
+    child_names = ('statement',)
 
     def __init__(self, statement, lineno=0):
         self.lineno = lineno
@@ -943,7 +1102,9 @@ class Initial(Node):
 
 
 class EventStatement(Node):
+    __slots__ = ('senslist',)
     attr_names = ()
+    child_names = ('senslist',)
 
     def __init__(self, senslist, lineno=0):
         self.lineno = lineno
@@ -957,7 +1118,9 @@ class EventStatement(Node):
 
 
 class WaitStatement(Node):
+    __slots__ = ('cond', 'statement')
     attr_names = ()
+    child_names = ('cond', 'statement')
 
     def __init__(self, cond, statement, lineno=0):
         self.lineno = lineno
@@ -974,7 +1137,9 @@ class WaitStatement(Node):
 
 
 class ForeverStatement(Node):
+    __slots__ = ('statement',)
     attr_names = ()
+    child_names = ('statement',)
 
     def __init__(self, statement, lineno=0):
         self.lineno = lineno
@@ -988,7 +1153,9 @@ class ForeverStatement(Node):
 
 
 class DelayStatement(Node):
+    __slots__ = ('delay',)
     attr_names = ()
+    child_names = ('delay',)
 
     def __init__(self, delay, lineno=0):
         self.lineno = lineno
@@ -1002,7 +1169,9 @@ class DelayStatement(Node):
 
 
 class InstanceList(Node):
+    __slots__ = ('module', 'parameterlist', 'instances')
     attr_names = ('module',)
+    child_names = ('parameterlist', 'instances')
 
     def __init__(self, module, parameterlist, instances, lineno=0):
         self.lineno = lineno
@@ -1020,7 +1189,9 @@ class InstanceList(Node):
 
 
 class Instance(Node):
+    __slots__ = ('module', 'name', 'portlist', 'parameterlist', 'array')
     attr_names = ('name', 'module')
+    child_names = ('array', 'parameterlist', 'portlist')
 
     def __init__(self, module, name, portlist, parameterlist, array=None, lineno=0):
         self.lineno = lineno
@@ -1042,7 +1213,9 @@ class Instance(Node):
 
 
 class ParamArg(Node):
+    __slots__ = ('paramname', 'argname')
     attr_names = ('paramname',)
+    child_names = ('argname',)
 
     def __init__(self, paramname, argname, lineno=0):
         self.lineno = lineno
@@ -1057,7 +1230,9 @@ class ParamArg(Node):
 
 
 class PortArg(Node):
+    __slots__ = ('portname', 'argname')
     attr_names = ('portname',)
+    child_names = ('argname',)
 
     def __init__(self, portname, argname, lineno=0):
         self.lineno = lineno
@@ -1072,7 +1247,9 @@ class PortArg(Node):
 
 
 class Function(Node):
+    __slots__ = ('name', 'retwidth', 'statement')
     attr_names = ('name',)
+    child_names = ('retwidth', 'statement')
 
     def __init__(self, name, retwidth, statement, lineno=0):
         self.lineno = lineno
@@ -1093,7 +1270,9 @@ class Function(Node):
 
 
 class FunctionCall(Node):
+    __slots__ = ('name', 'args')
     attr_names = ()
+    child_names = ('name', 'args')
 
     def __init__(self, name, args, lineno=0):
         self.lineno = lineno
@@ -1113,7 +1292,9 @@ class FunctionCall(Node):
 
 
 class Task(Node):
+    __slots__ = ('name', 'statement')
     attr_names = ('name',)
+    child_names = ('statement',)
 
     def __init__(self, name, statement, lineno=0):
         self.lineno = lineno
@@ -1128,7 +1309,9 @@ class Task(Node):
 
 
 class TaskCall(Node):
+    __slots__ = ('name', 'args')
     attr_names = ()
+    child_names = ('name', 'args')
 
     def __init__(self, name, args, lineno=0):
         self.lineno = lineno
@@ -1145,7 +1328,9 @@ class TaskCall(Node):
 
 
 class GenerateStatement(Node):
+    __slots__ = ('items',)
     attr_names = ()
+    child_names = ('items',)
 
     def __init__(self, items, lineno=0):
         self.lineno = lineno
@@ -1159,7 +1344,9 @@ class GenerateStatement(Node):
 
 
 class SystemCall(Node):
+    __slots__ = ('syscall', 'args')
     attr_names = ('syscall',)
+    child_names = ('args',)
 
     def __init__(self, syscall, args, lineno=0):
         self.lineno = lineno
@@ -1185,7 +1372,9 @@ class SystemCall(Node):
 
 
 class IdentifierScopeLabel(Node):
+    __slots__ = ('name', 'loop')
     attr_names = ('name', 'loop')
+    child_names = ()
 
     def __init__(self, name, loop=None, lineno=0):
         self.lineno = lineno
@@ -1198,7 +1387,9 @@ class IdentifierScopeLabel(Node):
 
 
 class IdentifierScope(Node):
+    __slots__ = ('labellist',)
     attr_names = ()
+    child_names = ('labellist',)
 
     def __init__(self, labellist, lineno=0):
         self.lineno = lineno
@@ -1212,7 +1403,9 @@ class IdentifierScope(Node):
 
 
 class Pragma(Node):
+    __slots__ = ('entry',)
     attr_names = ()
+    child_names = ('entry',)
 
     def __init__(self, entry, lineno=0):
         self.lineno = lineno
@@ -1226,7 +1419,9 @@ class Pragma(Node):
 
 
 class PragmaEntry(Node):
+    __slots__ = ('name', 'value')
     attr_names = ('name', )
+    child_names = ('value',)
 
     def __init__(self, name, value=None, lineno=0):
         self.lineno = lineno
@@ -1241,7 +1436,9 @@ class PragmaEntry(Node):
 
 
 class Disable(Node):
+    __slots__ = ('dest',)
     attr_names = ('dest',)
+    child_names = ()
 
     def __init__(self, dest, lineno=0):
         self.lineno = lineno
@@ -1253,7 +1450,9 @@ class Disable(Node):
 
 
 class ParallelBlock(Node):
+    __slots__ = ('statements', 'scope')
     attr_names = ('scope',)
+    child_names = ('statements',)
 
     def __init__(self, statements, scope=None, lineno=0):
         self.lineno = lineno
@@ -1268,7 +1467,9 @@ class ParallelBlock(Node):
 
 
 class SingleStatement(Node):
+    __slots__ = ('statement',)
     attr_names = ()
+    child_names = ('statement',)
 
     def __init__(self, statement, lineno=0):
         self.lineno = lineno
@@ -1282,7 +1483,9 @@ class SingleStatement(Node):
 
 
 class EmbeddedCode(Node):
+    __slots__ = ('code',)
     attr_names = ('code',)
+    child_names = ()
 
     def __init__(self, code, lineno=0):
         self.code = code
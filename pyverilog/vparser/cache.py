@@ -0,0 +1,250 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Content-addressed on-disk AST cache
+
+   A parse result (Source AST, directives and source map) is stored under a key built
+   from the contents of the sources, the include/define options, the
+   preprocessor engine and the pyverilog version. Entries are evicted in
+   least-recently-used order when the cache grows beyond max_size bytes.
+
+   An entry also records the digests of the files the sources depend on
+   (by `include or a macro), and it is not used once one of them changes.
+   A result whose dependencies are unknown is not cached.
+   The digest of a file is remembered with its mtime and size, so that an
+   unchanged file is not read again to compute the key.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import time
+import hashlib
+import pickle
+import tempfile
+
+import pyverilog
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+SUFFIX = '.ast'
+
+# path -> (mtime_ns, size, digest) of the files hashed before
+DIGESTS = 'digests.pickle'
+
+# a file modified this recently may change again within the resolution of
+# its mtime: its digest is not remembered
+RACY_SECONDS = 2.0
+
+
+class ASTCache(object):
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.digests = None
+        self.digests_changed = False
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, sources, include=None, define=None, engine=None):
+        h = hashlib.sha256()
+        h.update(('pyverilog %s\n' % pyverilog.__version__).encode())
+        h.update(('engine %s\n' % engine).encode())
+        for inc in (include or ()):
+            h.update(('include %s\n' % inc).encode())
+        for dfn in (define or ()):
+            h.update(('define %s\n' % dfn).encode())
+        for source in sources:
+            if os.path.isfile(source):
+                h.update(b'file ')
+                h.update(self.digest(source))
+            else:
+                h.update(b'text ')
+                h.update(hashlib.sha256(source.encode()).digest())
+            h.update(b'\n')
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key):
+        """ Returns (ast, directives, source_map) or None """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self.misses += 1
+            return None
+
+        # written without a source map or dependencies
+        entry = tuple(entry) + (None,) * (4 - len(entry))
+        if not self.unchanged(entry[3]):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return entry[:3]
+
+    def put(self, key, ast, directives, source_map=None, dependencies=()):
+        """ dependencies are the files (other than the sources) the result
+        depends on. If they are unknown (None), the result is not cached,
+        since a change of an included file would not be noticed. """
+        if dependencies is None:
+            return False
+        try:
+            dependencies = tuple([(f, self.digest(f)) for f in dependencies])
+        except OSError:
+            return False
+        try:
+            data = pickle.dumps((ast, tuple(directives), source_map, dependencies),
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError):
+            # too deep to be pickled: the result is just not cached
+            return False
+
+        # write-then-rename, so that concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path(key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+        self.evict()
+        return True
+
+    def unchanged(self, dependencies):
+        if not dependencies:
+            return True
+        for filename, digest in dependencies:
+            try:
+                if self.digest(filename) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def digest(self, filename):
+        """ Returns the digest of the contents of a file.
+        The file is not read again while its mtime and size stay the same. """
+        if self.digests is None:
+            self.digests = self._load_digests()
+        path = os.path.abspath(filename)
+        st = os.stat(path)
+        memo = self.digests.get(path)
+        if memo is not None and memo[0] == st.st_mtime_ns and memo[1] == st.st_size:
+            return memo[2]
+
+        digest = file_digest(path)
+        if time.time() - st.st_mtime > RACY_SECONDS:
+            self.digests[path] = (st.st_mtime_ns, st.st_size, digest)
+            self.digests_changed = True
+        return digest
+
+    def _load_digests(self):
+        try:
+            with open(os.path.join(self.directory, DIGESTS), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return {}
+
+    def save_digests(self):
+        """ Writes the digests of the files hashed so far """
+        if not self.digests_changed:
+            return
+        data = pickle.dumps(self.digests, protocol=pickle.HIGHEST_PROTOCOL)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, os.path.join(self.directory, DIGESTS))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.digests_changed = False
+
+    def entries(self):
+        """ Returns (mtime, size, path) of every entry, least recently used first """
+        ret = []
+        for e in os.scandir(self.directory):
+            if not e.name.endswith(SUFFIX):
+                continue
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            ret.append((st.st_mtime, st.st_size, e.path))
+        ret.sort()
+        return ret
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.hits = 0
+        self.misses = 0
+
+
+def file_digest(filename):
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.digest()
+
+
+_caches = {}
+
+
+def get_cache(directory, max_size=None):
+    """ Returns the ASTCache of the directory shared within this process,
+    so that its hit/miss counters accumulate over parse() calls. """
+    directory = os.path.abspath(directory)
+    cache = _caches.get(directory)
+    if cache is None:
+        cache = ASTCache(directory) if max_size is None else ASTCache(directory, max_size)
+        _caches[directory] = cache
+    elif max_size is not None:
+        cache.max_size = max_size
+    return cache
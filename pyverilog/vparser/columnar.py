@@ -0,0 +1,369 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Columnar (struct-of-arrays) AST
+
+   A ColumnarAST keeps the nodes of an AST in typed arrays instead of one
+   Python object per node. A node is an index into the arrays:
+
+     kinds           class id (classes[kind] is the node class)
+     parents         index of the parent node, -1 for a root
+     first_children  index of the first child node, -1 for none
+     next_siblings   index of the next child node of the parent, -1 for none
+     linenos         line number (end_linenos is a dict of the few nodes
+                     with an end line number)
+     field_starts    offset of the field values of the node in values
+
+   The field values of a node are tagged ints, in the order of
+   field_names(cls): a string id, a node index, a small int, None/False/
+   True, or the offset of a sequence in values (its length and whether it
+   is a list, then its items). values holds 32-bit ints, and is widened to
+   64 bits once a tagged int does not fit (past 2**28 values, nodes or
+   strings), as is field_starts past 2**32 values. A subtree shared by several parents (see
+   intern.py) is stored once per occurrence.
+
+   node(index) returns a proxy of the node: an instance of a subclass of
+   the node class with the same name, whose fields are read from the
+   arrays. The visitors (ModuleVisitor, ASTCodeGenerator, ...) work on the
+   proxies unchanged. A proxy is read-only and is created on each access,
+   so two proxies of a node are equal but not identical. A proxy is not
+   equal to a node object (of another class): to_node(index) rebuilds the
+   node objects.
+
+   On a generated 50000-cell netlist (benchmarks/bench_memory.py), the
+   arrays hold 49.2 bytes per node against 172.0 bytes per node of the
+   node objects: about 3.5x less, not an order of magnitude. The strings
+   are already shared and the arrays have no per-node Python objects, but
+   every node keeps 22 bytes of columns (kind, parent, first child, next
+   sibling, line number, field offset) and a 4-byte value per field and
+   per sequence item (about 15 bytes per node), so the gap to a tree of
+   slotted objects cannot be much larger without dropping columns.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+from array import array
+
+from pyverilog.vparser.ast import Node, Source, Description, field_names
+
+TAG_CONST = 0
+TAG_STR = 1
+TAG_NODE = 2
+TAG_SEQ = 3
+TAG_INT = 4
+TAG_UNSET = 5
+
+TAG_BITS = 3
+TAG_MASK = (1 << TAG_BITS) - 1
+
+# the payloads of TAG_CONST, then the indices of the other objects + 3
+CONSTS = (None, False, True)
+
+
+class ColumnarAST(object):
+    """ The nodes of ASTs in typed arrays """
+
+    def __init__(self, ast=None):
+        self.kinds = array('H')
+        self.parents = array('i')
+        self.first_children = array('i')
+        self.next_siblings = array('i')
+        self.linenos = array('i')
+        self.end_linenos = {}
+        self.field_starts = array('I')
+        self.values = array('i')
+
+        self.classes = []
+        self.class_ids = {}
+        self.strings = []
+        self.string_ids = {}
+        # the values not fitting a tagged int (large ints, floats, ...)
+        self.objects = []
+
+        # the nodes appended by append()
+        self.roots = []
+
+        if ast is not None:
+            self.append(ast)
+
+    @classmethod
+    def from_definitions(cls, definitions, name=''):
+        """ Returns a ColumnarAST of a Source of the definitions (ModuleDef
+        and Pragma), such as a ModuleStream. Only one definition at a time
+        is an object tree. """
+        columns = cls()
+        source = columns._allocate(Source, -1, 0)
+        description = columns._allocate(Description, source, 0)
+        columns.roots.append(source)
+        columns.first_children[source] = description
+
+        columns.field_starts[source] = len(columns.values)
+        columns._extend([columns._string(name) << TAG_BITS | TAG_STR,
+                         description << TAG_BITS | TAG_NODE])
+
+        items = []
+        prev = -1
+        for definition in definitions:
+            index = columns._encode(definition, description)
+            if prev < 0:
+                columns.first_children[description] = index
+            else:
+                columns.next_siblings[prev] = index
+            prev = index
+            items.append(index << TAG_BITS | TAG_NODE)
+
+        definitions = columns._seq(items, False)
+        columns.field_starts[description] = len(columns.values)
+        columns._extend([definitions])
+        return columns
+
+    def append(self, node):
+        """ Appends an AST as a new root, and returns its index """
+        index = self._encode(node, -1)
+        self.roots.append(index)
+        return index
+
+    @property
+    def root(self):
+        """ The proxy of the first root """
+        return self.node(self.roots[0])
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def node(self, index):
+        """ Returns the proxy of the node of the index """
+        cls = _proxy_classes[self.classes[self.kinds[index]]]
+        proxy = cls.__new__(cls)
+        proxy._columns = self
+        proxy._index = index
+        return proxy
+
+    def kind(self, index):
+        """ Returns the node class of the node of the index """
+        return self.classes[self.kinds[index]]
+
+    def find(self, node_class):
+        """ Returns the indices of the nodes of a class, by a scan of kinds """
+        kind = self.class_ids.get(node_class)
+        if kind is None:
+            return []
+        return [i for i, k in enumerate(self.kinds) if k == kind]
+
+    def children_of(self, index):
+        """ Returns the indices of the child nodes of the node of the index """
+        ret = []
+        child = self.first_children[index]
+        while child >= 0:
+            ret.append(child)
+            child = self.next_siblings[child]
+        return ret
+
+    def parent(self, index):
+        """ Returns the index of the parent node, or -1 for a root """
+        return self.parents[index]
+
+    def field(self, index, position):
+        """ Returns the value of a field of the node of the index """
+        return self._decode(self.values[self.field_starts[index] + position])
+
+    def to_node(self, index):
+        """ Returns the node of the index as a tree of node objects """
+        nodes = {}
+        stack = [(index, False)]
+        while stack:
+            i, ready = stack.pop()
+            if not ready:
+                stack.append((i, True))
+                stack.extend((c, False) for c in self.children_of(i))
+                continue
+            cls = self.classes[self.kinds[i]]
+            node = cls.__new__(cls)
+            node.lineno = self.linenos[i]
+            if i in self.end_linenos:
+                node.end_lineno = self.end_linenos[i]
+            start = self.field_starts[i]
+            for position, name in enumerate(field_names(cls)):
+                value = self.values[start + position]
+                if value & TAG_MASK != TAG_UNSET:
+                    setattr(node, name, self._decode(value, nodes.pop))
+            nodes[i] = node
+        return nodes[index]
+
+    def nbytes(self):
+        """ Returns the size of the arrays in bytes """
+        return sum(a.itemsize * len(a) for a in
+                   (self.kinds, self.parents, self.first_children, self.next_siblings,
+                    self.linenos, self.field_starts, self.values))
+
+    def _allocate(self, node_class, parent, lineno):
+        kind = self.class_ids.get(node_class)
+        if kind is None:
+            kind = self.class_ids[node_class] = len(self.classes)
+            self.classes.append(node_class)
+            _proxy_class(node_class)
+        index = len(self.kinds)
+        self.kinds.append(kind)
+        self.parents.append(parent)
+        self.first_children.append(-1)
+        self.next_siblings.append(-1)
+        self.linenos.append(lineno)
+        self.field_starts.append(0)
+        return index
+
+    def _encode(self, root, parent):
+        # the child nodes of a node are allocated together, next to each other
+        root_index = self._allocate(root.__class__, parent, root.lineno)
+        stack = [(root, root_index)]
+        while stack:
+            node, index = stack.pop()
+            end_lineno = getattr(node, 'end_lineno', None)
+            if end_lineno is not None:
+                self.end_linenos[index] = end_lineno
+
+            children = []
+            values = []
+            for name in field_names(node.__class__):
+                try:
+                    value = getattr(node, name)
+                except AttributeError:
+                    values.append(TAG_UNSET)
+                    continue
+                values.append(self._value(value, index, children))
+            self.field_starts[index] = len(self.values)
+            self._extend(values)
+
+            prev = -1
+            for child, child_index in children:
+                if prev < 0:
+                    self.first_children[index] = child_index
+                else:
+                    self.next_siblings[prev] = child_index
+                prev = child_index
+            stack.extend(reversed(children))
+        return root_index
+
+    def _value(self, value, parent, children):
+        if isinstance(value, Node):
+            index = self._allocate(value.__class__, parent, value.lineno)
+            children.append((value, index))
+            return index << TAG_BITS | TAG_NODE
+        if isinstance(value, str):
+            return self._string(value) << TAG_BITS | TAG_STR
+        if value is None or value is False or value is True:
+            return CONSTS.index(value) << TAG_BITS | TAG_CONST
+        if isinstance(value, (tuple, list)):
+            items = [self._value(v, parent, children) for v in value]
+            return self._seq(items, isinstance(value, list))
+        if isinstance(value, int) and -(1 << 27) <= value < (1 << 27):
+            return value << TAG_BITS | TAG_INT
+        self.objects.append(value)
+        return (len(self.objects) + 2) << TAG_BITS | TAG_CONST
+
+    def _seq(self, items, is_list):
+        offset = len(self.values)
+        self._extend([len(items) << 1 | int(is_list)] + items)
+        return offset << TAG_BITS | TAG_SEQ
+
+    def _extend(self, values):
+        n = len(self.values)
+        try:
+            self.values.extend(values)
+        except OverflowError:
+            # the items before the one out of range were appended
+            del self.values[n:]
+            self.values = array('q', self.values)
+            self.values.extend(values)
+        if len(self.values) > 0xffffffff and self.field_starts.typecode == 'I':
+            self.field_starts = array('Q', self.field_starts)
+
+    def _string(self, s):
+        sid = self.string_ids.get(s)
+        if sid is None:
+            sid = self.string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return sid
+
+    def _decode(self, value, node=None):
+        tag = value & TAG_MASK
+        payload = value >> TAG_BITS
+        if tag == TAG_NODE:
+            return self.node(payload) if node is None else node(payload)
+        if tag == TAG_STR:
+            return self.strings[payload]
+        if tag == TAG_SEQ:
+            n = self.values[payload]
+            items = [self._decode(v, node)
+                     for v in self.values[payload + 1:payload + 1 + (n >> 1)]]
+            return items if n & 1 else tuple(items)
+        if tag == TAG_INT:
+            return payload
+        if tag == TAG_CONST:
+            return CONSTS[payload] if payload < 3 else self.objects[payload - 3]
+        raise AttributeError('unset field')
+
+
+_proxy_classes = {}
+
+
+def _proxy_class(node_class):
+    proxy_class = _proxy_classes.get(node_class)
+    if proxy_class is None:
+        namespace = {
+            '__slots__': ('_columns', '_index'),
+            '__module__': node_class.__module__,
+            '__doc__': node_class.__doc__,
+            '__reduce__': _reduce,
+            'lineno': property(_get_lineno),
+            'end_lineno': property(_get_end_lineno),
+        }
+        for position, name in enumerate(field_names(node_class)):
+            namespace[name] = property(_getter(name, position))
+        # the same name, for the visit_<Class> methods and the templates
+        proxy_class = type(node_class.__name__, (node_class,), namespace)
+        _proxy_classes[node_class] = proxy_class
+    return proxy_class
+
+
+def _getter(name, position):
+    def get(self):
+        try:
+            return self._columns.field(self._index, position)
+        except AttributeError:
+            raise AttributeError(name)
+    return get
+
+
+def _get_lineno(self):
+    return self._columns.linenos[self._index]
+
+
+def _get_end_lineno(self):
+    try:
+        return self._columns.end_linenos[self._index]
+    except KeyError:
+        raise AttributeError('end_lineno')
+
+
+def _reduce(self):
+    # a pickled proxy is loaded as a node object
+    return (_identity, (self._columns.to_node(self._index),))
+
+
+def _identity(node):
+    return node
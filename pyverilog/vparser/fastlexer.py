@@ -0,0 +1,239 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   High-throughput lexer engine
+
+   FastVerilogLexer produces the same tokens as VerilogLexer from the same
+   token patterns, without ply.lex. The patterns that can begin with the
+   current character are chosen from a table instead of trying all of them,
+   keywords are looked up in a table, single-character punctuation needs no
+   regular expression, and white spaces, newlines and comments are skipped
+   in runs whose newlines are counted at once. Tokens are yielded by a
+   generator, so that no rule function is called per token.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import re
+from functools import partial
+
+from ply.lex import LexToken
+
+from pyverilog.vparser.lexer import VerilogLexer
+
+
+class LexerState(object):
+    """ Position of the scanner, in place of a ply.lex.Lexer """
+
+    def __init__(self):
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lineno = 1
+
+
+class FastVerilogLexer(VerilogLexer):
+    """ Verilog HDL Lexical Analayzer (without ply.lex) """
+
+    # pattern-based tokens in the order of the rule functions of VerilogLexer
+    numbers = (
+        'FLOATNUMBER',
+        'SIGNED_INTNUMBER_BIN', 'INTNUMBER_BIN',
+        'SIGNED_INTNUMBER_OCT', 'INTNUMBER_OCT',
+        'SIGNED_INTNUMBER_HEX', 'INTNUMBER_HEX',
+        'SIGNED_INTNUMBER_DEC', 'INTNUMBER_DEC',
+    )
+
+    skip = r'(?:[ \t\n]+|//[^\n]*\n|/\*[\s\S]*?\*/)+'
+
+    identifier_start = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+
+    # the identifier pattern for an identifier_start (not an escaped identifier)
+    word = re.compile('[a-zA-Z_][a-zA-Z_0-9$]*').match
+
+    # first character -> token type (single-character punctuation) or
+    # the match function of the patterns that can begin with it
+    table = None
+    punctuation = None
+
+    @classmethod
+    def compile(cls):
+        if cls.table is not None:
+            return
+
+        punctuation = {}
+        for name in dir(VerilogLexer):
+            if name.startswith('t_') and isinstance(getattr(VerilogLexer, name), str):
+                if name == 't_ignore':
+                    continue
+                pattern = getattr(VerilogLexer, name)
+                punctuation[re.sub(r'\\(.)', r'\1', pattern)] = name[2:]
+
+        # the longest operator first, as ply.lex does
+        operators = sorted(punctuation, key=lambda x: (-len(x), x))
+        punct = '(?P<PUNCTUATION>%s)' % '|'.join([re.escape(op) for op in operators])
+
+        def group(name, pattern):
+            return '(?P<%s>%s)' % (name, pattern)
+
+        def alternatives(*patterns):
+            return re.compile('|'.join(patterns)).match
+
+        identifier = alternatives(group('ID', cls._pattern('ID')))
+        number = alternatives(*[group(rule, cls._pattern(rule)) for rule in cls.numbers])
+        skip_or_punct = alternatives(group('SKIP', cls.skip), punct)
+        float_or_punct = alternatives(group('FLOATNUMBER', cls._pattern('FLOATNUMBER')), punct)
+        punct_only = alternatives(punct)
+
+        table = {}
+        for c in map(chr, range(128)):
+            if c in cls.identifier_start or c == '\\':
+                table[c] = identifier
+            elif c.isdigit() or c == "'":
+                table[c] = number
+            elif c in ' \t\n/':
+                table[c] = skip_or_punct
+            elif c == '.':
+                table[c] = float_or_punct
+            elif c == '`':
+                table[c] = alternatives(group('DIRECTIVE', VerilogLexer.directive))
+            elif c == '"':
+                table[c] = alternatives(group('STRING_LITERAL', cls._pattern('STRING_LITERAL')))
+            elif any([op.startswith(c) for op in operators]):
+                if c in punctuation and not any([op.startswith(c) and op != c
+                                                 for op in operators]):
+                    table[c] = punctuation[c]
+                else:
+                    table[c] = punct_only
+
+        cls.punctuation = punctuation
+        cls.table = table
+
+    @staticmethod
+    def _pattern(rule):
+        return getattr(VerilogLexer, 't_' + rule).regex
+
+    def build(self, **kwargs):
+        self.compile()
+        self.lexer = LexerState()
+        self.scanner = iter(())
+        self.token = self._no_input
+
+    def input(self, data):
+        self.lexer.lexdata = data
+        self.lexer.lexpos = 0
+        self.scanner = self._scan(data)
+        self.token = partial(next, self.scanner, None)
+
+    def seek(self, pos, lineno):
+        """ Restarts the scan of the current input at pos (at line lineno) """
+        self.lexer.lineno = lineno
+        self.scanner = self._scan(self.lexer.lexdata, pos)
+        self.token = partial(next, self.scanner, None)
+
+    def _no_input(self):
+        return None
+
+    def _scan(self, data, pos=0):
+        table = self.table
+        identifier_start = self.identifier_start
+        word = self.word
+        punctuation = self.punctuation
+        reserved = self.reserved
+        count = data.count
+        state = self.lexer
+
+        end = len(data)
+        lineno = state.lineno
+
+        while pos < end:
+            c = data[pos]
+
+            # a single space is the most common separator
+            if c == ' ':
+                pos += 1
+                if pos == end:
+                    break
+                c = data[pos]
+
+            if c in identifier_start:
+                value = word(data, pos).group()
+                npos = pos + len(value)
+                toktype = reserved.get(value, 'ID')
+
+            else:
+                entry = table.get(c)
+                if entry.__class__ is str:
+                    value = c
+                    npos = pos + 1
+                    toktype = entry
+                else:
+                    m = entry(data, pos) if entry is not None else None
+                    if m is None:
+                        state.lineno = lineno
+                        state.lexpos = pos
+                        self._illegal(data, pos, lineno)
+                        pos += 1
+                        continue
+
+                    kind = m.lastgroup
+                    value = m.group()
+                    npos = m.end()
+
+                    if kind == 'SKIP':
+                        lineno += count('\n', pos, npos)
+                        pos = npos
+                        continue
+
+                    if kind == 'DIRECTIVE':
+                        self.directives.append((lineno, value))
+                        lineno += 1
+                        if value.startswith('`default_nettype'):
+                            d = re.match(r"^`default_nettype\s+(.+)\n", value)
+                            if d:
+                                self.default_nettype = d.group(1)
+                        pos = npos
+                        continue
+
+                    if kind == 'PUNCTUATION':
+                        toktype = punctuation[value]
+                    elif kind == 'ID':
+                        toktype = reserved.get(value, 'ID')
+                    else:
+                        toktype = kind
+
+            tok = LexToken()
+            tok.type = toktype
+            tok.value = value
+            tok.lineno = lineno
+            tok.lexpos = pos
+            pos = npos
+
+            yield tok
+
+        state.lineno = lineno
+        state.lexpos = pos
+
+    def _illegal(self, data, pos, lineno):
+        tok = LexToken()
+        tok.type = 'error'
+        tok.value = data[pos:]
+        tok.lineno = lineno
+        tok.lexpos = pos
+        msg = 'Illegal character %s' % repr(data[pos])
+        location = self._make_tok_location(tok)
+        self.error_func(msg, location[0], location[1])
@@ -0,0 +1,106 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Hash-consing of AST subtrees
+
+   An Interner keeps one instance of every distinct expression subtree
+   (constants, identifiers, widths, operators, selects, ...). A node of the
+   same class, attributes and children as an earlier one is replaced by the
+   earlier one. As the children are interned first, the node is looked up
+   by the identities of its children, without walking the subtree.
+   The structural hash of an interned node is computed once and cached.
+
+   An interned node is shared by all the places it occurs in: it keeps the
+   line number of its first occurrence, and it must not be modified.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+
+from pyverilog.vparser.ast import *
+
+# the node classes interned by default: expressions without side effects
+INTERNED = (Constant, Identifier, IdentifierScope, IdentifierScopeLabel,
+            Width, Dimensions, Operator, Partselect, Pointer, Concat, Repeat,
+            Lvalue, Rvalue, FunctionCall)
+
+
+class Interner(object):
+    """ Table of the interned nodes """
+
+    def __init__(self, classes=INTERNED):
+        self.classes = tuple(classes)
+        self.table = {}
+        # the number of nodes replaced by an interned one
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    def clear(self):
+        self.table = {}
+        self.hits = 0
+
+    def intern(self, node, deep=False):
+        """ Returns the interned node structurally identical to node.
+        The children not interned yet are interned first: the ones of the
+        interned classes, or all of them (the whole subtree) if deep. """
+        if not isinstance(node, Node) or getattr(node, '_hash', None) is not None:
+            return node
+
+        classes = self.classes
+        key = [node.__class__]
+        for name in node.child_names:
+            value = getattr(node, name, None)
+            if isinstance(value, Node):
+                if deep or isinstance(value, classes):
+                    child = self.intern(value, deep)
+                    if child is not value:
+                        setattr(node, name, child)
+                        value = child
+                key.append(id(value))
+            elif isinstance(value, (tuple, list)):
+                items = [self.intern(v, deep) if deep or isinstance(v, classes) else v
+                         for v in value]
+                if any(a is not b for a, b in zip(items, value)):
+                    value = type(value)(items)
+                    setattr(node, name, value)
+                key.append(tuple([id(v) for v in value]))
+            else:
+                key.append(value)
+
+        if not isinstance(node, classes):
+            return node
+
+        for name in node.attr_names:
+            if name not in node.child_names:
+                key.append(getattr(node, name))
+        key = tuple(key)
+
+        try:
+            interned = self.table.get(key)
+        except TypeError:
+            # an unhashable attribute
+            return node
+        if interned is not None:
+            self.hits += 1
+            return interned
+
+        node._hash = hash(node)
+        self.table[key] = node
+        return node
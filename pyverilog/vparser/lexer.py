@@ -22,6 +22,17 @@ import re
 
 from ply.lex import *
 
+from pyverilog.vparser.source import LineIndex
+
+LEXER_ENGINES = ('ply', 'fast')
+
+
+def default_lexer_engine():
+    engine = os.environ.get('PYVERILOG_LEXER')
+    if engine:
+        return engine
+    return 'ply'
+
 
 class VerilogLexer(object):
     """ Verilog HDL Lexical Analayzer """
@@ -31,6 +42,7 @@ class VerilogLexer(object):
         self.error_func = error_func
         self.directives = []
         self.default_nettype = 'wire'
+        self.line_index = None
 
     def build(self, **kwargs):
         self.lexer = lex(object=self, **kwargs)
@@ -41,6 +53,11 @@ class VerilogLexer(object):
     def reset_lineno(self):
         self.lexer.lineno = 1
 
+    def reset(self, lineno=1, default_nettype='wire'):
+        self.directives = []
+        self.default_nettype = default_nettype
+        self.lexer.lineno = lineno
+
     def get_directives(self):
         return tuple(self.directives)
 
@@ -50,6 +67,13 @@ class VerilogLexer(object):
     def token(self):
         return self.lexer.token()
 
+    def get_line_index(self):
+        """ Returns the LineIndex of the current input, built on the first call """
+        lexdata = self.lexer.lexdata
+        if self.line_index is None or self.line_index.text is not lexdata:
+            self.line_index = LineIndex(lexdata)
+        return self.line_index
+
     keywords = (
         'MODULE', 'ENDMODULE', 'BEGIN', 'END', 'GENERATE', 'ENDGENERATE', 'GENVAR',
         'FUNCTION', 'ENDFUNCTION', 'TASK', 'ENDTASK',
@@ -264,10 +288,9 @@ class VerilogLexer(object):
         self.lexer.skip(1)
 
     def _find_tok_column(self, token):
-        i = token.lexpos
-        while i > 0:
-            if self.lexer.lexdata[i] == '\n':
-                break
+        # counted from the preceding newline (or the beginning of the input)
+        i = self.get_line_index().line_start(token.lexpos)
+        if i > 0:
             i -= 1
         return (token.lexpos - i) + 1
 
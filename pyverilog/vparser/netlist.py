@@ -0,0 +1,623 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Fast-path reader of structural (gate-level) netlists
+
+   NetlistParser reads modules consisting only of signal declarations,
+   assign statements and module instances, whose expressions are
+   identifiers, bit/part selects, constants and concatenations, without the
+   LALR parser. The same AST (node classes and line numbers) as VerilogParser
+   is built. A module using anything else is parsed by VerilogParser.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import re
+import threading
+from functools import partial
+
+from ply.lex import LexToken
+
+from pyverilog.vparser.ast import *
+from pyverilog.vparser.fastlexer import FastVerilogLexer
+from pyverilog.vparser.parser import get_default_parser
+
+SIGTYPES = frozenset(['INPUT', 'OUTPUT', 'INOUT', 'TRI', 'REG', 'LOGIC', 'WIRE', 'SIGNED',
+                      'SUPPLY0', 'SUPPLY1'])
+
+INTNUMBERS = frozenset(['INTNUMBER_DEC', 'SIGNED_INTNUMBER_DEC',
+                        'INTNUMBER_BIN', 'SIGNED_INTNUMBER_BIN',
+                        'INTNUMBER_OCT', 'SIGNED_INTNUMBER_OCT',
+                        'INTNUMBER_HEX', 'SIGNED_INTNUMBER_HEX'])
+
+# an instance with named port connections of identifiers and bit/part
+# selects only, written without comments, e.g. 'NAND2X1 U1 (.A(a), .B(b[0]), .Y(n1));'
+_space = r'[ \t\n]*'
+_id = r'[a-zA-Z_][a-zA-Z_0-9$]*'
+_num = r'[0-9][0-9_]*'
+instance_head = re.compile(r'(%s)[ \t\n]+(%s)%s\(' % (_id, _id, _space))
+instance_port = re.compile(r'%s(\.)%s(%s)%s\(%s(?:(%s)(?:%s\[%s(%s)%s(?::%s(%s)%s)?\])?%s)?\)%s(,?)' %
+                           (_space, _space, _id, _space, _space, _id, _space, _space, _num, _space,
+                            _space, _num, _space, _space, _space))
+instance_tail = re.compile(r'%s\)%s;' % (_space, _space))
+
+# a declaration of identifiers with an optional constant width, e.g. 'output [3:0] a, b;'
+decl_simple = re.compile(r'((?:(?:input|output|inout|wire|reg|tri)[ \t\n]+)+)'
+                         r'(?:(\[)%s(%s)%s:%s(%s)%s\]%s)?(%s(?:%s,%s%s)*)%s;' %
+                         (_space, _num, _space, _space, _num, _space, _space,
+                          _id, _space, _space, _id, _space))
+decl_names = re.compile(_id)
+SIGWORDS = frozenset(['input', 'output', 'inout', 'wire', 'reg', 'tri'])
+
+space = re.compile(_space).match
+word = re.compile(_id).match
+
+
+class Unsupported(Exception):
+    """ The module is not in the netlist subset.
+    The argument is the last token read. """
+    pass
+
+
+class NetlistParser(object):
+    """ Parser of structural netlists with the interface of VerilogParser.
+    parser is the VerilogParser for the other modules. """
+
+    def __init__(self, parser=None):
+        if parser is None:
+            parser = get_default_parser()
+        self.parser = parser
+        self.lexer = FastVerilogLexer(error_func=parser._lexer_error_func)
+        self.lexer.build()
+
+        # the number of modules of the last parse
+        self.fast_modules = 0
+        self.fallback_modules = 0
+
+    def get_directives(self):
+        return self.lexer.get_directives()
+
+    def get_default_nettype(self):
+        return self.lexer.get_default_nettype()
+
+    def parse(self, text, debug=0, lineno=1, default_nettype='wire', source_map=None):
+        # source_map is for the spans, which a netlist parser does not record
+        self.fast_modules = 0
+        self.fallback_modules = 0
+
+        end = LexToken()
+        end.type = '$end'
+        end.value = ''
+        end.lineno = 0
+        end.lexpos = len(text)
+        self.end = end
+
+        self.text = text
+        self.lexer.reset(lineno, default_nettype)
+        self.lexer.input(text)
+        self.next_token = partial(next, self.lexer.scanner, end)
+
+        definitions = []
+        self.tok = self.next_token()
+        while self.tok.type != '$end':
+            if self.tok.type != 'MODULE':
+                # a pragma or a syntax error
+                return self._parse_all(text, debug, lineno, default_nettype)
+            definitions.append(self._moduledef(debug))
+            self.tok = self.next_token()
+
+        if not definitions:
+            return self._parse_all(text, debug, lineno, default_nettype)
+
+        first = definitions[0].lineno
+        description = Description(definitions=tuple(definitions), lineno=first)
+        return Source(name='', description=description, lineno=first)
+
+    def _parse_all(self, text, debug, lineno, default_nettype):
+        ast = self.parser.parse(text, debug, lineno, default_nettype)
+        self.lexer.directives = list(self.parser.get_directives())
+        self.lexer.default_nettype = self.parser.get_default_nettype()
+        self.fast_modules = 0
+        self.fallback_modules = len(ast.description.definitions)
+        return ast
+
+    def _moduledef(self, debug):
+        start = self.tok
+        default_nettype = self.lexer.get_default_nettype()
+        try:
+            module = self._module()
+            self.fast_modules += 1
+            if self.parser.interner is not None:
+                module = self.parser.interner.intern(module, deep=True)
+            return module
+        except Unsupported as e:
+            # the last token read
+            self.tok = e.args[0]
+
+        # the text from 'module' to 'endmodule' by the general parser
+        while self.tok.type != 'ENDMODULE' and self.tok.type != '$end':
+            self.tok = self.next_token()
+        end = self.tok.lexpos + len(self.tok.value)
+        ast = self.parser.parse(self.text[start.lexpos:end], debug,
+                                start.lineno, default_nettype)
+        self.fallback_modules += 1
+        return ast.description.definitions[0]
+
+    def _module(self):
+        next_token = self.next_token
+        module_lineno = self.tok.lineno
+
+        tok = next_token()
+        if tok.type != 'ID' and tok.type != 'SENS_OR':
+            raise Unsupported(tok)
+        name = tok.value
+
+        tok = next_token()
+        if tok.type == 'SEMICOLON':
+            portlist = Portlist(ports=(), lineno=tok.lineno)
+        elif tok.type == 'LPAREN':
+            portlist_lineno = tok.lineno
+            tok = next_token()
+            names = []
+            first = tok.lineno
+            if tok.type != 'RPAREN':
+                while True:
+                    if tok.type != 'ID':
+                        raise Unsupported(tok)
+                    names.append(tok.value)
+                    tok = next_token()
+                    if tok.type != 'COMMA':
+                        break
+                    tok = next_token()
+            if tok.type != 'RPAREN':
+                raise Unsupported(tok)
+            tok = next_token()
+            if tok.type != 'SEMICOLON':
+                raise Unsupported(tok)
+            ports = tuple([Port(name=n, width=None, dimensions=None, type=None, lineno=first)
+                           for n in names])
+            portlist = Portlist(ports=ports, lineno=portlist_lineno)
+        else:
+            raise Unsupported(tok)
+
+        items = []
+        self.tok = next_token()
+
+        # the simple items are read directly from the text (at pos) without the tokens
+        # until an item that is not in the simple form
+        text = self.text
+        reserved = self.lexer.reserved
+        pos = None
+
+        while True:
+            if pos is not None:
+                m = space(text, pos)
+                if m.end() != pos:
+                    lineno += text.count('\n', pos, m.end())
+                    pos = m.end()
+                m = word(text, pos)
+                ret = None
+                if m is None:
+                    pass
+                elif m.group() not in reserved:
+                    ret = self._simple_instance(pos, lineno)
+                elif m.group() in SIGWORDS:
+                    ret = self._simple_decl(pos, lineno)
+                if ret is not None:
+                    item, pos, lineno = ret
+                    items.append(item)
+                    continue
+                self._seek(pos, lineno)
+                pos = None
+
+            kind = self.tok.type
+            ret = None
+            if kind == 'ID':
+                ret = self._simple_instance(self.tok.lexpos, self.tok.lineno)
+                if ret is None:
+                    items.append(self._instance())
+            elif kind in SIGTYPES:
+                ret = self._simple_decl(self.tok.lexpos, self.tok.lineno)
+                if ret is None:
+                    items.append(self._decl())
+            elif kind == 'SENS_OR':
+                items.append(self._instance())
+            elif kind == 'ASSIGN':
+                items.append(self._assign())
+            elif kind == 'ENDMODULE':
+                break
+            else:
+                raise Unsupported(self.tok)
+
+            if ret is not None:
+                item, pos, lineno = ret
+                items.append(item)
+
+        module = ModuleDef(name=name, paramlist=Paramlist(params=()), portlist=portlist,
+                           items=tuple(items), default_nettype=self.get_default_nettype(),
+                           lineno=module_lineno)
+        module.end_lineno = self.tok.lineno
+        return module
+
+    def _simple_instance(self, start, lineno):
+        """ Reads an instance at start directly from the text.
+        Returns (node, end, end_lineno), or None if the instance is not in the simple form. """
+        text = self.text
+        reserved = self.lexer.reserved
+
+        m = instance_head.match(text, start)
+        if m is None or m.group(1) in reserved or m.group(2) in reserved:
+            return None
+        module = m.group(1)
+        name = m.group(2)
+
+        ports = []
+        pos = m.end()
+        while True:
+            m = instance_port.match(text, pos)
+            if m is None:
+                return None
+            portname, argname, msb, lsb, comma = m.group(2, 3, 4, 5, 6)
+            if portname in reserved or argname in reserved:
+                return None
+
+            if argname is None:
+                arg = None
+            else:
+                arg_lineno = msb_lineno = lsb_lineno = lineno
+                if text.find('\n', start, m.end()) >= 0:
+                    arg_lineno = lineno + text.count('\n', start, m.start(3))
+                    if msb is not None:
+                        msb_lineno = lineno + text.count('\n', start, m.start(4))
+                    if lsb is not None:
+                        lsb_lineno = lineno + text.count('\n', start, m.start(5))
+                arg = Identifier(argname, lineno=arg_lineno)
+                if lsb is not None:
+                    arg = Partselect(arg, IntConst(msb, lineno=msb_lineno),
+                                     IntConst(lsb, lineno=lsb_lineno), lineno=arg_lineno)
+                elif msb is not None:
+                    arg = Pointer(arg, IntConst(msb, lineno=msb_lineno), lineno=arg_lineno)
+
+            dot_lineno = lineno
+            if text.find('\n', start, m.start(1)) >= 0:
+                dot_lineno = lineno + text.count('\n', start, m.start(1))
+            ports.append(PortArg(portname, arg, lineno=dot_lineno))
+            pos = m.end()
+            if not comma:
+                break
+
+        m = instance_tail.match(text, pos)
+        if m is None:
+            return None
+        end = m.end()
+        end_lineno = lineno + text.count('\n', start, end)
+
+        instance = Instance(module, name, tuple(ports), (), None, lineno=lineno)
+        instancelist = InstanceList(module, (), (instance,), lineno=lineno)
+        instancelist.end_lineno = end_lineno
+        return instancelist, end, end_lineno
+
+    def _simple_decl(self, start, lineno):
+        """ Reads a declaration at start directly from the text.
+        Returns (node, end, end_lineno), or None if the declaration is not in the simple form. """
+        text = self.text
+        reserved = self.lexer.reserved
+
+        m = decl_simple.match(text, start)
+        if m is None:
+            return None
+        names = decl_names.findall(m.group(5))
+        for name in names:
+            if name in reserved:
+                return None
+
+        end = m.end()
+        width_lineno = msb_lineno = lsb_lineno = name_lineno = end_lineno = lineno
+        if text.find('\n', start, end) >= 0:
+            count = text.count
+            if m.group(2) is not None:
+                width_lineno = lineno + count('\n', start, m.start(2))
+                msb_lineno = lineno + count('\n', start, m.start(3))
+                lsb_lineno = lineno + count('\n', start, m.start(4))
+            name_lineno = lineno + count('\n', start, m.start(5))
+            end_lineno = lineno + count('\n', start, end)
+
+        width = None
+        if m.group(2) is not None:
+            width = Width(IntConst(m.group(3), lineno=msb_lineno),
+                          IntConst(m.group(4), lineno=lsb_lineno), lineno=width_lineno)
+
+        sigtypes = tuple(m.group(1).split())
+        decllist = []
+        for name in names:
+            decllist.extend(self.parser.create_decl(sigtypes, name, width=width,
+                                                    lineno=name_lineno))
+        return Decl(tuple(decllist), lineno=lineno), end, end_lineno
+
+    def _seek(self, pos, lineno):
+        """ Reads the tokens from pos """
+        self.lexer.seek(pos, lineno)
+        self.next_token = partial(next, self.lexer.scanner, self.end)
+        self.tok = self.next_token()
+
+    def _instance(self):
+        next_token = self.next_token
+        module = self.tok.value
+        lineno = self.tok.lineno
+
+        tok = next_token()
+        parameterlist = ()
+        if tok.type == 'DELAY':
+            parameterlist = self._parameterlist()
+            tok = self.tok
+
+        instances = []
+        while True:
+            if tok.type != 'ID':
+                raise Unsupported(tok)
+            name = tok.value
+            tok = next_token()
+            if tok.type != 'LPAREN':
+                raise Unsupported(tok)
+
+            ports = []
+            tok = next_token()
+            if tok.type == 'DOT':
+                while True:
+                    dot_lineno = tok.lineno
+                    tok = next_token()
+                    if tok.type != 'ID':
+                        raise Unsupported(tok)
+                    portname = tok.value
+                    tok = next_token()
+                    if tok.type != 'LPAREN':
+                        raise Unsupported(tok)
+                    tok = next_token()
+                    if tok.type == 'RPAREN':
+                        arg = None
+                    else:
+                        self.tok = tok
+                        arg = self._expression()
+                        if self.tok.type != 'RPAREN':
+                            raise Unsupported(self.tok)
+                    ports.append(PortArg(portname, arg, lineno=dot_lineno))
+                    tok = next_token()
+                    if tok.type != 'COMMA':
+                        break
+                    tok = next_token()
+                    if tok.type != 'DOT':
+                        raise Unsupported(tok)
+
+            elif tok.type != 'RPAREN':
+                self.tok = tok
+                while True:
+                    arg = self._expression()
+                    ports.append(PortArg(None, arg, lineno=arg.lineno))
+                    if self.tok.type != 'COMMA':
+                        break
+                    self.tok = next_token()
+                tok = self.tok
+
+            if tok.type != 'RPAREN':
+                raise Unsupported(tok)
+            instances.append(Instance(module, name, tuple(ports), parameterlist, None,
+                                      lineno=lineno))
+            tok = next_token()
+            if tok.type != 'COMMA':
+                break
+            tok = next_token()
+
+        if tok.type != 'SEMICOLON':
+            raise Unsupported(tok)
+        instancelist = InstanceList(module, parameterlist, tuple(instances), lineno=lineno)
+        instancelist.end_lineno = tok.lineno
+        self.tok = next_token()
+        return instancelist
+
+    def _parameterlist(self):
+        next_token = self.next_token
+        tok = next_token()
+        if tok.type != 'LPAREN':
+            raise Unsupported(tok)
+
+        params = []
+        tok = next_token()
+        if tok.type == 'DOT':
+            while True:
+                dot_lineno = tok.lineno
+                tok = next_token()
+                if tok.type != 'ID':
+                    raise Unsupported(tok)
+                paramname = tok.value
+                tok = next_token()
+                if tok.type != 'LPAREN':
+                    raise Unsupported(tok)
+                self.tok = next_token()
+                arg = self._expression()
+                if self.tok.type != 'RPAREN':
+                    raise Unsupported(self.tok)
+                params.append(ParamArg(paramname, arg, lineno=dot_lineno))
+                tok = next_token()
+                if tok.type != 'COMMA':
+                    break
+                tok = next_token()
+                if tok.type != 'DOT':
+                    raise Unsupported(tok)
+
+        elif tok.type != 'RPAREN':
+            self.tok = tok
+            while True:
+                arg = self._expression()
+                params.append(ParamArg(None, arg, lineno=arg.lineno))
+                if self.tok.type != 'COMMA':
+                    break
+                self.tok = next_token()
+            tok = self.tok
+
+        if tok.type != 'RPAREN':
+            raise Unsupported(tok)
+        self.tok = next_token()
+        return tuple(params)
+
+    def _decl(self):
+        next_token = self.next_token
+        tok = self.tok
+        lineno = tok.lineno
+
+        sigtypes = []
+        while tok.type in SIGTYPES:
+            sigtypes.append(tok.value)
+            tok = next_token()
+
+        width = None
+        if tok.type == 'LBRACKET':
+            width_lineno = tok.lineno
+            self.tok = next_token()
+            msb = self._expression()
+            if self.tok.type != 'COLON':
+                raise Unsupported(self.tok)
+            self.tok = next_token()
+            lsb = self._expression()
+            if self.tok.type != 'RBRACKET':
+                raise Unsupported(self.tok)
+            width = Width(msb, lsb, lineno=width_lineno)
+            tok = next_token()
+
+        names = []
+        name_lineno = tok.lineno
+        while True:
+            if tok.type != 'ID':
+                raise Unsupported(tok)
+            names.append(tok.value)
+            tok = next_token()
+            if tok.type != 'COMMA':
+                break
+            tok = next_token()
+
+        if tok.type != 'SEMICOLON':
+            raise Unsupported(tok)
+
+        sigtypes = tuple(sigtypes)
+        decllist = []
+        for name in names:
+            decllist.extend(self.parser.create_decl(sigtypes, name, width=width,
+                                                    lineno=name_lineno))
+        self.tok = next_token()
+        return Decl(tuple(decllist), lineno=lineno)
+
+    def _assign(self):
+        next_token = self.next_token
+        lineno = self.tok.lineno
+
+        self.tok = next_token()
+        left = self._lvalue()
+        if self.tok.type != 'EQUALS':
+            raise Unsupported(self.tok)
+        self.tok = next_token()
+        right = self._expression()
+        if self.tok.type != 'SEMICOLON':
+            raise Unsupported(self.tok)
+
+        assign = Assign(Lvalue(left, lineno=left.lineno), Rvalue(right, lineno=right.lineno),
+                        lineno=lineno)
+        assign.end_lineno = self.tok.lineno
+        self.tok = next_token()
+        return assign
+
+    def _lvalue(self):
+        tok = self.tok
+        if tok.type == 'ID':
+            return self._identifier()
+        if tok.type == 'LBRACE':
+            return self._concat(self._lvalue, LConcat)
+        raise Unsupported(tok)
+
+    def _expression(self):
+        tok = self.tok
+        kind = tok.type
+        if kind == 'ID':
+            return self._identifier()
+        if kind in INTNUMBERS:
+            node = IntConst(tok.value, lineno=tok.lineno)
+        elif kind == 'FLOATNUMBER':
+            node = FloatConst(tok.value, lineno=tok.lineno)
+        elif kind == 'STRING_LITERAL':
+            node = StringConst(tok.value[1:-1], lineno=tok.lineno)
+        elif kind == 'LBRACE':
+            return self._concat(self._expression, Concat)
+        else:
+            raise Unsupported(tok)
+        self.tok = self.next_token()
+        return node
+
+    def _identifier(self):
+        next_token = self.next_token
+        tok = self.tok
+        lineno = tok.lineno
+        var = Identifier(tok.value, lineno=lineno)
+
+        tok = next_token()
+        while tok.type == 'LBRACKET':
+            self.tok = next_token()
+            index = self._expression()
+            if self.tok.type == 'RBRACKET':
+                var = Pointer(var, index, lineno=lineno)
+                tok = next_token()
+            elif self.tok.type == 'COLON':
+                self.tok = next_token()
+                lsb = self._expression()
+                if self.tok.type != 'RBRACKET':
+                    raise Unsupported(self.tok)
+                var = Partselect(var, index, lsb, lineno=lineno)
+                tok = next_token()
+                if tok.type == 'LBRACKET':
+                    raise Unsupported(tok)
+            else:
+                raise Unsupported(self.tok)
+
+        if tok.type == 'DOT':
+            # a hierarchical identifier
+            raise Unsupported(tok)
+        self.tok = tok
+        return var
+
+    def _concat(self, element, cls):
+        next_token = self.next_token
+        lineno = self.tok.lineno
+
+        self.tok = next_token()
+        items = [element()]
+        while self.tok.type == 'COMMA':
+            self.tok = next_token()
+            items.append(element())
+        if self.tok.type != 'RBRACE':
+            raise Unsupported(self.tok)
+        self.tok = next_token()
+        return cls(tuple(items), lineno=lineno)
+
+
+# the default netlist parsers, one per thread
+_default_netlist_parsers = threading.local()
+
+
+def get_netlist_parser():
+    """ Returns the NetlistParser shared within the current thread """
+    parser = getattr(_default_netlist_parsers, 'parser', None)
+    if parser is None:
+        parser = _default_netlist_parsers.parser = NetlistParser()
+    return parser
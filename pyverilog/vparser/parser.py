@@ -18,12 +18,23 @@ from __future__ import absolute_import
 from __future__ import print_function
 import sys
 import os
+import io
+import re
 import pathlib
-from ply.yacc import yacc
+import threading
+import concurrent.futures
+from ply.yacc import yacc, YaccSymbol
 
 from pyverilog.vparser.preprocessor import VerilogPreprocessor
-from pyverilog.vparser.lexer import VerilogLexer
+from pyverilog.vparser.cache import get_cache
+from pyverilog.vparser.lexer import VerilogLexer, LEXER_ENGINES, default_lexer_engine
+from pyverilog.vparser.fastlexer import FastVerilogLexer
 from pyverilog.vparser.ast import *
+from pyverilog.vparser.intern import Interner
+from pyverilog.vparser.source import SourceBuffer, Span
+
+# Prebuilt LALR table module shipped with the package (see write_parsetab)
+PARSETAB_MODULE = 'pyverilog.vparser.parsetab'
 
 
 class VerilogParser(object):
@@ -49,22 +60,136 @@ class VerilogParser(object):
         # -> Strong
     )
 
-    def __init__(self, outputdir=".", debug=True):
-        self.lexer = VerilogLexer(error_func=self._lexer_error_func)
+    def __init__(self, outputdir=None, debug=False, lexer_engine=None, intern=False,
+                 spans=False):
+        if intern and spans:
+            # an interned node is shared by its occurrences, with their spans
+            raise ValueError('intern and spans cannot be used together')
+
+        if lexer_engine is None:
+            lexer_engine = default_lexer_engine()
+
+        if lexer_engine not in LEXER_ENGINES:
+            raise ValueError("unknown lexer engine: '%s'" % lexer_engine)
+
+        if lexer_engine == 'fast':
+            self.lexer = FastVerilogLexer(error_func=self._lexer_error_func)
+        else:
+            self.lexer = VerilogLexer(error_func=self._lexer_error_func)
         self.lexer.build()
 
         self.tokens = self.lexer.tokens
-        pathlib.Path(outputdir).mkdir(parents=True, exist_ok=True)
-        self.parser = yacc(
-            module=self,
-            method="LALR",
-            outputdir=outputdir,
-            debug=debug
-        )
+
+        if debug:
+            # validate (or rebuild) the tables against the grammar and
+            # write parsetab.py and parser.out into outputdir
+            if outputdir is None:
+                outputdir = '.'
+            pathlib.Path(outputdir).mkdir(parents=True, exist_ok=True)
+            self.parser = yacc(
+                module=self,
+                method="LALR",
+                outputdir=outputdir,
+                debug=debug
+            )
+        else:
+            # load the prebuilt tables as is: no signature check, no file writes
+            self.parser = yacc(
+                module=self,
+                method="LALR",
+                tabmodule=PARSETAB_MODULE,
+                optimize=True,
+                write_tables=False,
+                debug=False
+            )
+
+        # spans=True: each node built by a rule records the Span of the
+        # symbols of the rule in the parsed text
+        self.spans = spans
+        self.buffer = None
+        if spans:
+            for production in self.parser.productions:
+                if production.callable is not None:
+                    production.callable = self._spanning(production.callable)
+
+        # intern=True: the expression subtrees are hash-consed as they are
+        # reduced, and shared within the ASTs built by this parser
+        self.interner = None
+        if intern:
+            self.interner = Interner()
+            for production in self.parser.productions:
+                if production.callable is not None:
+                    production.callable = self._interning(production.callable)
+
+    def _interning(self, action):
+        intern = self.interner.intern
+
+        def interning_action(p):
+            action(p)
+            p.slice[0].value = intern(p.slice[0].value)
+        return interning_action
+
+    def _spanning(self, action):
+        def spanning_action(p):
+            action(p)
+            start = end = None
+            for sym in p.slice[1:]:
+                if sym.__class__ is YaccSymbol:
+                    # a nonterminal: the range of its rule, if not empty
+                    sym_start = getattr(sym, 'span_start', None)
+                    if sym_start is None:
+                        continue
+                    sym_end = sym.span_end
+                else:
+                    # a token: the value is the text as is
+                    sym_start = sym.lexpos
+                    sym_end = sym.lexpos + len(sym.value)
+                if start is None:
+                    start = sym_start
+                end = sym_end
+            if start is None:
+                return
+            # the character offsets of the symbol, for the enclosing rules
+            target = p.slice[0]
+            target.span_start = start
+            target.span_end = end
+            node = target.value
+            # a node passed up by an enclosing rule keeps its first span
+            if not isinstance(node, Node) or getattr(node, 'span', None) is not None:
+                return
+            buffer = self.buffer
+            node.span = Span(buffer, buffer.byte_offset(start), buffer.byte_offset(end))
+            # the nodes built by this rule (as the Reg nodes of a declaration)
+            # span their name and their children in the text of the rule;
+            # the nodes without a text (as an empty Paramlist) have none
+            built = []
+            stack = list(node.children())
+            while stack:
+                child = stack.pop()
+                if getattr(child, 'span', None) is None:
+                    built.append(child)
+                    stack.extend(child.children())
+            for child in reversed(built):
+                child.span = self._built_span(child, start, end)
+        return spanning_action
+
+    def _built_span(self, node, start, end):
+        buffer = self.buffer
+        spans = [c.span for c in node.children() if c.span is not None]
+        name = getattr(node, 'name', None)
+        if isinstance(name, str) and name:
+            m = re.compile(r'(?<![\w$\\])%s(?![\w$])' % re.escape(name)).search(
+                buffer.text, start, end)
+            if m is not None:
+                spans.append(Span(buffer, buffer.byte_offset(m.start()),
+                                  buffer.byte_offset(m.end())))
+        if not spans:
+            return None
+        return Span(buffer, min([s.start for s in spans]), max([s.end for s in spans]))
 
     def _lexer_error_func(self, msg, line, column):
         coord = self._coord(line, column)
-        raise ParseError('%s: %s' % (coord, msg))
+        raise ParseError('%s: %s' % (coord, msg), msg, line, column)
 
     def get_directives(self):
         return self.lexer.get_directives()
@@ -73,7 +198,13 @@ class VerilogParser(object):
         return self.lexer.get_default_nettype()
 
     # Returns AST
-    def parse(self, text, debug=0):
+    # lineno and default_nettype are the state at the beginning of the text,
+    # for a text that is a fragment of a larger source; source_map maps the
+    # lines of a preprocessed text to the original source for the spans
+    def parse(self, text, debug=0, lineno=1, default_nettype='wire', source_map=None):
+        self.lexer.reset(lineno, default_nettype)
+        if self.spans:
+            self.buffer = SourceBuffer(text, lineno, self.lexer.filename, source_map)
         return self.parser.parse(text, lexer=self.lexer, debug=debug)
 
     # --------------------------------------------------------------------------
@@ -2305,11 +2436,10 @@ class VerilogParser(object):
         if p:
             msg = 'before: "%s"' % p.value
             coord = self._coord(p.lineno)
-        else:
-            msg = 'at end of input'
-            coord = None
+            raise ParseError("%s: %s" % (coord, msg), msg, p.lineno, pos=p.lexpos)
 
-        raise ParseError("%s: %s" % (coord, msg))
+        msg = 'at end of input'
+        raise ParseError("%s: %s" % (None, msg), msg)
 
     def _coord(self, lineno, column=None):
         ret = [self.lexer.filename]
@@ -2320,7 +2450,122 @@ class VerilogParser(object):
 
 
 class ParseError(Exception):
-    pass
+    """ msg is the message without the location. lineno, column and pos (the
+    offset of the token of a syntax error) are in the parsed text; location is
+    the (filename, lineno, include) in the original source, when a SourceMap
+    of the text is known. """
+
+    def __init__(self, message, msg=None, lineno=None, column=None, location=None,
+                 pos=None):
+        Exception.__init__(self, message)
+        self.msg = msg if msg is not None else message
+        self.lineno = lineno
+        self.column = column
+        self.location = location
+        self.pos = pos
+
+    def relocate(self, source_map):
+        """ Returns the ParseError at the original location of the error """
+        if source_map is None or self.lineno is None:
+            return self
+        location = source_map.lookup(self.lineno)
+        if location is None:
+            return self
+        filename, lineno, include = location
+        coord = '%s line:%d' % (filename, lineno)
+        if self.column is not None:
+            coord += ' column:%d' % self.column
+        for f, l in reversed(include):
+            coord += ' (included from %s line:%d)' % (f, l)
+        return ParseError('%s: %s' % (coord, self.msg), self.msg, self.lineno, self.column,
+                          location, self.pos)
+
+
+# the default parsers, one per thread
+_default_parsers = threading.local()
+
+
+def get_default_parser():
+    """ Returns the VerilogParser shared within the current thread.
+    It is built lazily from the prebuilt tables on the first call in each
+    thread, since a parser keeps the state of the current parse. """
+    parser = getattr(_default_parsers, 'parser', None)
+    if parser is None:
+        parser = _default_parsers.parser = VerilogParser()
+    return parser
+
+
+def write_parsetab(outputdir=None):
+    """ Regenerates the prebuilt table module (parsetab.py) from the grammar.
+    Run this after any change of the p_* rules. """
+    if outputdir is None:
+        outputdir = os.path.dirname(os.path.abspath(__file__))
+    pathlib.Path(outputdir).mkdir(parents=True, exist_ok=True)
+
+    parser = VerilogParser.__new__(VerilogParser)
+    parser.lexer = VerilogLexer(error_func=parser._lexer_error_func)
+    parser.lexer.build()
+    parser.tokens = parser.lexer.tokens
+
+    # a None entry makes the import of the current tables fail,
+    # so that yacc always rebuilds them from the grammar
+    sys.modules[PARSETAB_MODULE] = None
+    try:
+        yacc(module=parser, method="LALR", tabmodule=PARSETAB_MODULE,
+             outputdir=outputdir, write_tables=True, debug=False)
+    finally:
+        sys.modules.pop(PARSETAB_MODULE, None)
+
+    return os.path.join(outputdir, PARSETAB_MODULE.split('.')[-1] + '.py')
+
+
+def parse_recover(parser, text, debug=0, source_map=None):
+    """ Parses a text module by module, skipping the modules with an error.
+    Returns the definitions, the directives and the ParseErrors. """
+    from pyverilog.vparser.stream import ModuleStream
+    stream = ModuleStream(io.StringIO(text), parser=parser, debug=debug, recover=True,
+                          source_map=source_map)
+    definitions = tuple(stream)
+    return definitions, stream.get_directives(), stream.get_errors()
+
+
+def parse_unit(source, include=None, define=None, engine=None, debug=0, netlist=False,
+               recover=False):
+    """ Preprocesses and parses one source as a separate compilation unit.
+    Returns the definitions, the directives, the first line number,
+    the ParseErrors (recorded in the recovery mode) and the files the
+    source depends on. """
+    preprocessor = VerilogPreprocessor([source], include=include, define=define,
+                                       engine=engine)
+    text = preprocessor.preprocess_text()
+
+    parser = get_default_parser()
+    filename = parser.lexer.filename
+    parser.lexer.filename = source if os.path.isfile(source) else ''
+    if netlist:
+        from pyverilog.vparser.netlist import get_netlist_parser
+        reader = get_netlist_parser()
+    else:
+        reader = parser
+    try:
+        if recover:
+            definitions, directives, errors = parse_recover(reader, text, debug)
+            errors = tuple([e.relocate(preprocessor.source_map) for e in errors])
+            lineno = definitions[0].lineno if definitions else 0
+            return (definitions, directives, lineno, errors,
+                    preprocessor.get_dependencies())
+        ast = reader.parse(text, debug=debug)
+    except ParseError as e:
+        raise e.relocate(preprocessor.source_map) from None
+    finally:
+        parser.lexer.filename = filename
+
+    return (ast.description.definitions, reader.get_directives(), ast.lineno, (),
+            preprocessor.get_dependencies())
+
+
+def _parse_unit(args):
+    return parse_unit(*args)
 
 
 class VerilogCodeParser(object):
@@ -2328,45 +2573,216 @@ class VerilogCodeParser(object):
     def __init__(self, filelist, preprocess_output='preprocess.output',
                  preprocess_include=None,
                  preprocess_define=None,
-                 outputdir=".",
-                 debug=True
+                 outputdir=None,
+                 debug=False,
+                 preprocess_engine=None,
+                 cache_dir=None,
+                 jobs=None,
+                 netlist=False,
+                 recover=False,
+                 intern=False,
+                 spans=False
                  ):
         self.preprocess_output = preprocess_output
         self.directives = ()
+        self.source_map = None
+        # recover=True: a module with an error is skipped and the error is
+        # recorded in errors, instead of raising the ParseError
+        self.recover = recover
+        self.errors = ()
         self.preprocessor = VerilogPreprocessor(filelist, preprocess_output,
                                                 preprocess_include,
-                                                preprocess_define)
-        self.parser = VerilogParser(outputdir=outputdir, debug=debug)
+                                                preprocess_define,
+                                                preprocess_engine)
+        # intern=True: the expression subtrees are hash-consed (see intern.py)
+        # by a parser of this instance
+        # spans=True: the nodes record their Span in the preprocessed text
+        # (not the modules of the netlist fast path)
+        # the units of the jobs mode are parsed by the default parsers of
+        # the worker processes, and their ASTs are pickled back
+        if jobs is not None and (intern or spans):
+            raise ValueError('intern and spans are not supported in the jobs mode')
+        self.intern = intern
+        self.spans = spans
+        # structural netlists are read by the fast-path reader
+        # (the other modules are still parsed by a VerilogParser)
+        self.netlist = netlist
+        # None: the default parser of the thread calling parse()
+        self._parser = None
+        if debug or intern or spans:
+            self._parser = VerilogParser(outputdir=outputdir, debug=debug, intern=intern,
+                                         spans=spans)
+            if netlist:
+                from pyverilog.vparser.netlist import NetlistParser
+                self._parser = NetlistParser(self._parser)
+        self.cache = get_cache(cache_dir) if cache_dir is not None else None
+        # None: all sources are one compilation unit (as iverilog -E does)
+        # N: each source is its own compilation unit, parsed by N processes
+        #    (0 means os.cpu_count())
+        self.jobs = jobs
+
+    @property
+    def parser(self):
+        if self._parser is not None:
+            return self._parser
+        if self.netlist:
+            from pyverilog.vparser.netlist import get_netlist_parser
+            return get_netlist_parser()
+        return get_default_parser()
+
+    @parser.setter
+    def parser(self, parser):
+        self._parser = parser
 
     def preprocess(self):
-        self.preprocessor.preprocess()
-        text = open(self.preprocess_output).read()
-        os.remove(self.preprocess_output)
-        return text
+        return self.preprocessor.preprocess_text()
+
+    def parse(self, preprocess_output='preprocess.output', debug=0, cache_dir=None):
+        cache = get_cache(cache_dir) if cache_dir is not None else self.cache
+        if self.intern or self.spans:
+            # a cached AST has no spans nor cached hashes, and its shared
+            # nodes must not be served to a plain parse
+            cache = None
+
+        self.errors = ()
+
+        if self.jobs is not None:
+            return self._parse_units(cache, debug)
+
+        if cache is not None:
+            key = cache.key(self.preprocessor.sources,
+                            self.preprocessor.include,
+                            self.preprocessor.define,
+                            self.preprocessor.engine)
+            entry = cache.get(key)
+            cache.save_digests()
+            if entry is not None:
+                ast, self.directives, self.source_map = entry
+                return ast
 
-    def parse(self, preprocess_output='preprocess.output', debug=0):
         text = self.preprocess()
-        ast = self.parser.parse(text, debug=debug)
-        self.directives = self.parser.get_directives()
+        self.source_map = self.preprocessor.source_map
+
+        if self.recover:
+            definitions, self.directives, errors = parse_recover(self.parser, text, debug,
+                                                                 self.source_map)
+            self.errors = tuple([e.relocate(self.source_map) for e in errors])
+            lineno = definitions[0].lineno if definitions else 0
+            ast = Source(name='', description=Description(definitions, lineno=lineno),
+                         lineno=lineno)
+        else:
+            try:
+                ast = self.parser.parse(text, debug=debug, source_map=self.source_map)
+            except ParseError as e:
+                raise e.relocate(self.source_map) from None
+            self.directives = self.parser.get_directives()
+
+        # a partial result is not cached
+        if cache is not None and not self.errors:
+            cache.put(key, ast, self.directives, self.source_map,
+                      self.preprocessor.get_dependencies())
+            cache.save_digests()
+
         return ast
 
+    def _parse_units(self, cache, debug):
+        pre = self.preprocessor
+        units = [(source, pre.include, pre.define, pre.engine, debug, self.netlist,
+                  self.recover)
+                 for source in pre.sources]
+        results = [None] * len(units)
+
+        keys = [None] * len(units)
+        if cache is not None:
+            for i, source in enumerate(pre.sources):
+                keys[i] = cache.key([source], pre.include, pre.define, pre.engine)
+                entry = cache.get(keys[i])
+                if entry is not None:
+                    ast, directives, _ = entry
+                    results[i] = (ast.description.definitions, directives, ast.lineno, (), ())
+
+        todo = [i for i, r in enumerate(results) if r is None]
+        jobs = self.jobs if self.jobs > 0 else os.cpu_count()
+
+        if jobs <= 1 or len(todo) <= 1:
+            parsed = [parse_unit(*units[i]) for i in todo]
+        else:
+            chunksize = max(1, len(todo) // (jobs * 4))
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+                parsed = list(executor.map(_parse_unit, [units[i] for i in todo],
+                                           chunksize=chunksize))
+
+        for i, result in zip(todo, parsed):
+            results[i] = result
+            if cache is not None and not result[3]:
+                definitions, directives, lineno, _, dependencies = result
+                ast = Source(name='', description=Description(definitions, lineno=lineno),
+                             lineno=lineno)
+                cache.put(keys[i], ast, directives, dependencies=dependencies)
+        if cache is not None:
+            cache.save_digests()
+
+        definitions = []
+        directives = []
+        errors = []
+        for defs, dirs, _, errs, _ in results:
+            definitions.extend(defs)
+            directives.extend(dirs)
+            errors.extend(errs)
+        self.errors = tuple(errors)
+
+        lineno = results[0][2] if results else 0
+        self.directives = tuple(directives)
+        # the line numbers of the units overlap: no map for the whole
+        self.source_map = None
+        description = Description(definitions=tuple(definitions), lineno=lineno)
+        return Source(name='', description=description, lineno=lineno)
+
     def get_directives(self):
         return self.directives
 
+    def get_source_map(self):
+        return self.source_map
+
+    def get_errors(self):
+        """ Returns the ParseErrors of the last parse in the recovery mode """
+        return self.errors
+
+    def get_location(self, node):
+        """ Returns the (filename, lineno, include) in the original source of
+        an AST node, a dataflow Bind or a line number of the parsed text,
+        or None when unknown """
+        lineno = node if isinstance(node, int) else getattr(node, 'lineno', None)
+        if self.source_map is None or not lineno:
+            return None
+        return self.source_map.lookup(lineno)
+
 
 def parse(
     filelist,
     preprocess_include=None,
     preprocess_define=None,
-    outputdir=".",
-    debug=True
+    outputdir=None,
+    debug=False,
+    preprocess_engine=None,
+    cache_dir=None,
+    jobs=None,
+    netlist=False,
+    intern=False,
+    spans=False
 ):
     codeparser = VerilogCodeParser(
         filelist,
         preprocess_include=preprocess_include,
         preprocess_define=preprocess_define,
         outputdir=outputdir,
-        debug=debug
+        debug=debug,
+        preprocess_engine=preprocess_engine,
+        cache_dir=cache_dir,
+        jobs=jobs,
+        netlist=netlist,
+        intern=intern,
+        spans=spans
     )
     ast = codeparser.parse()
     directives = codeparser.get_directives()
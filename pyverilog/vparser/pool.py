@@ -0,0 +1,101 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Thread-safe parser pool
+
+   A VerilogParser keeps the state of the current parse (the lexer position,
+   directives, default_nettype and filename, and the LR stacks), so one
+   instance must not be used by two threads at once. parse() and
+   VerilogCodeParser use the default parser of the calling thread, one per
+   thread. A ParserPool holds up to size parsers, built on demand from the
+   prebuilt tables, and lends each of them to one thread at a time, for a
+   bounded number of parsers shared by many threads.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import threading
+import contextlib
+
+from pyverilog.vparser.parser import VerilogParser
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ParserPool(object):
+    """ Bounded pool of VerilogParsers with checkout/return semantics """
+
+    def __init__(self, size=None, lexer_engine=None, factory=None):
+        if size is None:
+            size = os.cpu_count() or 1
+        if size < 1:
+            raise ValueError('pool size must be positive: %d' % size)
+        self.size = size
+        self.lexer_engine = lexer_engine
+        self.factory = factory
+        self.created = 0
+        self._idle = []
+        self._lock = threading.Lock()
+        self._available = threading.BoundedSemaphore(size)
+
+    def _create(self):
+        if self.factory is not None:
+            return self.factory()
+        return VerilogParser(lexer_engine=self.lexer_engine)
+
+    def acquire(self, timeout=None):
+        """ Checks out a parser, waiting up to timeout seconds
+        (forever by default) while all of them are in use """
+        if not self._available.acquire(timeout=timeout):
+            raise PoolTimeout('no parser available in %s seconds' % timeout)
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        try:
+            return self._create()
+        except BaseException:
+            with self._lock:
+                self.created -= 1
+            self._available.release()
+            raise
+
+    def release(self, parser):
+        """ Returns a parser checked out by acquire() """
+        parser.lexer.filename = ''
+        with self._lock:
+            self._idle.append(parser)
+        self._available.release()
+
+    @contextlib.contextmanager
+    def checkout(self, timeout=None):
+        parser = self.acquire(timeout)
+        try:
+            yield parser
+        finally:
+            self.release(parser)
+
+    def parse(self, text, debug=0, lineno=1, default_nettype='wire', filename=''):
+        """ Parses a text with a parser of the pool.
+        Returns the AST and the directives. """
+        with self.checkout() as parser:
+            parser.lexer.filename = filename
+            ast = parser.parse(text, debug, lineno, default_nettype)
+            return ast, parser.get_directives()
@@ -15,89 +15,245 @@
 
    ----
    Verilog Preprocessor
- 
-   Icarus Verilog is used as the internal preprocessor.
-   Please install Icarus Verilog on your environment.
+
+   Two engines are available:
+   'iverilog' runs Icarus Verilog (iverilog -E) as an external process.
+   'python' is the in-memory preprocessor in pypreprocessor.py.
+   By default, Icarus Verilog is used if it is installed and no source is
+   compressed; only the python engine reads compressed files.
+   The engine can be chosen by the PYVERILOG_PREPROCESSOR environment variable.
 """
 
 from __future__ import absolute_import
 from __future__ import print_function
 import sys
 import os
+import shutil
 import tempfile
 import subprocess
 
+from pyverilog.vparser.pypreprocessor import PythonPreprocessor, PreprocessError
+from pyverilog.vparser.pypreprocessor import transitive_dependencies
+from pyverilog.vparser.source import read_source, open_source, compression
+
+ENGINES = ('iverilog', 'python')
+
+
+def get_iverilog():
+    iverilog = os.environ.get('PYVERILOG_IVERILOG')
+    if iverilog is None:
+        iverilog = 'iverilog'
+    return iverilog
+
+
+def default_engine(filelist=()):
+    engine = os.environ.get('PYVERILOG_PREPROCESSOR')
+    if engine:
+        return engine
+    # iverilog cannot read compressed sources
+    if any(os.path.isfile(s) and compression(s) is not None for s in filelist):
+        return 'python'
+    if shutil.which(get_iverilog()) is not None:
+        return 'iverilog'
+    return 'python'
+
 
 class VerilogPreprocessor(object):
-    def __init__(self, filelist, outputfile='pp.out', include=None, define=None):
+    def __init__(self, filelist, outputfile='pp.out', include=None, define=None,
+                 engine=None):
 
         if not isinstance(filelist, (tuple, list)):
             filelist = list(filelist)
 
-        # Elements in `filelist` can either be raw Verilog files, or Verilog code
+        if engine is None:
+            engine = default_engine(filelist)
+
+        if engine not in ENGINES:
+            raise ValueError("unknown preprocessor engine: '%s'" % engine)
+
+        if engine == 'iverilog':
+            compressed = [s for s in filelist
+                          if os.path.isfile(s) and compression(s) is not None]
+            if compressed:
+                raise ValueError("the iverilog engine cannot read compressed sources "
+                                 "(use the python engine): %s" % ', '.join(compressed))
+
+        if include is None:
+            include = ()
+
+        if define is None:
+            define = ()
+
+        self.engine = engine
+        self.sources = list(filelist)
+        self.outputfile = outputfile
+        self.include = include
+        self.define = define
+        # origin of the preprocessed lines and the dependency graph of
+        # the files (by the python engine only)
+        self.source_map = None
+        self.dependencies = None
+
+    def preprocess(self):
+        """ Writes the preprocessed text into outputfile """
+        if self.engine == 'iverilog':
+            self._run_iverilog(self.outputfile)
+            return
+
+        text = self.preprocess_text()
+        with open(self.outputfile, 'w') as f:
+            f.write(text)
+
+    def preprocess_text(self):
+        """ Returns the preprocessed text.
+        The python engine does not touch any file other than the sources. """
+        if self.engine == 'python':
+            pp = PythonPreprocessor(self.include, self.define)
+            text = pp.preprocess(self.sources)
+            self.source_map = pp.source_map
+            self.dependencies = pp.get_dependencies()
+            return text
+
+        temp_path = self._preprocess_iverilog()
+        try:
+            return read_source(temp_path)
+        finally:
+            os.remove(temp_path)
+
+    def preprocess_lines(self):
+        """ Yields the preprocessed text line by line.
+        The output of iverilog is read from a temporary file, so that the text
+        is not held in memory; the python engine preprocesses in memory and
+        yields the lines of the text without copying it. """
+        if self.engine == 'python':
+            text = self.preprocess_text()
+            pos = 0
+            end = len(text)
+            while pos < end:
+                nl = text.find('\n', pos)
+                nl = end if nl < 0 else nl + 1
+                yield text[pos:nl]
+                pos = nl
+            return
+
+        temp_path = self._preprocess_iverilog()
+        try:
+            with open_source(temp_path) as f:
+                for line in f:
+                    yield line
+        finally:
+            os.remove(temp_path)
+
+    def _preprocess_iverilog(self):
+        """ Runs iverilog -E into a temporary file and returns the path.
+        iverilog writes no line markers; the files it reads are listed by -M. """
+        self.source_map = None
+        self.dependencies = None
+
+        temp_fd, temp_path = tempfile.mkstemp(prefix="pyverilog_pp_", suffix=".out")
+        os.close(temp_fd)
+        dep_fd, dep_path = tempfile.mkstemp(prefix="pyverilog_dep_", suffix=".txt")
+        os.close(dep_fd)
+        try:
+            self._run_iverilog(temp_path, dep_path)
+            files = read_depfile(dep_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        finally:
+            os.remove(dep_path)
+
+        # every file is a dependency of every source
+        if files is not None:
+            roots = [s if os.path.isfile(s) else '<string>' for s in self.sources]
+            self.dependencies = dict([(root, files) for root in roots])
+        return temp_path
+
+    def get_dependencies(self):
+        """ Returns the files the sources depend on, by `include or a macro,
+        directly or indirectly; None if unknown (an iverilog without -M) """
+        if self.dependencies is None:
+            return None
+        roots = [s if os.path.isfile(s) else '<string>' for s in self.sources]
+        return [f for f in transitive_dependencies(self.dependencies, roots)
+                if os.path.isfile(f)]
+
+    def _run_iverilog(self, outputfile, depfile=None):
+        # Elements in `sources` can either be raw Verilog files, or Verilog code
         # in python string. The following loop iterates through these `sources`,
         # and normalizes all of them into files.
         #
         # For Verilog code in python string, the contents of the string is stored
         # in a temporary file for further use with `iverilog`.
-        self.temp_files_paths = []
-        self.filelist = []
+        temp_files_paths = []
+        filelist = []
 
-        for source in filelist:
+        for source in self.sources:
             # If `source` is verilog code in python strings
             if not os.path.isfile(source):
                 temp_fd, temp_path = tempfile.mkstemp(prefix="pyverilog_temp_", suffix=".v")
                 with open(temp_fd, 'w') as f:
                     f.write(source)
 
-                self.temp_files_paths.append(temp_path)
+                temp_files_paths.append(temp_path)
 
-            else: # else if it is normal verilog file path
-                self.filelist.append(source)
+            else:  # else if it is normal verilog file path
+                filelist.append(source)
 
-        self.filelist += self.temp_files_paths
+        filelist += temp_files_paths
 
-        iverilog = os.environ.get('PYVERILOG_IVERILOG')
-        if iverilog is None:
-            iverilog = 'iverilog'
-
-        if include is None:
-            include = ()
+        iv = [get_iverilog()]
 
-        if define is None:
-            define = ()
+        for inc in self.include:
+            iv.append('-I')
+            iv.append(inc)
 
-        self.iv = [iverilog]
+        for dfn in self.define:
+            iv.append('-D')
+            iv.append(dfn)
 
-        for inc in include:
-            self.iv.append('-I')
-            self.iv.append(inc)
+        if depfile is not None:
+            iv.append('-M' + depfile)
 
-        for dfn in define:
-            self.iv.append('-D')
-            self.iv.append(dfn)
+        iv.append('-E')
+        iv.append('-o')
+        iv.append(outputfile)
 
-        self.iv.append('-E')
-        self.iv.append('-o')
-        self.iv.append(outputfile)
+        try:
+            cmd = iv + list(filelist)
+            subprocess.call(cmd)
+        finally:
+            # Removing the temporary files that were created
+            for temp_file_path in temp_files_paths:
+                os.remove(temp_file_path)
 
-    def preprocess(self):
-        cmd = self.iv + list(self.filelist)
-        subprocess.call(cmd)
 
-        # Removing the temporary files that were created
-        for temp_file_path in self.temp_files_paths:
-            os.remove(temp_file_path)
+def read_depfile(path):
+    """ Returns the files listed by iverilog -M, or None if there are none:
+    the sources themselves are always read, so an empty list means that
+    the option is not supported """
+    files = []
+    try:
+        with open(path) as f:
+            for line in f:
+                filename = line.rstrip('\r\n')
+                # iverilog 11 or later may prefix the kind of the file
+                if (not os.path.isfile(filename) and filename[:2] in ('I ', 'M ') and
+                        os.path.isfile(filename[2:])):
+                    filename = filename[2:]
+                if filename and filename not in files:
+                    files.append(filename)
+    except OSError:
+        return None
+    return tuple(files) if files else None
 
 
 def preprocess(
     filelist,
     output='preprocess.output',
     include=None,
-    define=None
+    define=None,
+    engine=None
 ):
-    pre = VerilogPreprocessor(filelist, output, include, define)
-    pre.preprocess()
-    text = open(output).read()
-    os.remove(output)
-    return text
+    pre = VerilogPreprocessor(filelist, output, include, define, engine)
+    return pre.preprocess_text()
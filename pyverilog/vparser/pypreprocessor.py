@@ -0,0 +1,577 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Pure-Python Verilog Preprocessor
+
+   An in-memory alternative to `iverilog -E`: `define (with arguments),
+   `undef, `ifdef/`ifndef/`elsif/`else/`endif and `include.
+   Other compiler directives (`timescale, `default_nettype, ...) are
+   passed through to the lexer as they are.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import re
+
+from pyverilog.vparser.source import read_source, LineIndex, SourceMap, COMPRESSIONS
+
+
+class PreprocessError(Exception):
+    pass
+
+
+class Macro(object):
+    def __init__(self, name, body, params=None, defaults=None, filename=None):
+        self.name = name
+        self.body = body
+        self.params = params  # None for a macro without arguments
+        self.defaults = defaults
+        self.filename = filename  # None for a macro given by the define option
+
+    def __repr__(self):
+        if self.params is None:
+            return '`define %s %s' % (self.name, self.body)
+        return '`define %s(%s) %s' % (self.name, ', '.join(self.params), self.body)
+
+
+class PythonPreprocessor(object):
+    """ Verilog HDL Preprocessor written in Python """
+
+    # compiler directives that are handed to the lexer unchanged
+    passthrough = frozenset([
+        'timescale', 'default_nettype', 'resetall', 'celldefine', 'endcelldefine',
+        'unconnected_drive', 'nounconnected_drive', 'pragma', 'line',
+        'begin_keywords', 'end_keywords', 'default_decay_time', 'default_trireg_strength',
+        'delay_mode_distributed', 'delay_mode_path', 'delay_mode_unit', 'delay_mode_zero',
+    ])
+
+    max_include_depth = 64
+    max_expansion_depth = 256
+
+    special = re.compile(r'[`"/]')
+    identifier = re.compile(r'[a-zA-Z_][a-zA-Z0-9_$]*')
+    # a formal argument: not part of a longer name, not a macro usage
+    # unless it is pasted with ``
+    argument = re.compile(r'(?<![\w$])(?:(?<=``)|(?<!`))[a-zA-Z_][a-zA-Z0-9_$]*')
+    blank = re.compile(r'[ \t]*')
+    space = re.compile(r'\s*')
+
+    def __init__(self, include=None, define=None):
+        self.include = tuple(include) if include is not None else ()
+        self.macros = {}
+        self.predefined = {}
+        if define is not None:
+            for dfn in define:
+                name, _, value = dfn.partition('=')
+                self.predefined[name] = Macro(name, value if _ else '1')
+
+    def preprocess(self, sources):
+        """ Returns the preprocessed text of the sources as one string.
+        Each source is either a file path or Verilog code in a python string.
+        Macros defined in a source are visible in the following sources. """
+        self.macros = dict(self.predefined)
+        self.conds = []
+        self.expanding = []
+
+        # file -> the files it includes or uses a macro of, in order
+        self.dependencies = {}
+
+        # the origin of every preprocessed line
+        self.source_map = SourceMap()
+        self.include_stack = []
+        self.line_indexes = {}
+        self.out_lines = 0
+        self.out_counted = 0
+
+        out = []
+        for source in sources:
+            if os.path.isfile(source):
+                self.dependencies.setdefault(source, [])
+                self._mark(out, source, 1)
+                self._scan(self.read(source), source, out, 0)
+            else:
+                self.dependencies.setdefault('<string>', [])
+                self._mark(out, '<string>', 1)
+                self._scan(source, '<string>', out, 0)
+
+        if self.conds:
+            raise PreprocessError('missing `endif at end of input')
+
+        self.line_indexes = {}
+        return ''.join(out)
+
+    def read(self, filename):
+        return read_source(filename)
+
+    def get_dependencies(self):
+        """ Returns the dependency graph of the last preprocess():
+        {file: (file, ...)} of the files each file includes or
+        uses a macro of """
+        return dict([(f, tuple(deps)) for f, deps in self.dependencies.items()])
+
+    def _depend(self, filename, dependency):
+        deps = self.dependencies.setdefault(filename, [])
+        if dependency != filename and dependency not in deps:
+            deps.append(dependency)
+
+    def find_include(self, name, filename):
+        if os.path.isabs(name):
+            return self._find_file(name)
+        dirs = []
+        if os.path.isfile(filename):
+            dirs.append(os.path.dirname(os.path.abspath(filename)))
+        dirs.extend(self.include)
+        dirs.append(os.getcwd())
+        for d in dirs:
+            path = self._find_file(os.path.join(d, name))
+            if path is not None:
+                return path
+        return None
+
+    def _find_file(self, path):
+        """ Returns the path, or the path of the compressed file of it """
+        if os.path.isfile(path):
+            return path
+        for suffix in COMPRESSIONS:
+            if os.path.isfile(path + suffix):
+                return path + suffix
+        return None
+
+    # --------------------------------------------------------------------------
+    def _output_line(self, out):
+        """ Returns the preprocessed line being written and
+        whether nothing is written in it yet """
+        count = self.out_lines
+        for i in range(self.out_counted, len(out)):
+            count += out[i].count('\n')
+        self.out_lines = count
+        self.out_counted = len(out)
+        for piece in reversed(out):
+            if piece:
+                return count + 1, piece.endswith('\n')
+        return count + 1, True
+
+    def _mark(self, out, filename, origin, resume=False):
+        """ The text written next comes from the line origin of filename """
+        lineno, fresh = self._output_line(out)
+        if resume and not fresh:
+            # back from an `include: the current line is left to the included file
+            lineno += 1
+            origin += 1
+        self.source_map.add(lineno, filename, origin, tuple(self.include_stack))
+
+    def _lineno(self, text, pos):
+        index = self.line_indexes.get(id(text))
+        if index is None or index.text is not text:
+            index = LineIndex(text)
+            self.line_indexes[id(text)] = index
+        return index.location(pos)[0]
+
+    def _active(self):
+        return not self.conds or self.conds[-1][0]
+
+    def _error(self, msg, text, pos, filename):
+        lineno = text.count('\n', 0, pos) + 1
+        raise PreprocessError('%s line:%d: %s' % (filename, lineno, msg))
+
+    def _scan(self, text, filename, out, depth):
+        if self._active() and '`' not in text and '/*' not in text:
+            # nothing to preprocess: the text is passed as it is, without
+            # a copy (''.join() of a single string returns the string)
+            out.append(text)
+            return
+
+        special = self.special
+        identifier = self.identifier
+        pos = 0
+        end = len(text)
+
+        while pos < end:
+            m = special.search(text, pos)
+            nxt = m.start() if m is not None else end
+
+            if nxt > pos:
+                if self._active():
+                    out.append(text[pos:nxt])
+                else:
+                    out.append('\n' * text.count('\n', pos, nxt))
+            if m is None:
+                break
+
+            c = text[nxt]
+
+            if c == '/':
+                if text.startswith('//', nxt):
+                    eol = text.find('\n', nxt)
+                    pos = eol if eol >= 0 else end
+                elif text.startswith('/*', nxt):
+                    close = text.find('*/', nxt + 2)
+                    if close < 0:
+                        self._error('unterminated comment', text, nxt, filename)
+                    pos = close + 2
+                else:
+                    pos = nxt + 1
+                if self._active():
+                    out.append(text[nxt:pos])
+                else:
+                    out.append('\n' * text.count('\n', nxt, pos))
+                continue
+
+            if c == '"':
+                pos = self._skip_string(text, nxt)
+                if self._active():
+                    out.append(text[nxt:pos])
+                continue
+
+            # compiler directive or macro usage
+            m = identifier.match(text, nxt + 1)
+            if m is None:
+                if self._active():
+                    out.append('`')
+                pos = nxt + 1
+                continue
+
+            pos = self._directive(m.group(), text, m.end(), filename, out, depth)
+
+    def _skip_string(self, text, pos):
+        i = pos + 1
+        end = len(text)
+        while i < end:
+            c = text[i]
+            if c == '\\':
+                i += 2
+                continue
+            if c == '"':
+                return i + 1
+            if c == '\n':
+                return i
+            i += 1
+        return end
+
+    def _read_name(self, text, pos, filename, directive):
+        pos = self.blank.match(text, pos).end()
+        m = self.identifier.match(text, pos)
+        if m is None:
+            self._error('`%s requires a macro name' % directive, text, pos, filename)
+        return m.group(), m.end()
+
+    def _directive(self, name, text, pos, filename, out, depth):
+        conds = self.conds
+
+        if name == 'ifdef' or name == 'ifndef':
+            macro, pos = self._read_name(text, pos, filename, name)
+            if not self._active():
+                # the whole group is skipped: no branch can be taken
+                conds.append([False, True])
+            else:
+                taken = (macro in self.macros) == (name == 'ifdef')
+                conds.append([taken, taken])
+            return pos
+
+        if name == 'elsif':
+            macro, pos = self._read_name(text, pos, filename, name)
+            if not conds:
+                self._error('`elsif without `ifdef', text, pos, filename)
+            cond = conds[-1]
+            taken = not cond[1] and macro in self.macros
+            cond[0] = taken
+            cond[1] = cond[1] or taken
+            return pos
+
+        if name == 'else':
+            if not conds:
+                self._error('`else without `ifdef', text, pos, filename)
+            cond = conds[-1]
+            cond[0] = not cond[1]
+            cond[1] = True
+            return pos
+
+        if name == 'endif':
+            if not conds:
+                self._error('`endif without `ifdef', text, pos, filename)
+            conds.pop()
+            return pos
+
+        if not self._active():
+            return pos
+
+        if name == 'define':
+            return self._define(text, pos, filename, out)
+
+        if name == 'undef':
+            macro, pos = self._read_name(text, pos, filename, name)
+            self.macros.pop(macro, None)
+            return pos
+
+        if name == 'undefineall':
+            self.macros = {}
+            return pos
+
+        if name == 'include':
+            return self._include(text, pos, filename, out, depth)
+
+        if name == '__FILE__':
+            out.append('"%s"' % filename)
+            return pos
+
+        if name == '__LINE__':
+            out.append(str(text.count('\n', 0, pos) + 1))
+            return pos
+
+        if name in self.passthrough:
+            out.append('`')
+            out.append(name)
+            return pos
+
+        return self._expand(name, text, pos, filename, out, depth)
+
+    # --------------------------------------------------------------------------
+    def _define(self, text, pos, filename, out):
+        name, pos = self._read_name(text, pos, filename, 'define')
+
+        # logical line with backslash-newline continuations
+        start = pos
+        while True:
+            eol = text.find('\n', pos)
+            if eol < 0:
+                eol = len(text)
+                break
+            if text[eol - 1] == '\\' or text[eol - 2:eol] == '\\\r':
+                pos = eol + 1
+                continue
+            break
+        line = text[start:eol]
+        out.append('\n' * line.count('\n'))
+
+        params = None
+        defaults = None
+        if line.startswith('('):
+            close = self._match_paren(line, 0)
+            if close < 0:
+                self._error('unterminated argument list of `%s' % name, text, start, filename)
+            params = []
+            defaults = []
+            for arg in self._split_args(line[1:close]):
+                pname, eq, default = arg.partition('=')
+                params.append(pname.strip())
+                defaults.append(default.strip() if eq else None)
+            line = line[close + 1:]
+
+        body = re.sub(r'\\\r?\n', ' ', line)
+        body = self._strip_comments(body).strip()
+        self.macros[name] = Macro(name, body, params, defaults, filename)
+        return eol
+
+    def _strip_comments(self, body):
+        ret = []
+        pos = 0
+        while True:
+            m = self.special.search(body, pos)
+            if m is None:
+                ret.append(body[pos:])
+                break
+            nxt = m.start()
+            if body[nxt] == '"':
+                close = self._skip_string(body, nxt)
+                ret.append(body[pos:close])
+                pos = close
+            elif body.startswith('//', nxt):
+                ret.append(body[pos:nxt])
+                break
+            elif body.startswith('/*', nxt):
+                ret.append(body[pos:nxt])
+                close = body.find('*/', nxt + 2)
+                if close < 0:
+                    break
+                ret.append(' ')
+                pos = close + 2
+            else:
+                ret.append(body[pos:nxt + 1])
+                pos = nxt + 1
+        return ''.join(ret)
+
+    def _match_paren(self, text, pos):
+        """ Returns the position of the parenthesis closing the one at pos """
+        level = 0
+        i = pos
+        end = len(text)
+        while i < end:
+            c = text[i]
+            if c == '"':
+                i = self._skip_string(text, i)
+                continue
+            if c in '([{':
+                level += 1
+            elif c in ')]}':
+                level -= 1
+                if level == 0:
+                    return i
+            i += 1
+        return -1
+
+    def _split_args(self, text):
+        args = []
+        level = 0
+        start = 0
+        i = 0
+        end = len(text)
+        while i < end:
+            c = text[i]
+            if c == '"':
+                i = self._skip_string(text, i)
+                continue
+            if c in '([{':
+                level += 1
+            elif c in ')]}':
+                level -= 1
+            elif c == ',' and level == 0:
+                args.append(text[start:i])
+                start = i + 1
+            i += 1
+        args.append(text[start:])
+        return args
+
+    # --------------------------------------------------------------------------
+    def _include(self, text, pos, filename, out, depth):
+        pos = self.blank.match(text, pos).end()
+        if text.startswith('"', pos):
+            close = text.find('"', pos + 1)
+        elif text.startswith('<', pos):
+            close = text.find('>', pos + 1)
+        else:
+            close = -1
+        if close < 0 or '\n' in text[pos:close]:
+            self._error('`include requires a file name', text, pos, filename)
+
+        name = text[pos + 1:close]
+        path = self.find_include(name, filename)
+        if path is None:
+            self._error("include file '%s' not found" % name, text, pos, filename)
+        if depth >= self.max_include_depth:
+            self._error("`include nested too deeply: '%s'" % name, text, pos, filename)
+
+        included = self.read(path)
+        self._depend(filename, path)
+        self.dependencies.setdefault(path, [])
+        self.include_stack.append((filename, self._lineno(text, pos)))
+        self._mark(out, path, 1)
+        self._scan(included, path, out, depth + 1)
+        self.include_stack.pop()
+
+        # the included text replaces the whole line, as iverilog -E does
+        pos = self.blank.match(text, close + 1).end()
+        if included.endswith('\n') and text.startswith('\n', pos):
+            pos += 1
+        else:
+            pos = close + 1
+        self._mark(out, filename, self._lineno(text, pos), resume=True)
+        return pos
+
+    def _expand(self, name, text, pos, filename, out, depth):
+        macro = self.macros.get(name)
+        if macro is None:
+            self._error('macro `%s is not defined' % name, text, pos, filename)
+        if name in self.expanding:
+            self._error('recursive expansion of macro `%s' % name, text, pos, filename)
+        if len(self.expanding) >= self.max_expansion_depth:
+            self._error('macro expansion nested too deeply: `%s' % name, text, pos, filename)
+
+        if macro.filename is not None:
+            self._depend(filename, macro.filename)
+
+        body = macro.body
+        if macro.params is not None:
+            start = self.space.match(text, pos).end()
+            if not text.startswith('(', start):
+                self._error('macro `%s requires arguments' % name, text, pos, filename)
+            close = self._match_paren(text, start)
+            if close < 0:
+                self._error('unterminated arguments of macro `%s' % name, text, pos, filename)
+            args = self._split_args(text[start + 1:close])
+            if len(args) == 1 and not args[0].strip() and not macro.params:
+                args = []
+            if len(args) > len(macro.params):
+                self._error('too many arguments for macro `%s' % name, text, pos, filename)
+            values = {}
+            for i, param in enumerate(macro.params):
+                value = args[i].strip() if i < len(args) else ''
+                if not value:
+                    value = macro.defaults[i]
+                if value is None:
+                    self._error("missing argument '%s' for macro `%s" % (param, name),
+                                text, pos, filename)
+                values[param] = value
+            body = self._substitute(body, values)
+            # keep the line count of a multi-line argument list
+            out_newlines = text.count('\n', pos, close)
+            pos = close + 1
+        else:
+            out_newlines = 0
+
+        body = body.replace('``', '').replace('`\\`"', '\\"').replace('`"', '"')
+
+        self.expanding.append(name)
+        try:
+            self._scan(body, filename, out, depth)
+        finally:
+            self.expanding.pop()
+
+        if out_newlines:
+            out.append('\n' * out_newlines)
+        return pos
+
+    def _substitute(self, body, values):
+        """ Replaces formal arguments outside of string literals """
+        def repl(m):
+            return values.get(m.group(), m.group())
+
+        ret = []
+        pos = 0
+        end = len(body)
+        while pos < end:
+            q = body.find('"', pos)
+            if q < 0:
+                q = end
+            # `" quoted strings of the body take arguments as well
+            if q > 0 and body[q - 1] == '`':
+                ret.append(self.argument.sub(repl, body[pos:q + 1]))
+                pos = q + 1
+                continue
+            ret.append(self.argument.sub(repl, body[pos:q]))
+            if q == end:
+                break
+            close = self._skip_string(body, q)
+            ret.append(body[q:close])
+            pos = close
+        return ''.join(ret)
+
+
+def transitive_dependencies(graph, roots):
+    """ Returns the files the roots depend on directly or indirectly
+    (except the roots themselves), in the order of discovery """
+    ret = []
+    visited = set(roots)
+    stack = list(reversed(roots))
+    while stack:
+        f = stack.pop()
+        for dep in reversed(graph.get(f, ())):
+            if dep not in visited:
+                visited.add(dep)
+                ret.append(dep)
+                stack.append(dep)
+    return ret
@@ -0,0 +1,413 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Compact binary format of the AST
+
+   dump()/dumps() write an AST and load()/loads() read it back, or only
+   the definition (ModuleDef) of a given name. Unsigned integers are
+   LEB128 varints.
+
+     magic 'PYVAST', format version
+     flags (1: with line numbers)
+     string table: count, then the UTF-8 length and bytes of each string
+     type table: count, then the class name and the field names of each
+       node class (as string ids), so that a file stays readable when the
+       fields of a class change
+     root: 0 and the name and line numbers of a Source, or 1 for a single
+       node
+     section table: count, then the name (string id + 1, 0 if none) and the
+       byte length of each section
+     sections: one per definition of the Source (or the single node)
+
+   A section is a sequence of node records, children first, and the last
+   one is the definition. A record is the type id, the line numbers
+   (lineno, end_lineno + 1 or 0) if any, and the value of each field:
+   a tag and None/False/True, a string id, a zigzag-encoded int, the index
+   of a node record of the section, or a tuple/list of values. A subtree
+   shared by several parents (see intern.py) is written once.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import io
+
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.ast import Node, Source, Description, field_names
+
+MAGIC = b'PYVAST'
+FORMAT_VERSION = 1
+
+FLAG_LINENO = 1
+
+ROOT_SOURCE = 0
+ROOT_NODE = 1
+
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_STR = 3
+TAG_INT = 4
+TAG_NODE = 5
+TAG_TUPLE = 6
+TAG_LIST = 7
+TAG_FLOAT = 8
+TAG_UNSET = 9
+
+
+class FormatError(Exception):
+    pass
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    b = data[pos]
+    pos += 1
+    if b < 0x80:
+        return b, pos
+    value = b & 0x7f
+    shift = 7
+    while True:
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7f) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+class _Writer(object):
+    def __init__(self, lineno):
+        self.lineno = lineno
+        self.strings = []
+        self.string_ids = {}
+        self.types = []
+        self.type_ids = {}
+
+    def string(self, s):
+        sid = self.string_ids.get(s)
+        if sid is None:
+            sid = self.string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return sid
+
+    def type(self, cls):
+        tid = self.type_ids.get(cls)
+        if tid is None:
+            tid = self.type_ids[cls] = len(self.types)
+            self.types.append(cls)
+        return tid
+
+    def section(self, root):
+        out = bytearray()
+        index = {}
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in index:
+                continue
+            if not ready:
+                stack.append((node, True))
+                for name in field_names(node.__class__):
+                    _push_nodes(stack, getattr(node, name, None), index)
+                continue
+
+            _write_varint(out, self.type(node.__class__))
+            if self.lineno:
+                _write_varint(out, getattr(node, 'lineno', 0) or 0)
+                end_lineno = getattr(node, 'end_lineno', None)
+                _write_varint(out, 0 if end_lineno is None else end_lineno + 1)
+            for name in field_names(node.__class__):
+                try:
+                    value = getattr(node, name)
+                except AttributeError:
+                    out.append(TAG_UNSET)
+                    continue
+                self.value(out, value, index)
+            index[id(node)] = len(index)
+        return out
+
+    def value(self, out, value, index):
+        if value is None:
+            out.append(TAG_NONE)
+        elif value is False:
+            out.append(TAG_FALSE)
+        elif value is True:
+            out.append(TAG_TRUE)
+        elif isinstance(value, str):
+            out.append(TAG_STR)
+            _write_varint(out, self.string(value))
+        elif isinstance(value, Node):
+            out.append(TAG_NODE)
+            _write_varint(out, index[id(value)])
+        elif isinstance(value, (tuple, list)):
+            out.append(TAG_TUPLE if isinstance(value, tuple) else TAG_LIST)
+            _write_varint(out, len(value))
+            for v in value:
+                self.value(out, v, index)
+        elif isinstance(value, int):
+            out.append(TAG_INT)
+            _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            out.append(TAG_FLOAT)
+            _write_varint(out, self.string(repr(value)))
+        else:
+            raise TypeError("cannot serialize a value of '%s'" % value.__class__.__name__)
+
+
+def _push_nodes(stack, value, index):
+    if isinstance(value, Node):
+        if id(value) not in index:
+            stack.append((value, False))
+    elif isinstance(value, (tuple, list)):
+        for v in reversed(value):
+            _push_nodes(stack, v, index)
+
+
+def dumps(node, lineno=True):
+    """ Returns the binary encoding of an AST (a Source or any node) """
+    writer = _Writer(lineno)
+
+    if isinstance(node, Source):
+        description = node.description
+        definitions = description.definitions if description is not None else ()
+        root = bytearray([ROOT_SOURCE])
+        _write_varint(root, writer.string(node.name or ''))
+        _write_varint(root, (node.lineno or 0) if lineno else 0)
+        _write_varint(root, (description.lineno or 0) if lineno and description else 0)
+    else:
+        definitions = (node,)
+        root = bytearray([ROOT_NODE])
+
+    sections = [writer.section(d) for d in definitions]
+    names = [getattr(d, 'name', None) for d in definitions]
+    names = [writer.string(n) + 1 if isinstance(n, str) else 0 for n in names]
+
+    types = bytearray()
+    _write_varint(types, len(writer.types))
+    for cls in writer.types:
+        _write_varint(types, writer.string(cls.__name__))
+        fields = field_names(cls)
+        _write_varint(types, len(fields))
+        for f in fields:
+            _write_varint(types, writer.string(f))
+
+    out = bytearray(MAGIC)
+    _write_varint(out, FORMAT_VERSION)
+    _write_varint(out, FLAG_LINENO if lineno else 0)
+
+    _write_varint(out, len(writer.strings))
+    for s in writer.strings:
+        b = s.encode('utf-8')
+        _write_varint(out, len(b))
+        out += b
+
+    out += types
+    out += root
+    _write_varint(out, len(sections))
+    for name, section in zip(names, sections):
+        _write_varint(out, name)
+        _write_varint(out, len(section))
+    for section in sections:
+        out += section
+    return bytes(out)
+
+
+def dump(node, f, lineno=True):
+    """ Writes the binary encoding of an AST into a binary file object """
+    f.write(dumps(node, lineno))
+
+
+class _Header(object):
+    """ The tables before the sections """
+
+    def __init__(self, read):
+        # read(n) returns the next n bytes
+        self.read = read
+        magic = read(len(MAGIC))
+        if magic != MAGIC:
+            raise FormatError('not a pyverilog AST file')
+        version = self.varint()
+        if version != FORMAT_VERSION:
+            raise FormatError('unsupported format version: %d' % version)
+        self.lineno = bool(self.varint() & FLAG_LINENO)
+
+        self.strings = [read(self.varint()).decode('utf-8') for _ in range(self.varint())]
+
+        self.types = []
+        for _ in range(self.varint()):
+            name = self.strings[self.varint()]
+            cls = getattr(vast, name, None)
+            if not isinstance(cls, type) or not issubclass(cls, Node):
+                raise FormatError("unknown node class: '%s'" % name)
+            fields = [self.strings[self.varint()] for _ in range(self.varint())]
+            known = set(field_names(cls))
+            # the fields unknown to this version are read and dropped
+            fields = [f if f in known else None for f in fields]
+            missing = [f for f in field_names(cls) if f not in fields]
+            self.types.append((cls, fields, missing))
+
+        self.root = self.varint()
+        if self.root == ROOT_SOURCE:
+            self.name = self.strings[self.varint()]
+            self.source_lineno = self.varint()
+            self.description_lineno = self.varint()
+        elif self.root != ROOT_NODE:
+            raise FormatError('unknown root: %d' % self.root)
+
+        self.sections = []
+        for _ in range(self.varint()):
+            name = self.varint()
+            self.sections.append((self.strings[name - 1] if name else None, self.varint()))
+
+    def varint(self):
+        value = 0
+        shift = 0
+        while True:
+            b = self.read(1)
+            if not b:
+                raise FormatError('unexpected end of the file')
+            b = b[0]
+            value |= (b & 0x7f) << shift
+            if b < 0x80:
+                return value
+            shift += 7
+
+
+def _read_section(header, data):
+    strings = header.strings
+    types = header.types
+    lineno = header.lineno
+    nodes = []
+    pos = 0
+    end = len(data)
+
+    def value(pos):
+        tag = data[pos]
+        pos += 1
+        if tag == TAG_NONE:
+            return None, pos
+        if tag == TAG_STR:
+            sid, pos = _read_varint(data, pos)
+            return strings[sid], pos
+        if tag == TAG_NODE:
+            i, pos = _read_varint(data, pos)
+            return nodes[i], pos
+        if tag == TAG_FALSE:
+            return False, pos
+        if tag == TAG_TRUE:
+            return True, pos
+        if tag == TAG_TUPLE or tag == TAG_LIST:
+            n, pos = _read_varint(data, pos)
+            items = []
+            for _ in range(n):
+                v, pos = value(pos)
+                items.append(v)
+            return (tuple(items) if tag == TAG_TUPLE else items), pos
+        if tag == TAG_INT:
+            v, pos = _read_varint(data, pos)
+            return (v >> 1) ^ -(v & 1), pos
+        if tag == TAG_FLOAT:
+            sid, pos = _read_varint(data, pos)
+            return float(strings[sid]), pos
+        if tag == TAG_UNSET:
+            return _unset, pos
+        raise FormatError('unknown tag: %d' % tag)
+
+    while pos < end:
+        tid, pos = _read_varint(data, pos)
+        cls, fields, missing = types[tid]
+        node = cls.__new__(cls)
+        if lineno:
+            node.lineno, pos = _read_varint(data, pos)
+            end_lineno, pos = _read_varint(data, pos)
+            if end_lineno:
+                node.end_lineno = end_lineno - 1
+        else:
+            node.lineno = 0
+        for name in fields:
+            v, pos = value(pos)
+            if name is not None and v is not _unset:
+                setattr(node, name, v)
+        for name in missing:
+            setattr(node, name, None)
+        nodes.append(node)
+
+    if not nodes:
+        raise FormatError('empty section')
+    return nodes[-1]
+
+
+_unset = object()
+
+
+def _load(read, skip, name):
+    header = _Header(read)
+    definitions = []
+    for section_name, length in header.sections:
+        if name is not None and section_name != name:
+            skip(length)
+            continue
+        definition = _read_section(header, read(length))
+        if name is not None:
+            return definition
+        definitions.append(definition)
+
+    if name is not None:
+        raise KeyError(name)
+    if header.root == ROOT_NODE:
+        return definitions[0]
+    description = Description(tuple(definitions), lineno=header.description_lineno)
+    return Source(header.name, description, lineno=header.source_lineno)
+
+
+def loads(data, name=None):
+    """ Returns the AST of a binary encoding, or only its definition
+    (ModuleDef) of the name """
+    data = memoryview(data)
+    pos = [0]
+
+    def read(n):
+        start = pos[0]
+        pos[0] = start + n
+        return bytes(data[start:start + n])
+
+    def skip(n):
+        pos[0] += n
+
+    return _load(read, skip, name)
+
+
+def load(f, name=None):
+    """ Reads an AST from a binary file object, or only its definition
+    (ModuleDef) of the name: the other sections are skipped by seek() """
+
+    def skip(n):
+        f.seek(n, io.SEEK_CUR)
+
+    return _load(f.read, skip, name)
+
+
+def names(f):
+    """ Returns the names of the definitions in a binary file object """
+    return [name for name, _ in _Header(f.read).sections]
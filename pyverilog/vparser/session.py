@@ -0,0 +1,183 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Incremental parsing session
+
+   A ParseSession remembers the module boundaries and fingerprints of the
+   previous parse. On the next parse, only the modules whose text changed
+   are parsed again; the others are reused (with their line numbers moved)
+   and spliced into the same Description.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import io
+import hashlib
+
+from pyverilog.vparser.ast import Node, Source, Description, ModuleDef
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
+from pyverilog.vparser.parser import get_default_parser
+from pyverilog.vparser.stream import split_modules
+
+
+class Chunk(object):
+    def __init__(self, fingerprint, lineno, definitions, directives, default_nettype):
+        self.fingerprint = fingerprint
+        self.lineno = lineno
+        self.definitions = definitions
+        self.directives = directives
+        self.default_nettype = default_nettype  # at the end of the chunk
+
+    def names(self):
+        return [d.name for d in self.definitions if isinstance(d, ModuleDef)]
+
+
+def shift_lineno(node, delta):
+    """ Moves the line numbers of every node of a subtree by delta """
+    visited = set()
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, (tuple, list)):
+            stack.extend(n)
+            continue
+        if not isinstance(n, Node) or id(n) in visited:
+            continue
+        visited.add(id(n))
+        for name in ('lineno', 'end_lineno'):
+            value = getattr(n, name, None)
+            if value:
+                setattr(n, name, value + delta)
+        for name in n.child_names:
+            value = getattr(n, name, None)
+            if isinstance(value, (Node, tuple, list)):
+                stack.append(value)
+
+
+class ParseSession(object):
+    def __init__(self, filelist,
+                 preprocess_include=None,
+                 preprocess_define=None,
+                 preprocess_engine=None,
+                 parser=None):
+        self.preprocessor = VerilogPreprocessor(filelist,
+                                                include=preprocess_include,
+                                                define=preprocess_define,
+                                                engine=preprocess_engine)
+        self.parser = parser
+        self.ast = None
+        self.chunks = []
+        self.directives = ()
+
+        # module names of the last parse
+        self.changed = ()
+        self.added = ()
+        self.removed = ()
+        self.reparsed = 0
+        self.reused = 0
+
+    def parse(self, debug=0):
+        """ Parses the sources again and returns the Source.
+        The same Source and Description objects are returned every time. """
+        parser = self.parser if self.parser is not None else get_default_parser()
+        text = self.preprocessor.preprocess_text()
+
+        previous = {}
+        for chunk in self.chunks:
+            previous.setdefault(chunk.fingerprint, []).append(chunk)
+
+        chunks = []
+        reparsed = 0
+        default_nettype = 'wire'
+
+        for lineno, chunk_text, significant in split_modules(io.StringIO(text)):
+            h = hashlib.sha1(chunk_text.encode())
+            h.update(default_nettype.encode())
+            fingerprint = h.digest()
+
+            candidates = previous.get(fingerprint)
+            if candidates:
+                chunk = candidates.pop(0)
+                delta = lineno - chunk.lineno
+                if delta:
+                    for definition in chunk.definitions:
+                        shift_lineno(definition, delta)
+                    chunk.directives = tuple((l + delta, d) for l, d in chunk.directives)
+                    chunk.lineno = lineno
+            else:
+                if significant:
+                    ast = parser.parse(chunk_text, debug, lineno, default_nettype)
+                    definitions = ast.description.definitions
+                else:
+                    parser.lexer.reset(lineno, default_nettype)
+                    parser.lexer.input(chunk_text)
+                    while parser.lexer.token():
+                        pass
+                    definitions = ()
+                chunk = Chunk(fingerprint, lineno, definitions, parser.get_directives(),
+                              parser.get_default_nettype())
+                reparsed += 1
+
+            chunks.append(chunk)
+            default_nettype = chunk.default_nettype
+
+        old_names = set()
+        for chunk in self.chunks:
+            old_names.update(chunk.names())
+        old_chunks = set(id(chunk) for chunk in self.chunks)
+        kept = set()
+        for chunk in chunks:
+            if id(chunk) in old_chunks:
+                kept.update(chunk.names())
+        new_names = []
+        for chunk in chunks:
+            new_names.extend(chunk.names())
+
+        self.added = tuple(n for n in new_names if n not in old_names)
+        self.changed = tuple(n for n in new_names if n in old_names and n not in kept)
+        self.removed = tuple(sorted(old_names - set(new_names)))
+        self.reparsed = reparsed
+        self.reused = len(chunks) - reparsed
+        self.chunks = chunks
+
+        definitions = []
+        directives = []
+        for chunk in chunks:
+            definitions.extend(chunk.definitions)
+            directives.extend(chunk.directives)
+        self.directives = tuple(directives)
+
+        lineno = definitions[0].lineno if definitions else 0
+        if self.ast is None:
+            self.ast = Source(name='', description=Description(tuple(definitions),
+                                                               lineno=lineno),
+                              lineno=lineno)
+        else:
+            # splice into the existing tree
+            self.ast.description.definitions = tuple(definitions)
+            self.ast.description.lineno = lineno
+            self.ast.lineno = lineno
+
+        return self.ast
+
+    def get_directives(self):
+        return self.directives
+
+    def get_changed_modules(self):
+        """ Returns the names of the modules added, changed or removed by the last parse """
+        return self.added + self.changed + self.removed
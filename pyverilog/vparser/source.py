@@ -0,0 +1,268 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Source text ingestion
+
+   read_source() decodes a file from a memory map, so that the text is
+   built once without an intermediate bytes copy. A file compressed by
+   gzip, xz or bzip2 (.gz, .xz or .bz2) is decompressed in memory, and
+   open_source() opens it as a stream of text lines. LineIndex keeps the offset
+   of every line start of a text in an array('Q') (8 bytes per line), and
+   converts an offset into a line and a column by binary search.
+   SourceMap maps the lines of a preprocessed text back to the original
+   files, as runs of consecutive lines.
+   SourceBuffer keeps the UTF-8 bytes of a parsed text, and a Span is the
+   byte range of an AST node in it (see VerilogParser(spans=True)).
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import mmap
+import gzip
+import lzma
+import bz2
+from array import array
+from bisect import bisect_right
+
+ENCODING = 'utf-8'
+
+# file name suffix -> module to open the compressed file
+COMPRESSIONS = {
+    '.gz': gzip,
+    '.xz': lzma,
+    '.bz2': bz2,
+}
+
+
+def compression(filename):
+    """ Returns the module to open a compressed file, or None """
+    return COMPRESSIONS.get(os.path.splitext(filename)[1])
+
+
+def open_source(filename):
+    """ Opens a (possibly compressed) file as a text stream """
+    module = compression(filename)
+    if module is not None:
+        return module.open(filename, 'rt', encoding=ENCODING)
+    return open(filename, encoding=ENCODING)
+
+
+def read_source(filename):
+    """ Returns the text of a file, decoded straight from a memory map
+    (or decompressed in memory) """
+    if compression(filename) is not None:
+        with open_source(filename) as f:
+            return f.read()
+
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # an empty file cannot be mapped
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            text = str(m, ENCODING)
+            if m.find(b'\r') < 0:
+                return text
+    # universal newlines, as open() in the text mode
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+class LineIndex(object):
+    """ Offsets of the line starts of a text """
+
+    def __init__(self, text, lineno=1):
+        self.text = text
+        self.lineno = lineno  # the line number of the first line
+        starts = array('Q', [0])
+        find = text.find
+        pos = find('\n')
+        while pos >= 0:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line_start(self, offset):
+        """ Returns the offset of the start of the line including offset """
+        return self.starts[bisect_right(self.starts, offset) - 1]
+
+    def location(self, offset):
+        """ Returns (lineno, column) of offset; the column counts from 1 """
+        i = bisect_right(self.starts, offset) - 1
+        return (self.lineno + i, offset - self.starts[i] + 1)
+
+    def line(self, lineno):
+        """ Returns the text of a line without the newline """
+        i = lineno - self.lineno
+        if i < 0 or i >= len(self.starts):
+            raise IndexError('line %d out of range' % lineno)
+        start = self.starts[i]
+        end = self.text.find('\n', start)
+        return self.text[start:] if end < 0 else self.text[start:end]
+
+
+class SourceBuffer(object):
+    """ The UTF-8 bytes of a text, for the zero-copy slices of the spans.
+    lineno is the line number of the first line of the text, and source_map
+    maps the lines of a preprocessed text to the original source. """
+
+    def __init__(self, text, lineno=1, filename=None, source_map=None):
+        self.text = text
+        self.data = memoryview(text.encode('utf-8'))
+        # the byte offsets are the character offsets of an ASCII text
+        self.ascii = len(self.data) == len(text)
+        self.lineno = lineno
+        self.filename = filename
+        self.source_map = source_map
+        self.line_index = None
+        self.line_bytes = None
+
+    def _index(self):
+        if self.line_index is not None:
+            return
+        self.line_index = LineIndex(self.text, self.lineno)
+        if self.ascii:
+            self.line_bytes = self.line_index.starts
+            return
+        line_bytes = array('Q', [0])
+        prev = 0
+        for start in self.line_index.starts[1:]:
+            line_bytes.append(line_bytes[-1] + len(self.text[prev:start].encode('utf-8')))
+            prev = start
+        self.line_bytes = line_bytes
+
+    def byte_offset(self, pos):
+        """ Returns the byte offset of a character offset """
+        if self.ascii:
+            return pos
+        self._index()
+        starts = self.line_index.starts
+        i = bisect_right(starts, pos) - 1
+        return self.line_bytes[i] + len(self.text[starts[i]:pos].encode('utf-8'))
+
+    def location(self, offset):
+        """ Returns (filename, lineno, column, include) of a byte offset in the
+        original source; the column (from 1) is in the parsed line, which
+        differs from the original one after a macro expansion on the line """
+        self._index()
+        line_bytes = self.line_bytes
+        i = bisect_right(line_bytes, offset) - 1
+        column = offset - line_bytes[i] + 1
+        if not self.ascii:
+            column = len(bytes(self.data[line_bytes[i]:offset]).decode('utf-8')) + 1
+        lineno = self.lineno + i
+        if self.source_map is not None:
+            location = self.source_map.lookup(lineno)
+            if location is not None:
+                filename, lineno, include = location
+                return (filename, lineno, column, include)
+        return (self.filename, lineno, column, ())
+
+
+class Span(object):
+    """ The byte range [start, end) of an AST node in a SourceBuffer """
+    __slots__ = ('buffer', 'start', 'end')
+
+    def __init__(self, buffer, start, end):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+
+    def text(self):
+        """ Returns the memoryview of the bytes of the range """
+        return self.buffer.data[self.start:self.end]
+
+    def location(self):
+        """ Returns (filename, lineno, column, include) of the start """
+        return self.buffer.location(self.start)
+
+    def end_location(self):
+        """ Returns (filename, lineno, column, include) of the end """
+        return self.buffer.location(self.end)
+
+    def __repr__(self):
+        return 'Span(%d, %d)' % (self.start, self.end)
+
+
+class SourceMap(object):
+    """ Run-length map from the lines of a preprocessed text to the original
+    (filename, lineno, include), where include is the ((filename, lineno), ...)
+    of the `include directives that led to the file, outermost first.
+    A run is a sequence of lines that follow each other in the same file. """
+
+    def __init__(self):
+        self.filenames = []
+        self.file_ids = {}
+        self.includes = [()]
+        self.include_ids = {(): 0}
+
+        # one entry per run
+        self.lines = array('Q')    # the first preprocessed line
+        self.origins = array('Q')  # its line in the original file
+        self.files = array('L')
+        self.stacks = array('L')
+
+    def __len__(self):
+        return len(self.lines)
+
+    def add(self, lineno, filename, origin, include=()):
+        """ Marks that the preprocessed line lineno comes from the line origin
+        of filename (and the following lines from the following lines) """
+        file_id = self._file_id(filename)
+        stack = tuple([(self._file_id(f), l) for f, l in include])
+        stack_id = self.include_ids.get(stack)
+        if stack_id is None:
+            stack_id = len(self.includes)
+            self.includes.append(stack)
+            self.include_ids[stack] = stack_id
+
+        if self.lines:
+            last = len(self.lines) - 1
+            if (self.files[last] == file_id and self.stacks[last] == stack_id and
+                    self.origins[last] + (lineno - self.lines[last]) == origin):
+                # continues the last run
+                return
+            if self.lines[last] == lineno:
+                # the line is attributed to the latest source
+                self.lines.pop()
+                self.origins.pop()
+                self.files.pop()
+                self.stacks.pop()
+
+        self.lines.append(lineno)
+        self.origins.append(origin)
+        self.files.append(file_id)
+        self.stacks.append(stack_id)
+
+    def _file_id(self, filename):
+        file_id = self.file_ids.get(filename)
+        if file_id is None:
+            file_id = len(self.filenames)
+            self.filenames.append(filename)
+            self.file_ids[filename] = file_id
+        return file_id
+
+    def lookup(self, lineno):
+        """ Returns (filename, lineno, include) of a preprocessed line, or None """
+        i = bisect_right(self.lines, lineno) - 1
+        if i < 0:
+            return None
+        filenames = self.filenames
+        include = tuple([(filenames[f], l) for f, l in self.includes[self.stacks[i]]])
+        return (filenames[self.files[i]], self.origins[i] + lineno - self.lines[i], include)
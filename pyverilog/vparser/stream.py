@@ -0,0 +1,269 @@
+"""
+   Copyright 2013, Shinya Takamaeda-Yamazaki and Contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   ----
+   Streaming module-at-a-time parser
+
+   The text is split at every top-level `endmodule` and each piece is parsed
+   on its own, so that only one module is held in memory at a time.
+   In the recovery mode, a piece with an error is recorded and skipped,
+   and parsing resumes at the next `module` keyword.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+import os
+import io
+import re
+
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
+from pyverilog.vparser.parser import get_default_parser, ParseError
+from pyverilog.vparser.fastlexer import FastVerilogLexer
+from pyverilog.vparser.source import open_source
+
+# comment/string/directive delimiters and the endmodule keyword
+# (not a part of a longer or an escaped identifier)
+_special = re.compile(r'/\*|//|"|`|(?<![\w$\\])endmodule(?![\w$])')
+
+
+def _skip_string(line, pos):
+    end = len(line)
+    i = pos + 1
+    while i < end:
+        c = line[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '"':
+            return i + 1
+        i += 1
+    return end
+
+
+def split_modules(lines, lineno=1):
+    """ Splits Verilog HDL text given as an iterable of lines into chunks,
+    each of which ends with a top-level endmodule.
+    Yields (lineno, text, significant); a chunk is not significant when it
+    has nothing but white spaces, comments and compiler directives. """
+
+    buf = []
+    start = lineno
+    significant = False
+    in_comment = False
+
+    for line in lines:
+        # fast path: nothing that changes the state of the scanner
+        if (not in_comment and 'endmodule' not in line and
+                '/*' not in line and '"' not in line):
+            if not significant:
+                significant = bool(line.split('//', 1)[0].split('`', 1)[0].strip())
+            buf.append(line)
+            lineno += 1
+            continue
+
+        cut = 0
+        pos = 0
+        end = len(line)
+        while pos < end:
+            if in_comment:
+                close = line.find('*/', pos)
+                if close < 0:
+                    break
+                in_comment = False
+                pos = close + 2
+                continue
+
+            m = _special.search(line, pos)
+            if m is None:
+                if line[pos:].strip():
+                    significant = True
+                break
+
+            if line[pos:m.start()].strip():
+                significant = True
+
+            token = m.group()
+            if token == '/*':
+                in_comment = True
+                pos = m.end()
+            elif token == '//' or token == '`':
+                # the rest of the line is a comment or a directive
+                break
+            elif token == '"':
+                significant = True
+                pos = _skip_string(line, m.start())
+            else:
+                buf.append(line[cut:m.end()])
+                yield (start, ''.join(buf), True)
+                buf = []
+                cut = m.end()
+                pos = cut
+                start = lineno
+                significant = False
+
+        buf.append(line[cut:])
+        lineno += 1
+
+    text = ''.join(buf)
+    if text:
+        yield (start, text, significant)
+
+
+def next_module(text, lineno, error):
+    """ Returns (pos, lineno) of the first `module` keyword of a text at or
+    after the position of a ParseError, other than the one the text begins with.
+    The position is the offset of the token of a syntax error, or the line
+    and column of an illegal character. """
+    if error.lineno is None:
+        return None
+    lexer = FastVerilogLexer(error_func=lambda msg, line, column: None)
+    lexer.build()
+    lexer.reset(lineno)
+    lexer.input(text)
+    for tok in iter(lexer.token, None):
+        # resuming at the beginning of the text makes no progress
+        if tok.type != 'MODULE' or tok.lexpos == 0:
+            continue
+        if error.pos is not None:
+            if tok.lexpos >= error.pos:
+                return tok.lexpos, tok.lineno
+        elif (tok.lineno, lexer._find_tok_column(tok)) >= (error.lineno, error.column or 0):
+            return tok.lexpos, tok.lineno
+    return None
+
+
+class ModuleStream(object):
+    """ Iterable of the definitions (ModuleDef and Pragma) of a Verilog HDL text.
+    The directives are available after (or during) the iteration.
+    With recover=True, a ParseError does not stop the iteration: it is
+    appended to errors, and the definitions around it are still yielded. """
+
+    def __init__(self, lines, parser=None, debug=0, recover=False, source_map=None):
+        self.lines = lines
+        self.source_map = source_map
+        self.parser = parser
+        self.debug = debug
+        self.recover = recover
+        self.directives = []
+        self.errors = []
+
+    def __iter__(self):
+        parser = self.parser if self.parser is not None else get_default_parser()
+        default_nettype = 'wire'
+
+        for lineno, text, significant in split_modules(self.lines):
+            if significant and self.recover:
+                definitions, default_nettype = self._parse_recover(parser, text, lineno,
+                                                                   default_nettype)
+                for definition in definitions:
+                    yield definition
+                continue
+
+            if significant:
+                ast = parser.parse(text, self.debug, lineno, default_nettype,
+                                   self.source_map)
+                definitions = ast.description.definitions
+            else:
+                # directives only: the lexer records them
+                parser.lexer.reset(lineno, default_nettype)
+                parser.lexer.input(text)
+                while parser.lexer.token():
+                    pass
+                definitions = ()
+
+            self.directives.extend(parser.get_directives())
+            default_nettype = parser.get_default_nettype()
+
+            for definition in definitions:
+                yield definition
+
+    def _parse_recover(self, parser, text, lineno, default_nettype):
+        definitions = []
+        while True:
+            try:
+                ast = parser.parse(text, self.debug, lineno, default_nettype,
+                                   self.source_map)
+            except ParseError as e:
+                # the directives before the error are kept
+                self.errors.append(e)
+                self.directives.extend(parser.get_directives())
+                default_nettype = parser.get_default_nettype()
+                resync = next_module(text, lineno, e)
+                if resync is None:
+                    break
+                pos, lineno = resync
+                text = text[pos:]
+                continue
+
+            self.directives.extend(parser.get_directives())
+            default_nettype = parser.get_default_nettype()
+            definitions.extend(ast.description.definitions)
+            break
+
+        return definitions, default_nettype
+
+    def get_directives(self):
+        return tuple(self.directives)
+
+    def get_errors(self):
+        return tuple(self.errors)
+
+
+def _read_lines(filelist):
+    for source in filelist:
+        if os.path.isfile(source):
+            with open_source(source) as f:
+                for line in f:
+                    yield line
+        else:
+            for line in io.StringIO(source):
+                yield line
+
+
+def _has_directives(filelist):
+    for line in _read_lines(filelist):
+        if '`' in line:
+            return True
+    return False
+
+
+def iter_modules(filelist,
+                 preprocess_include=None,
+                 preprocess_define=None,
+                 preprocess_engine=None,
+                 preprocess=None,
+                 debug=0):
+    """ Returns a ModuleStream that parses and yields one definition at a time.
+    With preprocess=False, the sources are read line by line without
+    preprocessing, so that the peak memory is bounded by the largest module.
+    With preprocess=True, the 'iverilog' engine is read back line by line from
+    its output file (the same bound), while the 'python' engine holds the whole
+    preprocessed text in memory.
+    By default (None), the sources are preprocessed only if they have
+    a backquote (a compiler directive or a macro).
+    Compressed sources are decompressed on the fly. """
+
+    if preprocess is None:
+        preprocess = _has_directives(filelist)
+
+    if preprocess:
+        pre = VerilogPreprocessor(filelist, include=preprocess_include,
+                                  define=preprocess_define, engine=preprocess_engine)
+        lines = pre.preprocess_lines()
+    else:
+        lines = _read_lines(filelist)
+
+    return ModuleStream(lines, debug=debug)
@@ -0,0 +1,139 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import VerilogParser
+from pyverilog.utils.astdiff import diff, equal, SubtreeHashes, subtree_hash
+from pyverilog.utils.identifierreplace import rewriteIdentifiers
+
+old_text = """
+module a(input x, output y);
+  assign y = x;
+endmodule
+
+module b(input clk, output reg q);
+  always @(posedge clk) q <= ~q;
+  assign w = q;
+  sub u0(.i(clk));
+  sub u1(.i(q)), u2(.i(q));
+endmodule
+
+module c;
+endmodule
+"""
+
+
+def edits(new_text, spans=False):
+    parser = VerilogParser(spans=spans)
+    return [(e.op, e.module, e.node().__class__.__name__, getattr(e.node(), 'name', None))
+            for e in diff(parser.parse(old_text), parser.parse(new_text))]
+
+
+def test_unchanged():
+    new_text = ("// a comment\n" + old_text.replace('  assign y = x;', 'assign y=x;')
+                .replace('sub u0', '\n\nsub  u0'))
+    assert(edits(new_text) == [])
+    assert(edits(new_text, spans=True) == [])
+
+    ast = VerilogParser().parse(old_text)
+    hashes = SubtreeHashes()
+    assert(diff(ast, ast, hashes) == [])
+    assert(len(hashes) == 0)
+
+    # independently parsed trees are compared without hashing, and the
+    # pairs found equal are remembered for the next diff
+    other = VerilogParser().parse(old_text)
+    assert(diff(ast, other, hashes) == [])
+    assert(len(hashes) == 0)
+    pairs = len(hashes.equal_pairs)
+    assert(pairs > 0)
+    assert(diff(ast, other, hashes) == [])
+    assert(len(hashes.equal_pairs) == pairs)
+
+
+def test_items():
+    new_text = old_text.replace('q <= ~q', 'q <= !q')
+    assert(edits(new_text) == [('replace', 'b', 'Always', None)])
+
+    new_text = old_text.replace('sub u0(.i(clk));', '').replace('u2(.i(q))', 'u2(.i(clk))')
+    assert(edits(new_text) == [('delete', 'b', 'Instance', 'u0'),
+                               ('replace', 'b', 'Instance', 'u2')])
+
+    new_text = old_text.replace('  assign w = q;\n', '').replace(
+        'endmodule\n\nmodule c', '  assign w = q;\nendmodule\n\nmodule c')
+    assert(edits(new_text) == [('move', 'b', 'Assign', None)])
+
+    new_text = old_text.replace('output y', 'output [1:0] y')
+    assert(edits(new_text) == [('replace', 'a', 'Portlist', None)])
+
+
+def test_definitions():
+    new_text = old_text.replace('module c;\nendmodule\n', 'module d;\nendmodule\n')
+    assert(edits(new_text) == [('delete', None, 'ModuleDef', 'c'),
+                               ('insert', None, 'ModuleDef', 'd')])
+
+    a, b, c = old_text.split('\n\n')
+    assert(edits('\n\n'.join([c, a, b])) == [('move', None, 'ModuleDef', 'c')])
+    assert(edits('\n\n'.join([c, a, b]), spans=True) == [('move', None, 'ModuleDef', 'c')])
+
+
+def test_hashes():
+    parser = VerilogParser()
+    old = parser.parse(old_text)
+    new = parser.parse(old_text.replace('q <= ~q', 'q <= !q'))
+    hashes = SubtreeHashes()
+    result = diff(old, new, hashes)
+    assert(len(result) == 1)
+    assert(repr(result[0]) == "replace Always in 'b' (line 7 -> line 7)")
+    cached = len(hashes)
+    assert(cached > 0)
+    confirmed = len(hashes.equal_pairs)
+    assert(confirmed > 0)
+    assert(len(diff(old, new, hashes)) == 1)
+    assert(len(hashes) == cached)
+    assert(len(hashes.equal_pairs) == confirmed)
+
+    # the hash of a node, and the one cached on an interned node
+    assert(subtree_hash(old) == hash(old))
+    interned = VerilogParser(intern=True).parse(old_text)
+    assert(subtree_hash(interned) == hash(old))
+    assert(diff(old, interned) == [])
+
+    # a subtree shared by a rewritten tree is not walked again
+    hashes = SubtreeHashes()
+    hashes.get(old)
+    cached = len(hashes)
+    rewritten = rewriteIdentifiers(old, {'x': vast.Identifier('v')})
+    result = diff(old, rewritten, hashes)
+    assert([(e.op, e.module, e.node().__class__.__name__) for e in result] ==
+           [('replace', 'a', 'Assign')])
+    assert(len(hashes) - cached < 10)
+
+    # deeper than the recursion limit
+    node = vast.Identifier('a')
+    for i in range(3000):
+        node = vast.Plus(node, vast.IntConst('1'))
+    expected = subtree_hash(node)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(1000)
+    try:
+        assert(subtree_hash(node) == expected)
+        assert(equal(node, vast.Plus(node.left, vast.IntConst('1'))))
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+class Colliding(SubtreeHashes):
+    # every subtree has the same hash
+    def get(self, node):
+        SubtreeHashes.get(self, node)
+        return 0
+
+
+def test_collision():
+    parser = VerilogParser()
+    old = parser.parse(old_text)
+    new = parser.parse(old_text.replace('q <= ~q', 'q <= !q'))
+    assert([(e.op, e.module) for e in diff(old, new, Colliding())] == [('replace', 'b')])
+    assert(diff(old, parser.parse(old_text), Colliding()) == [])
@@ -0,0 +1,146 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import parse
+from pyverilog.dataflow.visit import NodeVisitor, IterativeVisitor, FusedVisitor
+from pyverilog.dataflow.modulevisitor import ModuleVisitor, IterativeModuleVisitor
+from pyverilog.utils.identifiervisitor import IdentifierVisitor, IterativeIdentifierVisitor
+from pyverilog.utils.identifierreplace import IdentifierReplace
+from pyverilog.utils.dispatch import visit_names, leave_names, visit_method, leave_method
+from pyverilog.utils.dispatch import dispatch
+from pyverilog.ast_code_generator.codegen import ASTCodeGenerator
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+class Recorder(IterativeVisitor):
+    def __init__(self):
+        self.events = []
+
+    def visit_ModuleDef(self, node):
+        self.events.append(('enter', node.name))
+        self.generic_visit(node)
+
+    def leave_ModuleDef(self, node):
+        self.events.append(('leave', node.name))
+
+    def visit_Always(self, node):
+        # only the statement, not the sensitivity list
+        self.events.append(('always', node.lineno))
+        self.generic_visit(node.statement)
+
+    def visit_Identifier(self, node):
+        self.events.append(('id', node.name))
+
+    def visit_Assign(self, node):
+        # skips the subtree
+        self.events.append(('assign', node.lineno))
+
+
+def moduleinfo(visitor):
+    table = visitor.get_moduleinfotable()
+    return [(name, list(table.getSignals(name).keys()), list(table.getConsts(name).keys()))
+            for name in table.get_names()]
+
+
+def test_tables():
+    assert(visit_names[vast.ModuleDef] == 'visit_ModuleDef')
+    assert(leave_names[vast.ModuleDef] == 'leave_ModuleDef')
+
+    visitor = IterativeModuleVisitor()
+    assert(visit_method(visitor, vast.ModuleDef).__func__ is ModuleVisitor.visit_ModuleDef)
+    assert(visit_method(visitor, vast.Identifier).__func__ is IterativeVisitor.generic_visit)
+    assert(visit_method(ModuleVisitor(), vast.Identifier).__func__ is NodeVisitor.generic_visit)
+    assert(leave_method(Recorder(), vast.ModuleDef).__func__ is Recorder.leave_ModuleDef)
+    assert(leave_method(Recorder(), vast.Always) is None)
+
+    visitor = IdentifierVisitor()
+    dispatch(visitor, vast.Identifier('a'))
+    assert(visitor.getIdentifiers() == ('a',))
+
+    assert(ASTCodeGenerator().visit(vast.Plus(vast.Identifier('a'), vast.IntConst('1'))) ==
+           '(a + 1)')
+
+
+class Counter(NodeVisitor):
+    def __init__(self):
+        self.count = 0
+
+    def visit_IntConst(self, node):
+        self.count += 1
+
+
+class LazyCounter(NodeVisitor):
+    # handlers made by __getattr__
+    def __init__(self):
+        self.names = []
+
+    def __getattr__(self, name):
+        if name == 'visit_Identifier':
+            return lambda node: self.names.append(node.name)
+        raise AttributeError(name)
+
+
+def test_instance_handlers():
+    tree = vast.Plus(vast.Identifier('a'), vast.IntConst('1'))
+
+    counter = Counter()
+    counter.visit(tree)
+    assert(counter.count == 1)
+
+    # a handler of an instance overrides the one of the class
+    names = []
+    counter.visit_IntConst = lambda node: names.append(node.value)
+    counter.visit(tree)
+    assert((counter.count, names) == (1, ['1']))
+
+    # a handler of an instance for a class without one
+    counter.visit_Identifier = lambda node: names.append(node.name)
+    counter.visit(tree)
+    assert(names == ['1', 'a', '1'])
+
+    # a method added to the class after the first visit
+    Counter.visit_Plus = lambda self, node: names.append('+')
+    try:
+        Counter().visit(tree)
+    finally:
+        del Counter.visit_Plus
+    assert(names == ['1', 'a', '1', '+'])
+
+    lazy = LazyCounter()
+    lazy.visit(tree)
+    assert(lazy.names == ['a'])
+
+    recorder = Recorder()
+    recorder.visit_IntConst = lambda node: recorder.events.append(('int', node.value))
+    FusedVisitor([recorder, IterativeIdentifierVisitor()]).visit(tree)
+    assert(recorder.events == [('id', 'a'), ('int', '1')])
+
+
+def test_fused():
+    for filename in sorted(os.listdir(codedir)):
+        ast, _ = parse([codedir + filename], preprocess_include=[codedir],
+                       preprocess_define=['STEP=100'])
+
+        expected = [ModuleVisitor(), IdentifierVisitor(), Recorder()]
+        for v in expected:
+            v.visit(ast)
+
+        visitors = [IterativeModuleVisitor(), IterativeIdentifierVisitor(), Recorder()]
+        FusedVisitor(visitors).visit(ast)
+
+        assert(moduleinfo(visitors[0]) == moduleinfo(expected[0]))
+        assert(visitors[1].getIdentifiers() == expected[1].getIdentifiers())
+        assert(visitors[2].events == expected[2].events)
+
+
+def test_fused_stream():
+    ast, _ = parse([codedir + 'led.v', codedir + 'count.v'], preprocess_define=['STEP=100'])
+    module_visitor = IterativeModuleVisitor()
+    recorder = Recorder()
+    FusedVisitor([module_visitor, recorder]).visit_stream(ast.description.definitions)
+    assert(list(module_visitor.get_modulenames()) == ['led', 'TOP'])
+    assert(recorder.events[0] == ('enter', 'led'))
+    assert(recorder.events[-1] == ('leave', 'TOP'))
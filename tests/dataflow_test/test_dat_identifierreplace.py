@@ -0,0 +1,63 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import copy
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import parse
+from pyverilog.utils.identifiervisitor import getIdentifiers
+from pyverilog.utils.identifierreplace import (replaceIdentifiers, rewriteIdentifiers,
+                                               rewriteIdentifiersBatch)
+from pyverilog.ast_code_generator.codegen import ASTCodeGenerator
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def test_rewrite():
+    ast, _ = parse([codedir + 'led.v'], preprocess_define=['STEP=100'])
+    codegen = ASTCodeGenerator()
+    original = codegen.visit(ast)
+    ids = {'count': 'cnt', 'LED': 'led_out'}
+
+    new = rewriteIdentifiers(ast, ids)
+    assert(codegen.visit(ast) == original)
+    assert(codegen.visit(new) == codegen.visit(replaceIdentifiers(copy.deepcopy(ast), ids)))
+    assert('count' not in getIdentifiers(new))
+
+    # the untouched subtrees are shared
+    module = ast.description.definitions[0]
+    new_module = new.description.definitions[0]
+    assert(new_module is not module)
+    assert(new_module.paramlist is module.paramlist)
+    shared = [a for a, b in zip(module.items, new_module.items) if a is b]
+    assert(0 < len(shared) < len(module.items))
+
+    assert(rewriteIdentifiers(ast, {'nosuchsignal': 'x'}) is ast)
+
+
+def test_batch():
+    ast, _ = parse([codedir + 'led.v'], preprocess_define=['STEP=100'])
+    codegen = ASTCodeGenerator()
+    idslist = [{'count': 'count_%d' % i} for i in range(10)] + [{}, {'STEP': 'S', 'LED': 'L'}]
+    trees = rewriteIdentifiersBatch(ast, idslist)
+    assert(len(trees) == len(idslist))
+    for ids, tree in zip(idslist, trees):
+        assert(codegen.visit(tree) == codegen.visit(rewriteIdentifiers(ast, ids)))
+    assert(trees[10] is ast)
+
+
+def test_deep():
+    node = vast.Identifier('a')
+    for i in range(5000):
+        node = vast.Plus(node, vast.Identifier('b%d' % i))
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(1000)
+    try:
+        new = rewriteIdentifiers(node, {'a': 'x'})
+    finally:
+        sys.setrecursionlimit(limit)
+    assert(new.right is node.right)
+    leaf = new
+    while isinstance(leaf, vast.Plus):
+        leaf = leaf.left
+    assert(leaf.name == 'x')
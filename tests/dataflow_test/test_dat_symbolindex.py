@@ -0,0 +1,75 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import parse
+from pyverilog.utils.identifiervisitor import getIdentifiers
+from pyverilog.utils.symbolindex import SymbolIndex
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def test_identifiers():
+    ast, _ = parse([codedir + 'led.v', codedir + 'count.v'], preprocess_define=['STEP=100'])
+    index = SymbolIndex(ast)
+    assert(index.get_modulenames() == ('led', 'TOP'))
+
+    for moduledef in ast.description.definitions:
+        ids = getIdentifiers(moduledef)
+        for name in set(ids):
+            assert(len(index.uses(moduledef.name, name)) == ids.count(name))
+
+    assert([d.__class__.__name__ for d in index.definitions('led', 'LED')] == ['Output', 'Reg'])
+    assert([d.__class__.__name__ for d in index.drivers('led', 'count')] ==
+           ['NonblockingSubstitution'] * 3)
+    assert(index.drivers('led', 'CLK') == ())
+    assert(index.uses('led', 'nosuchsignal') == ())
+
+
+def test_instances():
+    ast, _ = parse([codedir + 'instance_array.v'])
+    index = SymbolIndex(ast)
+
+    instances = index.instances('TOP')
+    assert([i.name for i in instances] ==
+           ['inst_sub0', 'inst_sub1', 'inst_sub2', 'inst_sub3', 'inst_sub4', 'inst_sub5',
+            'U0', '', ''])
+    assert([parent for parent, _ in index.instantiations('SUB')] == ['TOP'] * 6)
+
+    # positional connections named by the ports of SUB
+    connections = index.connections('TOP', 'inst_sub4')
+    assert(list(connections.keys()) == ['VAL', 'LED'])
+    assert(connections['LED'].argname.name == 'LED1')
+    assert(len(index.port_connections('SUB', 'VAL')) == 6)
+
+    # driven by the output ports of SUB and of the gate primitives
+    assert(index.drivers('TOP', 'LED1') == (connections['LED'],))
+    assert(len(index.drivers('TOP', 'LED0')) == 4)
+    assert(len(index.drivers('TOP', 'LED5')) == 1)
+    assert(index.drivers('TOP', 'VAL') == ())
+    assert([d.__class__.__name__ for d in index.drivers('SUB', 'LED')] == ['Assign'])
+
+
+def test_replace():
+    ast, _ = parse([codedir + 'instance_array.v'])
+    index = SymbolIndex(ast)
+    top, sub = ast.description.definitions
+
+    # TOP without the instances of SUB
+    items = [item for item in top.items
+             if not (isinstance(item, vast.InstanceList) and item.module == 'SUB')]
+    new_top = vast.ModuleDef('TOP', top.paramlist, top.portlist, items)
+    assert(index.replace(new_top) is top)
+    assert(index.get_modulenames() == ('TOP', 'SUB'))
+    assert(index.instantiations('SUB') == ())
+    assert(len(index.instances('TOP')) == 3)
+    assert(index.drivers('TOP', 'LED1') == ())
+
+    assert(index.replace(top) is new_top)
+    assert(len(index.instantiations('SUB')) == 6)
+
+    index.remove('TOP')
+    assert(index.get_modulenames() == ('SUB',))
+    assert(index.instantiations('SUB') == ())
+    assert(index.instantiations('and') == ())
@@ -0,0 +1,116 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import parse
+from pyverilog.dataflow.visit import NodeVisitor, IterativeVisitor
+from pyverilog.dataflow.modulevisitor import ModuleVisitor, IterativeModuleVisitor
+from pyverilog.utils.identifiervisitor import getIdentifiers
+
+try:
+    from StringIO import StringIO
+except:
+    from io import StringIO
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+class Recorder(object):
+    def __init__(self):
+        self.events = []
+
+    def visit_ModuleDef(self, node):
+        self.events.append(('enter', node.name))
+        self.generic_visit(node)
+
+    def visit_Always(self, node):
+        # skips the subtree
+        self.events.append(('always', node.lineno))
+
+    def visit_Identifier(self, node):
+        self.events.append(('id', node.name))
+
+
+class RecursiveRecorder(Recorder, NodeVisitor):
+    pass
+
+
+class IterativeRecorder(Recorder, IterativeVisitor):
+    def leave_ModuleDef(self, node):
+        self.events.append(('leave', node.name))
+
+
+def chain(depth):
+    node = vast.Identifier('a')
+    for i in range(depth):
+        node = vast.Plus(node, vast.Identifier('b%d' % i))
+    return node
+
+
+def test_order():
+    ast, _ = parse([codedir + 'led.v'], preprocess_define=['STEP=100'])
+    recursive = RecursiveRecorder()
+    recursive.visit(ast)
+    iterative = IterativeRecorder()
+    iterative.visit(ast)
+    assert(iterative.events[-1] == ('leave', 'led'))
+    assert(iterative.events[:-1] == recursive.events)
+
+
+def test_deep():
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(1000)
+    try:
+        walk_deep(5000)
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def walk_deep(depth):
+    ids = getIdentifiers(chain(depth))
+    assert(len(ids) == depth + 1)
+    assert(ids[:3] == ('a', 'b0', 'b1'))
+
+    output = StringIO()
+    chain(depth).show(buf=output, showlineno=False)
+    lines = output.getvalue().splitlines()
+    assert(len(lines) == 2 * depth + 1)
+    assert(lines[depth] == ' ' * (2 * depth) + 'Identifier: a')
+
+
+class AlwaysCounter(ModuleVisitor):
+    # reads the state filled in by the children after generic_visit()
+    def __init__(self):
+        ModuleVisitor.__init__(self)
+        self.counts = {}
+
+    def visit_ModuleDef(self, node):
+        self.blocks = 0
+        ModuleVisitor.visit_ModuleDef(self, node)
+        self.counts[node.name] = self.blocks
+
+    def visit_Always(self, node):
+        self.blocks += 1
+        self.generic_visit(node)
+
+
+def moduleinfo(visitor, ast):
+    visitor.visit(ast)
+    table = visitor.get_moduleinfotable()
+    return [(name, list(table.getSignals(name).keys()), list(table.getConsts(name).keys()),
+             table.getIOPorts(name)) for name in table.get_names()]
+
+
+def test_modulevisitor():
+    for filename in sorted(os.listdir(codedir)):
+        ast, _ = parse([codedir + filename], preprocess_include=[codedir],
+                       preprocess_define=['STEP=100'])
+        assert(moduleinfo(ModuleVisitor(), ast) == moduleinfo(IterativeModuleVisitor(), ast))
+
+
+def test_override():
+    ast, _ = parse([codedir + 'led.v', codedir + 'count.v'], preprocess_define=['STEP=100'])
+    visitor = AlwaysCounter()
+    visitor.visit(ast)
+    assert(visitor.counts == {'led': 1, 'TOP': 1})
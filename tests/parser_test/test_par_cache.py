@@ -0,0 +1,111 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import shutil
+import pytest
+from pyverilog.vparser.parser import parse, VerilogCodeParser
+from pyverilog.vparser.cache import ASTCache, get_cache
+from pyverilog.vparser.preprocessor import get_iverilog
+
+try:
+    from StringIO import StringIO
+except:
+    from io import StringIO
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def show(ast):
+    output = StringIO()
+    ast.show(buf=output)
+    return output.getvalue()
+
+
+def test_hit_and_miss(tmpdir):
+    cache_dir = str(tmpdir.join('cache'))
+    filelist = [codedir + 'led_main.v']
+    include = [codedir]
+    define = ['STEP=100']
+
+    first, first_directives = parse(filelist, preprocess_include=include,
+                                     preprocess_define=define, cache_dir=cache_dir)
+    cache = get_cache(cache_dir)
+    assert((cache.hits, cache.misses) == (0, 1))
+
+    second, second_directives = parse(filelist, preprocess_include=include,
+                                      preprocess_define=define, cache_dir=cache_dir)
+    assert((cache.hits, cache.misses) == (1, 1))
+    assert(show(first) == show(second))
+    assert(first_directives == second_directives)
+
+    # other options make another entry
+    parse(filelist, preprocess_include=include, preprocess_define=['STEP=10'],
+          cache_dir=cache_dir)
+    assert((cache.hits, cache.misses) == (1, 2))
+    assert(len(cache.entries()) == 2)
+
+
+def test_content_change(tmpdir):
+    cache_dir = str(tmpdir.join('cache'))
+    src = tmpdir.join('top.v')
+    src.write('module top(input a, output b);\n  assign b = a;\nendmodule\n')
+
+    codeparser = VerilogCodeParser([str(src)], cache_dir=cache_dir)
+    codeparser.parse()
+    codeparser.parse()
+    assert((codeparser.cache.hits, codeparser.cache.misses) == (1, 1))
+
+    src.write('module top(input a, output b);\n  assign b = ~a;\nendmodule\n')
+    ast = VerilogCodeParser([str(src)], cache_dir=cache_dir).parse()
+    assert((codeparser.cache.hits, codeparser.cache.misses) == (1, 2))
+    assert('Unot' in show(ast))
+
+
+@pytest.mark.parametrize('engine', ['python', 'iverilog'])
+def test_include_change(tmpdir, engine):
+    if engine == 'iverilog' and shutil.which(get_iverilog()) is None:
+        pytest.skip('iverilog is not installed')
+
+    cache_dir = str(tmpdir.join('cache'))
+    src = tmpdir.join('top.v')
+    src.write('module top(input a, output b);\n`include "body.vh"\nendmodule\n')
+    body = tmpdir.join('body.vh')
+    body.write('  assign b = a;\n')
+
+    def parse_top():
+        return VerilogCodeParser([str(src)], preprocess_include=[str(tmpdir)],
+                                 preprocess_engine=engine, cache_dir=cache_dir).parse()
+
+    parse_top()
+    parse_top()
+    cache = get_cache(cache_dir)
+    assert((cache.hits, cache.misses) == (1, 1))
+
+    body.write('  assign b = ~a;\n')
+    assert('Unot' in show(parse_top()))
+    assert(cache.hits == 1)
+
+
+def test_unknown_dependencies(tmpdir):
+    cache = ASTCache(str(tmpdir))
+    ast, directives = parse([codedir + 'led.v'])
+    assert(not cache.put('a', ast, directives, dependencies=None))
+    assert(cache.get('a') is None)
+
+
+def test_eviction(tmpdir):
+    cache = ASTCache(str(tmpdir))
+    ast, directives = parse([codedir + 'led.v'])
+    cache.put('a', ast, directives)
+    size = cache.size()
+
+    cache.max_size = size * 2
+    os.utime(cache.path('a'), (0, 0))
+    cache.put('b', ast, directives)
+    cache.put('c', ast, directives)
+    assert(cache.get('a') is None)
+    assert(cache.get('b') is not None)
+    assert(cache.get('c') is not None)
+    assert((cache.hits, cache.misses) == (2, 1))
+
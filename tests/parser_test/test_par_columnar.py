@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pickle
+import pytest
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import parse
+from pyverilog.vparser.stream import iter_modules
+from pyverilog.vparser.columnar import ColumnarAST
+from pyverilog.dataflow.modulevisitor import ModuleVisitor
+from pyverilog.ast_code_generator.codegen import ASTCodeGenerator
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def moduleinfo(ast):
+    visitor = ModuleVisitor()
+    visitor.visit(ast)
+    table = visitor.get_moduleinfotable()
+    return [(name, list(table.getSignals(name).keys()), list(table.getConsts(name).keys()),
+             table.getIOPorts(name)) for name in table.get_names()]
+
+
+def test_visitors():
+    codegen = ASTCodeGenerator()
+    for filename in sorted(os.listdir(codedir)):
+        ast, _ = parse([codedir + filename], preprocess_include=[codedir],
+                       preprocess_define=['STEP=100'])
+        columns = ColumnarAST(ast)
+        root = columns.root
+        assert(isinstance(root, vast.Source))
+        assert(root.__class__.__name__ == 'Source')
+        assert(codegen.visit(root) == codegen.visit(ast))
+        assert(moduleinfo(root) == moduleinfo(ast))
+        assert(columns.to_node(columns.roots[0]) == ast)
+
+
+def test_links():
+    ast, _ = parse([codedir + 'led.v'], preprocess_define=['STEP=100'])
+    columns = ColumnarAST(ast)
+
+    module = columns.find(vast.ModuleDef)
+    assert(len(module) == 1)
+    proxy = columns.node(module[0])
+    assert(proxy.name == 'led')
+    assert(proxy.end_lineno == ast.description.definitions[0].end_lineno)
+    assert(proxy.lineno == ast.description.definitions[0].lineno)
+
+    # the links follow children()
+    for index in range(len(columns)):
+        children = columns.node(index).children()
+        indices = columns.children_of(index)
+        assert([c.__class__.__name__ for c in children] ==
+               [columns.kind(i).__name__ for i in indices][:len(children)])
+        for i in indices:
+            assert(columns.parent(i) == index)
+
+    assert(len(columns.find(vast.Identifier)) ==
+           len([i for i in range(len(columns)) if columns.kind(i) is vast.Identifier]))
+
+    with pytest.raises(AttributeError):
+        proxy.name = 'other'
+
+    assert(pickle.loads(pickle.dumps(proxy)) == ast.description.definitions[0])
+
+
+def test_values():
+    port = vast.Port('p', None, (vast.Width(vast.IntConst('3'), vast.IntConst('0')),), None)
+    decl = vast.Decl([vast.Wire('w', signed=True), port])
+    columns = ColumnarAST(decl)
+    loaded = columns.root
+    assert(isinstance(loaded.list, list))
+    assert(loaded.list[0].signed is True)
+    assert(loaded.list[1].dimensions[0].msb.value == '3')
+    assert(columns.to_node(columns.roots[0]) == decl)
+
+    # the left operand is left unset
+    unary = vast.Uminus(vast.Identifier('a'))
+    columns.append(unary)
+    assert(not hasattr(columns.node(columns.roots[1]), 'left'))
+    assert(columns.to_node(columns.roots[1]) == unary)
+
+
+def test_wide_values():
+    ast, _ = parse([codedir + 'count.v'])
+    columns = ColumnarAST(ast)
+    assert(columns.values.typecode == 'i')
+    n = len(columns.values)
+    # a tagged int past 2**31, as the offset of a sequence past 2**28 values
+    columns._extend([1, 1 << 34])
+    assert(columns.values.typecode == 'q')
+    assert(len(columns.values) == n + 2)
+    assert(columns.values[-1] == 1 << 34)
+    assert(columns.to_node(columns.roots[0]) == ast)
+    columns.append(ast)
+    assert(columns.to_node(columns.roots[1]) == ast)
+
+
+def test_from_definitions():
+    ast, _ = parse([codedir + 'led.v', codedir + 'count.v'], preprocess_define=['STEP=100'])
+    stream = iter_modules([codedir + 'led.v', codedir + 'count.v'],
+                          preprocess_define=['STEP=100'])
+    columns = ColumnarAST.from_definitions(stream, ast.name)
+    assert(columns.to_node(columns.roots[0]) == ast)
+    assert([columns.node(i).name for i in columns.find(vast.ModuleDef)] == ['led', 'TOP'])
@@ -0,0 +1,95 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import time
+from pyverilog.vparser.parser import VerilogCodeParser
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
+from pyverilog.vparser.cache import get_cache
+
+top = """\
+`include "ports.vh"
+module top (CLK, in, out);
+  `PORTS
+  assign out = in + `STEP;
+endmodule
+"""
+
+sub = """\
+module sub (CLK, in, out);
+  `PORTS
+  assign out = in;
+endmodule
+"""
+
+ports = """\
+`define PORTS input CLK; input [7:0] in; output [7:0] out;
+`include "step.vh"
+"""
+
+
+def write_design(tmpdir):
+    tmpdir.join('ports.vh').write(ports)
+    tmpdir.join('step.vh').write('`define STEP 1\n')
+    tmpdir.join('top.v').write(top)
+    tmpdir.join('sub.v').write('`include "ports.vh"\n' + sub)
+    return str(tmpdir.join('top.v')), str(tmpdir.join('sub.v'))
+
+
+def age(path, seconds=10):
+    # older than the window in which the digest is not remembered
+    t = time.time() - seconds
+    os.utime(str(path), (t, t))
+
+
+def test_dependencies(tmpdir):
+    filename, _ = write_design(tmpdir)
+    pre = VerilogPreprocessor([filename], engine='python')
+    pre.preprocess_text()
+    assert(sorted(pre.get_dependencies()) == [str(tmpdir.join('ports.vh')),
+                                              str(tmpdir.join('step.vh'))])
+
+    pre = VerilogPreprocessor([filename], engine='iverilog')
+    assert(pre.get_dependencies() is None)
+
+
+def test_include_change(tmpdir):
+    filelist = write_design(tmpdir)
+    cache_dir = str(tmpdir.join('cache'))
+    cache = get_cache(cache_dir)
+
+    def parse():
+        codeparser = VerilogCodeParser(filelist, preprocess_engine='python',
+                                       cache_dir=cache_dir, jobs=1)
+        return codeparser.parse()
+
+    parse()
+    assert((cache.hits, cache.misses) == (0, 2))
+    parse()
+    assert((cache.hits, cache.misses) == (2, 2))
+
+    # both units depend on step.vh through ports.vh
+    tmpdir.join('step.vh').write('`define STEP 2\n')
+    ast = parse()
+    assert((cache.hits, cache.misses) == (2, 4))
+    assert(ast.description.definitions[0].items[-1].right.var.right.value == '2')
+
+    parse()
+    assert((cache.hits, cache.misses) == (4, 4))
+
+
+def test_touch(tmpdir):
+    filename, _ = write_design(tmpdir)
+    for name in ('top.v', 'ports.vh', 'step.vh'):
+        age(tmpdir.join(name))
+    cache_dir = str(tmpdir.join('cache'))
+    VerilogCodeParser([filename], preprocess_engine='python', cache_dir=cache_dir).parse()
+    cache = get_cache(cache_dir)
+    assert(os.path.exists(os.path.join(cache_dir, 'digests.pickle')))
+    assert(len(cache.digests) == 3)
+
+    # a new mtime with the same contents is still a hit
+    tmpdir.join('ports.vh').write(ports)
+    codeparser = VerilogCodeParser([filename], preprocess_engine='python', cache_dir=cache_dir)
+    codeparser.parse()
+    assert((cache.hits, cache.misses) == (1, 1))
@@ -0,0 +1,74 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import glob
+import pytest
+from pyverilog.vparser.lexer import VerilogLexer
+from pyverilog.vparser.fastlexer import FastVerilogLexer
+from pyverilog.vparser.parser import VerilogParser, ParseError
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+text = """\
+`default_nettype none
+module top(input wire CLK, output reg [7:0] out); // comment
+  /* block
+     comment */
+  wire [7:0] x = 8'shff >>> 2'b1 + 3.5e1 - .5;
+  assign \\esc$name = x !== 'hz ? x[3+:2] : ~^x;
+  always @(posedge CLK) out <= {x, "str\\n"};
+endmodule
+"""
+
+
+def tokens(lexer_class, text):
+    errors = []
+    lexer = lexer_class(error_func=lambda msg, line, column: errors.append((msg, line, column)))
+    lexer.build()
+    lexer.input(text)
+    ret = []
+    while True:
+        tok = lexer.token()
+        if not tok:
+            break
+        ret.append((tok.type, tok.value, tok.lineno, tok.lexpos))
+    return ret, lexer.get_directives(), lexer.get_default_nettype(), errors
+
+
+def test_same_tokens():
+    assert(tokens(FastVerilogLexer, text) == tokens(VerilogLexer, text))
+
+    for filename in sorted(glob.glob(codedir + '*.v')):
+        source = open(filename).read()
+        assert(tokens(FastVerilogLexer, source) == tokens(VerilogLexer, source))
+
+
+def test_illegal_character():
+    source = 'module a;\n  wire \x01 x;\nendmodule\n'
+    expected = tokens(VerilogLexer, source)
+    assert(tokens(FastVerilogLexer, source) == expected)
+    assert(expected[3] == [("Illegal character '\\x01'", 2, 9)])
+
+
+def test_parse():
+    expected = VerilogParser(lexer_engine='ply').parse(text)
+
+    parser = VerilogParser(lexer_engine='fast')
+    ast = parser.parse(text)
+    assert(isinstance(parser.lexer, FastVerilogLexer))
+    assert(ast == expected)
+    assert(parser.get_directives() == ((1, '`default_nettype none\n'),))
+    assert(ast.description.definitions[0].default_nettype == 'none')
+
+    with pytest.raises(ParseError):
+        parser.parse('module a;\nwire wire;\nendmodule\n')
+
+    with pytest.raises(ValueError):
+        VerilogParser(lexer_engine='unknown')
+
+
+if __name__ == '__main__':
+    test_same_tokens()
+    test_illegal_character()
+    test_parse()
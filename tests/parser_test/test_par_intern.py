@@ -0,0 +1,116 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pickle
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import VerilogParser, parse
+from pyverilog.vparser.intern import Interner
+
+try:
+    from StringIO import StringIO
+except:
+    from io import StringIO
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+code = """\
+module top (a, b, c, d);
+  input [7:0] a;
+  input [7:0] b;
+  output [7:0] c;
+  output [7:0] d;
+  assign c = (a + b) ^ 8'hff;
+  assign d = (a + b) ^ 8'hff;
+endmodule
+"""
+
+netlist = """\
+module top (a, y, z);
+  input [1:0] a;
+  output y, z;
+  NAND2X1 U1 (.A(a[0]), .B(a[1]), .Y(y));
+  NAND2X1 U2 (.A(a[0]), .B(a[1]), .Y(z));
+endmodule
+"""
+
+
+def show(ast):
+    output = StringIO()
+    ast.show(buf=output, showlineno=False)
+    return output.getvalue()
+
+
+def test_intern():
+    parser = VerilogParser(intern=True)
+    ast = parser.parse(code)
+    assert(ast == VerilogParser().parse(code))
+    assert(show(ast) == show(VerilogParser().parse(code)))
+
+    items = ast.description.definitions[0].items
+    c, d = items[-2], items[-1]
+    assert(c.right is d.right)
+    assert(c.left is not d.left)
+    # the widths of the ports
+    assert(items[0].list[0].width is items[3].list[0].width)
+    assert(parser.interner.hits > 0)
+
+    # the cached hash is the structural hash
+    right = VerilogParser().parse(code).description.definitions[0].items[-1].right
+    assert(c.right._hash == hash(right))
+    assert(c.right == right and right == c.right)
+    assert({c.right: 1}[right] == 1)
+
+    # shared with the next parse by the same parser
+    other = parser.parse(code.replace('module top', 'module other'))
+    assert(other.description.definitions[0].items[-1].right is d.right)
+
+
+def test_interner():
+    interner = Interner()
+    a = interner.intern(vast.Plus(vast.Identifier('x'), vast.IntConst('1')))
+    b = interner.intern(vast.Plus(vast.Identifier('x'), vast.IntConst('1')))
+    c = interner.intern(vast.Minus(vast.Identifier('x'), vast.IntConst('1')))
+    assert(a is b)
+    assert(a.left is c.left and a.right is c.right)
+    assert(interner.intern(vast.FloatConst('1')) is not a.right)
+    assert(len(interner) == 5)
+
+    # a statement is not interned, its expressions are in the deep mode
+    s = vast.Substitution(vast.Lvalue(vast.Identifier('y')),
+                          vast.Rvalue(vast.Plus(vast.Identifier('x'), vast.IntConst('1'))))
+    assert(interner.intern(s, deep=True) is s)
+    assert(s.right.var is a)
+    assert(getattr(s, '_hash', None) is None)
+
+
+def test_pickle():
+    ast = VerilogParser(intern=True).parse(code)
+    copied = pickle.loads(pickle.dumps(ast))
+    items = copied.description.definitions[0].items
+    assert(items[-2].right is items[-1].right)
+    assert(getattr(items[-1].right, '_hash', None) is None)
+    assert(copied == ast)
+
+
+def test_cache(tmpdir):
+    filename = tmpdir.join('code.v')
+    filename.write(code)
+    cache_dir = str(tmpdir.join('cache'))
+    for order in ((False, True), (True, False)):
+        for intern in order:
+            ast, _ = parse([str(filename)], preprocess_engine='python', intern=intern,
+                           cache_dir=cache_dir)
+            items = ast.description.definitions[0].items
+            assert((items[-2].right is items[-1].right) == intern)
+            assert((getattr(items[-1].right, '_hash', None) is not None) == intern)
+
+
+def test_netlist(tmpdir):
+    filename = tmpdir.join('netlist.v')
+    filename.write(netlist)
+    ast, _ = parse([str(filename)], preprocess_engine='python', netlist=True, intern=True)
+    u1, u2 = ast.description.definitions[0].items[-2:]
+    assert(u1.instances[0].portlist[0].argname is u2.instances[0].portlist[0].argname)
+    expected, _ = parse([str(filename)], preprocess_engine='python')
+    assert(show(ast) == show(expected))
@@ -0,0 +1,90 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import glob
+import pytest
+import pyverilog.vparser.parser as vparser
+from pyverilog.vparser.parser import VerilogParser, ParseError
+from pyverilog.vparser.netlist import NetlistParser
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+text = """\
+module cell(A, B, Y);
+  input A, B;
+  output Y;
+  assign Y = ~(A & B);
+endmodule
+
+module top (CLK, in,
+            out);
+  input CLK;
+  input [3:0] in;
+  output [3:0] out;
+  wire [3:0] n;
+  wire \\esc$name ;
+  NAND2X1 U0 ( .A(in[0]), .B(in[1]), .Y(n[0]) );
+  NAND2X1 U1 (.A(in[2]),
+              .B(in[3]), // comment
+              .Y(n[1]));
+  DFFX1 #(.INIT(1'b0)) U2 (.D(n[1:0]), .CK(CLK), .Q({n[2], \\esc$name }));
+  cell U3 (n[0], n[1], n[3]);
+  assign out = {n[3:1], 1'b0};
+endmodule
+"""
+
+
+def repr_tree(node):
+    if isinstance(node, (tuple, list)):
+        return [repr_tree(c) for c in node]
+    if not hasattr(node, 'attr_names'):
+        return node
+    attrs = [(name, getattr(node, name)) for name in node.attr_names]
+    return (node.__class__.__name__, node.lineno, getattr(node, 'end_lineno', None),
+            attrs, [repr_tree(c) for c in node.children()])
+
+
+def test_same_ast():
+    expected = VerilogParser().parse(text)
+
+    parser = NetlistParser()
+    ast = parser.parse(text)
+    assert(repr_tree(ast) == repr_tree(expected))
+    assert(parser.fast_modules == 1)
+    assert(parser.fallback_modules == 1)
+
+    for filename in sorted(glob.glob(codedir + '*.v')):
+        source = open(filename).read()
+        general = VerilogParser()
+        try:
+            expected = general.parse(source)
+        except ParseError:
+            continue
+        parser = NetlistParser()
+        ast = parser.parse(source)
+        assert(repr_tree(ast) == repr_tree(expected))
+        assert(parser.get_directives() == general.get_directives())
+
+
+def test_error():
+    source = 'module a (x);\n  input x;\n  BUF u0 (.A(x), .Y(x)\nendmodule\n'
+    with pytest.raises(ParseError) as expected:
+        VerilogParser().parse(source)
+    with pytest.raises(ParseError) as error:
+        NetlistParser().parse(source)
+    assert(str(error.value) == str(expected.value))
+
+
+def test_parse_netlist():
+    filelist = [codedir + 'primitive.v']
+    expected = vparser.parse(filelist)
+    ast, directives = vparser.parse(filelist, netlist=True)
+    assert(repr_tree(ast) == repr_tree(expected[0]))
+    assert(directives == expected[1])
+
+
+if __name__ == '__main__':
+    test_same_ast()
+    test_error()
+    test_parse_netlist()
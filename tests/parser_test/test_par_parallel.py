@@ -0,0 +1,73 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+from pyverilog.vparser.parser import parse, VerilogCodeParser, ParseError
+
+try:
+    from StringIO import StringIO
+except:
+    from io import StringIO
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+filelist = [codedir + 'led.v', codedir + 'count.v', codedir + 'delay.v', codedir + 'ram.v']
+
+
+def show(node):
+    output = StringIO()
+    node.show(buf=output)
+    return output.getvalue()
+
+
+def test():
+    ast, directives = parse(filelist, jobs=2)
+    definitions = ast.description.definitions
+
+    expected_definitions = []
+    expected_directives = []
+    for f in filelist:
+        a, d = parse([f])
+        expected_definitions.extend(a.description.definitions)
+        expected_directives.extend(d)
+
+    # line numbers are the ones of each file
+    assert([show(d) for d in definitions] == [show(d) for d in expected_definitions])
+    assert(directives == tuple(expected_directives))
+
+
+def test_serial_units(tmpdir):
+    cache_dir = str(tmpdir)
+    serial = VerilogCodeParser(filelist, jobs=1, cache_dir=cache_dir)
+    serial_ast = serial.parse()
+    assert((serial.cache.hits, serial.cache.misses) == (0, len(filelist)))
+
+    parallel = VerilogCodeParser(filelist, jobs=2, cache_dir=cache_dir)
+    parallel_ast = parallel.parse()
+    assert((parallel.cache.hits, parallel.cache.misses) == (len(filelist), len(filelist)))
+    assert(show(serial_ast) == show(parallel_ast))
+
+
+def test_error(tmpdir):
+    bad = tmpdir.join('bad.v')
+    bad.write('module bad;\n  wire wire;\nendmodule\n')
+    try:
+        parse([codedir + 'led.v', str(bad)], jobs=2)
+    except ParseError as e:
+        assert(str(bad) in str(e))
+        assert('line:2' in str(e))
+        return
+    assert(False)
+
+
+def test_unsupported():
+    for flags in ({'intern': True}, {'spans': True}):
+        try:
+            parse([codedir + 'led.v'], jobs=2, **flags)
+        except ValueError:
+            continue
+        assert(False)
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,97 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import glob
+import concurrent.futures
+import ply.yacc
+import pyverilog.vparser.parsetab as parsetab
+from pyverilog.vparser.parser import VerilogParser, get_default_parser, parse, ParseError
+from pyverilog.vparser.netlist import get_netlist_parser
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def grammar_signature(parser):
+    pdict = dict([(k, getattr(parser, k)) for k in dir(parser)])
+    pdict['__file__'] = sys.modules[pdict['__module__']].__file__
+    pinfo = ply.yacc.ParserReflect(pdict)
+    pinfo.get_all()
+    return pinfo.signature()
+
+
+def test_signature():
+    # the shipped tables must be regenerated (make -C pyverilog/vparser parsetab)
+    # whenever the grammar changes
+    parser = get_default_parser()
+    assert(parsetab._lr_signature == grammar_signature(parser))
+
+
+def test_no_file_writes(tmpdir):
+    cwd = os.getcwd()
+    os.chdir(str(tmpdir))
+    try:
+        VerilogParser()
+    finally:
+        os.chdir(cwd)
+    assert(os.listdir(str(tmpdir)) == [])
+
+
+def test_shared_parser():
+    parser = get_default_parser()
+    assert(parser is get_default_parser())
+
+    text = open(codedir + 'led_main.v').read().replace('`include "led.v"', '')
+    text = text.replace('`STEP', '100')
+    first = parser.parse(text)
+    first_directives = parser.get_directives()
+    second = parser.parse(text)
+    second_directives = parser.get_directives()
+
+    assert(first == second)
+    assert(first.description.definitions[0].lineno == second.description.definitions[0].lineno)
+    assert(first_directives == second_directives == ((1, '`default_nettype none\n'),))
+    assert(second.description.definitions[0].default_nettype == 'none')
+
+
+def test_threads():
+    # each thread has its own default parser
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        others = list(executor.map(lambda _: (get_default_parser(), get_netlist_parser()),
+                                   range(2)))
+    assert(all(p is not get_default_parser() for p, _ in others))
+    assert(all(p is not get_netlist_parser() for _, p in others))
+
+    sources = sorted(glob.glob(codedir + '*.v'))
+
+    def result(args):
+        source, netlist = args
+        try:
+            ast, directives = parse([source], preprocess_include=[codedir],
+                                    preprocess_define=['STEP=100'], netlist=netlist)
+        except ParseError as e:
+            return str(e)
+        return (walk(ast), directives)
+
+    units = [(source, netlist) for source in sources for netlist in (False, True)]
+    expected = [result(unit) for unit in units]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(result, units * 5))
+    for i, r in enumerate(results):
+        assert(r == expected[i % len(units)])
+
+
+def walk(ast):
+    ret = []
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        ret.append((node.__class__.__name__, node.lineno,
+                    tuple([getattr(node, n) for n in node.attr_names])))
+        stack.extend(reversed(node.children()))
+    return ret
+
+
+if __name__ == '__main__':
+    test_signature()
+    test_shared_parser()
@@ -0,0 +1,117 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import glob
+import threading
+import concurrent.futures
+import pytest
+from pyverilog.vparser.parser import VerilogParser, VerilogCodeParser, ParseError, parse_unit
+from pyverilog.vparser.pool import ParserPool, PoolTimeout
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def make_text(i):
+    return ('`default_nettype %s\n'
+            'module m%d (input [%d:0] a, output [%d:0] b);\n'
+            '  assign b = a + %d;\n'
+            'endmodule\n' % ('none' if i % 2 else 'wire', i, i % 16, i % 16, i))
+
+
+def test_stress():
+    texts = [make_text(i) for i in range(64)]
+    texts.extend([open(f).read() for f in sorted(glob.glob(codedir + '*.v'))])
+    texts.append('module bad;\n  wire wire;\nendmodule\n')
+
+    def result(parser, text):
+        try:
+            ast = parser.parse(text)
+        except ParseError as e:
+            return str(e)
+        return (repr_ast(ast), parser.get_directives(),
+                ast.description.definitions[0].default_nettype)
+
+    serial = VerilogParser()
+    expected = [result(serial, text) for text in texts]
+
+    pool = ParserPool(size=3)
+
+    def work(i):
+        text = texts[i % len(texts)]
+        try:
+            ast, directives = pool.parse(text, filename='t%d.v' % i)
+        except ParseError as e:
+            return str(e).replace('t%d.v' % i, '')
+        return (repr_ast(ast), directives, ast.description.definitions[0].default_nettype)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(work, range(len(texts) * 8)))
+
+    for i, r in enumerate(results):
+        assert(r == expected[i % len(texts)])
+    assert(pool.created <= 3)
+    assert(len(pool._idle) == pool.created)
+
+
+def repr_ast(ast):
+    buf = []
+
+    def walk(node):
+        buf.append((node.__class__.__name__, node.lineno,
+                    tuple([getattr(node, n) for n in node.attr_names])))
+        for c in node.children():
+            walk(c)
+    walk(ast)
+    return buf
+
+
+def test_default_parsers():
+    # the default path (VerilogCodeParser and parse_unit) runs in several threads
+    sources = sorted(glob.glob(codedir + '*.v')) * 4
+
+    def result(codeparser):
+        try:
+            ast = codeparser.parse()
+        except ParseError as e:
+            return str(e)
+        return repr_ast(ast), codeparser.get_directives()
+
+    def unit(source):
+        try:
+            definitions, directives, _, _, _ = parse_unit(source, [codedir], ['STEP=100'])
+        except ParseError as e:
+            return str(e)
+        return [repr_ast(d) for d in definitions], directives
+
+    def codeparsers():
+        # built in this thread, parsed in the others
+        return [VerilogCodeParser([source], preprocess_include=[codedir],
+                                  preprocess_define=['STEP=100'], netlist=i % 2 == 1)
+                for i, source in enumerate(sources)]
+
+    expected = [result(c) for c in codeparsers()]
+    expected_units = [unit(source) for source in sources]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(result, codeparsers()))
+        units = list(executor.map(unit, sources))
+    assert(results == expected)
+    assert(units == expected_units)
+
+
+def test_checkout():
+    pool = ParserPool(size=1)
+    parser = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.01)
+
+    got = []
+    thread = threading.Thread(target=lambda: got.append(pool.acquire()))
+    thread.start()
+    pool.release(parser)
+    thread.join()
+    assert(got == [parser])
+    assert(pool.created == 1)
+
+    with pytest.raises(ValueError):
+        ParserPool(size=0)
@@ -0,0 +1,86 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pytest
+from pyverilog.vparser.parser import VerilogCodeParser, ParseError
+
+text = """\
+module good1 (a);
+  input a;
+endmodule
+
+module bad1;
+  wire wire;
+endmodule
+
+`default_nettype none
+module bad2;
+  wire a;
+// endmodule is missing
+
+module good2;
+  wire b;
+endmodule
+
+module bad3;
+  wire \x01;
+endmodule
+module good3;
+endmodule
+"""
+
+
+def names(ast):
+    return [d.name for d in ast.description.definitions]
+
+
+def test_recover():
+    codeparser = VerilogCodeParser([text], preprocess_engine='python', recover=True)
+    ast = codeparser.parse()
+    assert(names(ast) == ['good1', 'good2', 'good3'])
+    assert(ast.description.definitions[1].default_nettype == 'none')
+    assert(codeparser.get_directives() == ((9, '`default_nettype none\n'),))
+
+    errors = codeparser.get_errors()
+    assert([e.location[1] for e in errors] == [6, 14, 19])
+    assert([e.msg for e in errors] ==
+           ['before: ";"', 'before: "module"', "Illegal character '\\x01'"])
+    assert(str(errors[0]) == '<string> line:6: before: ";"')
+
+
+def test_no_recover():
+    with pytest.raises(ParseError):
+        VerilogCodeParser([text], preprocess_engine='python').parse()
+
+
+def test_recover_units(tmpdir):
+    good = tmpdir.join('good.v')
+    good.write('module good;\nendmodule\n')
+    bad = tmpdir.join('bad.v')
+    bad.write(text)
+    codeparser = VerilogCodeParser([str(bad), str(good)], preprocess_engine='python',
+                                   recover=True, jobs=1)
+    ast = codeparser.parse()
+    assert(names(ast) == ['good1', 'good2', 'good3', 'good'])
+    assert([(e.location[0], e.location[1]) for e in codeparser.get_errors()] ==
+           [(str(bad), 6), (str(bad), 14), (str(bad), 19)])
+
+
+def test_recover_before_module():
+    # the module right after the error is not skipped
+    codeparser = VerilogCodeParser(['wire x;\nmodule b(input a); endmodule\n'
+                                    'module c(input a); endmodule\n'],
+                                   preprocess_engine='python', recover=True)
+    assert(names(codeparser.parse()) == ['b', 'c'])
+    assert([e.location[1] for e in codeparser.get_errors()] == [1])
+
+    codeparser = VerilogCodeParser(['module a; endmodule \x01 module b; endmodule\n'],
+                                   preprocess_engine='python', recover=True)
+    assert(names(codeparser.parse()) == ['a', 'b'])
+
+
+if __name__ == '__main__':
+    test_recover()
+    test_no_recover()
+    test_recover_before_module()
@@ -0,0 +1,68 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import io
+import pytest
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import parse
+from pyverilog.vparser import serialize
+from pyverilog.ast_code_generator.codegen import ASTCodeGenerator
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def test_roundtrip():
+    codegen = ASTCodeGenerator()
+    for filename in sorted(os.listdir(codedir)):
+        ast, _ = parse([codedir + filename], preprocess_include=[codedir],
+                       preprocess_define=['STEP=100'])
+        data = serialize.dumps(ast)
+        loaded = serialize.loads(data)
+        assert(loaded == ast)
+        assert(codegen.visit(loaded) == codegen.visit(ast))
+        assert(loaded.description.definitions[0].lineno ==
+               ast.description.definitions[0].lineno)
+
+        loaded = serialize.loads(serialize.dumps(ast, lineno=False))
+        assert(loaded == ast)
+        assert(loaded.description.definitions[0].lineno == 0)
+
+
+def test_module_by_name():
+    ast, _ = parse([codedir + 'led.v', codedir + 'count.v'], preprocess_define=['STEP=100'])
+    f = io.BytesIO()
+    serialize.dump(ast, f)
+    f.seek(0)
+    assert(serialize.names(f) == ['led', 'TOP'])
+
+    f.seek(0)
+    top = serialize.load(f, 'TOP')
+    assert(isinstance(top, vast.ModuleDef))
+    assert(top == ast.description.definitions[1])
+
+    with pytest.raises(KeyError):
+        serialize.loads(f.getvalue(), 'nosuchmodule')
+
+
+def test_shared_and_values():
+    a = vast.Identifier('a')
+    shared = vast.Plus(a, vast.IntConst('1'))
+    node = vast.Assign(vast.Lvalue(vast.Identifier('x')), vast.Rvalue(vast.Times(shared, shared)))
+    loaded = serialize.loads(serialize.dumps(node))
+    assert(loaded == node)
+    times = loaded.right.var
+    assert(times.left is times.right)
+
+    port = vast.Port('p', None, (vast.Width(vast.IntConst('3'), vast.IntConst('0')),), None)
+    assert(serialize.loads(serialize.dumps(port)).dimensions == port.dimensions)
+
+
+def test_format_errors():
+    with pytest.raises(serialize.FormatError):
+        serialize.loads(b'not an AST file')
+
+    data = bytearray(serialize.dumps(vast.Identifier('a')))
+    data[len(serialize.MAGIC)] = serialize.FORMAT_VERSION + 1
+    with pytest.raises(serialize.FormatError):
+        serialize.loads(bytes(data))
@@ -0,0 +1,69 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+from pyverilog.vparser.parser import parse
+from pyverilog.vparser.session import ParseSession
+
+try:
+    from StringIO import StringIO
+except:
+    from io import StringIO
+
+source = """\
+module a(input x, output y);
+  assign y = x;
+endmodule
+
+module b(input x, output y);
+  assign y = ~x;
+endmodule
+
+`default_nettype none
+module c(input wire x, output wire y);
+  assign y = x;
+endmodule
+"""
+
+
+def show(node):
+    output = StringIO()
+    node.show(buf=output)
+    return output.getvalue()
+
+
+def test(tmpdir):
+    src = tmpdir.join('top.v')
+    src.write(source)
+
+    session = ParseSession([str(src)])
+    ast = session.parse()
+    description = ast.description
+    a, b, c = description.definitions
+    assert(session.added == ('a', 'b', 'c'))
+    assert(session.reparsed == 4)
+
+    # a line is added in b: a is kept, b is reparsed, c is moved down
+    src.write(source.replace('  assign y = ~x;\n', '  wire t;\n  assign y = ~x;\n'))
+    ast = session.parse()
+    assert(ast.description is description)
+    assert(session.changed == ('b',))
+    assert(session.added == () and session.removed == ())
+    assert(session.get_changed_modules() == ('b',))
+    assert(description.definitions[0] is a)
+    assert(description.definitions[1] is not b)
+    assert(description.definitions[2] is c)
+    assert(session.reparsed == 1)
+
+    expected, directives = parse([str(src)])
+    assert(show(ast) == show(expected))
+    assert(session.get_directives() == directives)
+    assert(c.default_nettype == 'none')
+
+    # b is renamed and a is removed
+    src.write(source.replace('module a(', 'module d(').replace('module b(', 'module e('))
+    ast = session.parse()
+    assert(session.added == ('d', 'e'))
+    assert(session.removed == ('a', 'b'))
+    expected, directives = parse([str(src)])
+    assert(show(ast) == show(expected))
@@ -0,0 +1,126 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pickle
+import copy
+import inspect
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import parse
+
+try:
+    from StringIO import StringIO
+except:
+    from io import StringIO
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def show(ast):
+    output = StringIO()
+    ast.show(buf=output)
+    return output.getvalue()
+
+
+def node_classes():
+    return [c for _, c in inspect.getmembers(vast, inspect.isclass)
+            if issubclass(c, vast.Node)]
+
+
+def walk(node):
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        yield n
+        stack.extend(n.children())
+
+
+def test_slots():
+    for cls in node_classes():
+        assert('__slots__' in vars(cls)), cls.__name__
+
+    ast, _ = parse([codedir + 'led.v'], preprocess_define=['STEP=100'])
+    for node in walk(ast):
+        assert(not hasattr(node, '__dict__'))
+
+
+def test_child_names():
+    for filename in sorted(os.listdir(codedir)):
+        ast, _ = parse([codedir + filename], preprocess_include=[codedir],
+                       preprocess_define=['STEP=100'])
+        for node in walk(ast):
+            fields = []
+            for name in node.child_names:
+                value = getattr(node, name, None)
+                if isinstance(value, (tuple, list)):
+                    fields.extend(value)
+                elif value is not None:
+                    fields.append(value)
+            assert(all(any(c is f for f in fields) for c in node.children()))
+
+
+class Marker(vast.Node):
+    # stands for a node or a sequence of one node
+    __slots__ = ('field',)
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        return iter((self,))
+
+    def __len__(self):
+        return 1
+
+    def children(self):
+        return ()
+
+
+def test_child_names_of_classes():
+    # every field of every class holds a Marker: the fields returned by
+    # children() must be the child_names
+    for cls in node_classes():
+        if cls is vast.Node:
+            continue
+        node = cls.__new__(cls)
+        names = [n for c in cls.__mro__ for n in vars(c).get('__slots__', ())
+                 if n not in vast.Node.__slots__]
+        for name in names:
+            setattr(node, name, Marker(name))
+        fields = set([c.field for c in node.children() if isinstance(c, Marker)])
+        assert(fields == set(cls.child_names)), cls.__name__
+
+
+def test_pickle():
+    ast, _ = parse([codedir + 'led.v'], preprocess_define=['STEP=100'])
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        copied = pickle.loads(pickle.dumps(ast, protocol=protocol))
+        assert(show(copied) == show(ast))
+        assert(copied == ast)
+
+    # written before the nodes had __slots__
+    node = vast.Identifier.__new__(vast.Identifier)
+    node.__setstate__({'lineno': 1, 'name': 'x', 'scope': None})
+    assert(node == vast.Identifier('x'))
+
+
+class TaggedIdentifier(vast.Identifier):
+    # no __slots__: the extra attributes are in __dict__
+    pass
+
+
+def test_pickle_subclass():
+    node = TaggedIdentifier('x', lineno=2)
+    node.tag = 'clock'
+    copies = [pickle.loads(pickle.dumps(node)), copy.copy(node), copy.deepcopy(node)]
+    for copied in copies:
+        assert(type(copied) is TaggedIdentifier)
+        assert((copied.name, copied.lineno, copied.tag) == ('x', 2, 'clock'))
+
+
+def test_end_lineno():
+    node = vast.Block((), lineno=3)
+    assert(not hasattr(node, 'end_lineno'))
+    assert(show(node) == 'Block: None (at 3)\n')
+    node.end_lineno = 5
+    assert(show(node) == 'Block: None (from 3 to 5)\n')
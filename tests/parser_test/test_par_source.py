@@ -0,0 +1,61 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pytest
+from pyverilog.vparser.source import read_source, LineIndex
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
+from pyverilog.vparser.lexer import VerilogLexer
+from pyverilog.vparser.fastlexer import FastVerilogLexer
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def test_read_source(tmpdir):
+    filename = codedir + 'led.v'
+    assert(read_source(filename) == open(filename).read())
+
+    empty = tmpdir.join('empty.v')
+    empty.write('')
+    assert(read_source(str(empty)) == '')
+
+    crlf = tmpdir.join('crlf.v')
+    crlf.write_binary(b'module a;\r\nwire x;\rendmodule\r\n')
+    assert(read_source(str(crlf)) == 'module a;\nwire x;\nendmodule\n')
+
+
+def test_line_index():
+    text = 'module a;\n  wire x;\n\nendmodule'
+    index = LineIndex(text, lineno=10)
+    assert(len(index) == 4)
+    assert(index.location(0) == (10, 1))
+    assert(index.location(text.index('x')) == (11, 8))
+    assert(index.location(text.index('endmodule')) == (13, 1))
+    assert(index.line_start(text.index('wire')) == 10)
+    assert(index.line(11) == '  wire x;')
+    assert(index.line(12) == '')
+    assert(index.line(13) == 'endmodule')
+    with pytest.raises(IndexError):
+        index.line(14)
+
+
+def test_preprocess_without_directives():
+    source = 'module a;\n  wire x; // comment\nendmodule\n'
+    text = VerilogPreprocessor([source], engine='python').preprocess_text()
+    assert(text is source)
+
+    source = '`define W 8\nmodule a;\n  wire [`W-1:0] x;\nendmodule\n'
+    text = VerilogPreprocessor([source], engine='python').preprocess_text()
+    assert(text == '\nmodule a;\n  wire [8-1:0] x;\nendmodule\n')
+
+
+def test_error_column():
+    for lexer_class in (VerilogLexer, FastVerilogLexer):
+        errors = []
+        lexer = lexer_class(error_func=lambda msg, line, column: errors.append((line, column)))
+        lexer.build()
+        lexer.input('\x01 module a;\n  wire \x01 x;\nendmodule\n')
+        while lexer.token():
+            pass
+        assert(errors == [(1, 1), (2, 9)])
+
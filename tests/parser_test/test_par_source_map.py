@@ -0,0 +1,95 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pytest
+from pyverilog.vparser.parser import VerilogCodeParser, ParseError
+from pyverilog.vparser.source import SourceMap
+from pyverilog.dataflow.dataflow_analyzer import VerilogDataflowAnalyzer
+
+top = """\
+module top (CLK, in, out);
+`include "ports.vh"
+  reg [7:0] count;
+  always @(posedge CLK) begin
+    count <= count + in;
+  end
+  assign out = count;
+endmodule
+"""
+
+ports = """\
+  input CLK;
+  input [7:0] in;
+  output [7:0] out;
+"""
+
+
+def write_design(tmpdir, top=top):
+    tmpdir.join('ports.vh').write(ports)
+    filename = tmpdir.join('top.v')
+    filename.write(top)
+    return str(filename), str(tmpdir.join('ports.vh'))
+
+
+def test_source_map():
+    source_map = SourceMap()
+    source_map.add(1, 'a.v', 1)
+    source_map.add(3, 'b.v', 1, (('a.v', 3),))
+    source_map.add(5, 'a.v', 4)
+    source_map.add(6, 'a.v', 5)  # continues the last run
+    assert(len(source_map) == 3)
+    assert(source_map.lookup(0) is None)
+    assert(source_map.lookup(2) == ('a.v', 2, ()))
+    assert(source_map.lookup(4) == ('b.v', 2, (('a.v', 3),)))
+    assert(source_map.lookup(9) == ('a.v', 8, ()))
+
+
+def test_location(tmpdir):
+    filename, header = write_design(tmpdir)
+    codeparser = VerilogCodeParser([filename], preprocess_engine='python')
+    ast = codeparser.parse()
+    module = ast.description.definitions[0]
+    decls = [item for item in module.items if item.__class__.__name__ == 'Decl']
+
+    assert(codeparser.get_location(module) == (filename, 1, ()))
+    assert(codeparser.get_location(decls[1]) == (header, 2, ((filename, 2),)))
+    assert(codeparser.get_location(decls[3]) == (filename, 3, ()))
+    assert(codeparser.get_location(module.items[-1]) == (filename, 7, ()))
+
+
+def test_cached_location(tmpdir):
+    filename, header = write_design(tmpdir)
+    cache_dir = str(tmpdir.join('cache'))
+    VerilogCodeParser([filename], preprocess_engine='python', cache_dir=cache_dir).parse()
+    codeparser = VerilogCodeParser([filename], preprocess_engine='python', cache_dir=cache_dir)
+    ast = codeparser.parse()
+    assert(codeparser.cache.hits == 1)
+    assert(codeparser.get_location(ast.description.definitions[0].items[-1]) ==
+           (filename, 7, ()))
+
+
+def test_error_location(tmpdir):
+    filename, header = write_design(tmpdir, top.replace('  assign', '  wire wire;\n  assign'))
+    with pytest.raises(ParseError) as e:
+        VerilogCodeParser([filename], preprocess_engine='python').parse()
+    assert(e.value.location == (filename, 7, ()))
+    assert(str(e.value) == '%s line:7: before: ";"' % filename)
+
+    tmpdir.join('ports.vh').write(ports + '  wire \x01;\n')
+    with pytest.raises(ParseError) as e:
+        VerilogCodeParser([filename], preprocess_engine='python', jobs=1).parse()
+    assert(str(e.value) == "%s line:4 column:9 (included from %s line:2): Illegal character '\\x01'" %
+           (header, filename))
+
+
+def test_bind_location(tmpdir):
+    filename, header = write_design(tmpdir)
+    analyzer = VerilogDataflowAnalyzer([filename], 'top', preprocess_engine='python')
+    analyzer.generate()
+    binddict = analyzer.getBinddict()
+    locations = {}
+    for name, binds in binddict.items():
+        locations[str(name)] = [analyzer.get_location(bind) for bind in binds]
+    assert(locations['top.count'] == [(filename, 5, ())])
+    assert(locations['top.out'] == [(filename, 7, ())])
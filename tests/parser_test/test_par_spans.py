@@ -0,0 +1,133 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import pickle
+import pytest
+import pyverilog.vparser.ast as vast
+from pyverilog.vparser.parser import VerilogParser, parse
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+
+def text_of(node):
+    return bytes(node.source_text()).decode('utf-8')
+
+
+def test_spans():
+    with open(codedir + 'led.v') as f:
+        text = f.read()
+    ast = VerilogParser(spans=True).parse(text)
+    module = ast.description.definitions[0]
+
+    assert(text_of(module).startswith('module led'))
+    assert(text_of(module).endswith('endmodule'))
+    always = module.items[-1]
+    assert(isinstance(always, vast.Always))
+    assert(text_of(always).startswith('always @(posedge CLK) begin'))
+    assert(text.encode('utf-8')[always.span.start:always.span.end] == always.source_text())
+
+    # every node but the ones without a text has a span within the span
+    # of its parent
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        for child in node.children():
+            if child.span is None:
+                assert(isinstance(child, vast.Paramlist) and not child.params)
+                continue
+            assert(node.span.start <= child.span.start <= child.span.end <= node.span.end)
+            stack.append(child)
+
+    # a memoryview of the same buffer, not a copy
+    assert(module.source_text().obj is always.source_text().obj)
+
+
+def test_expressions():
+    text = ("module m(input [3:0] a, output y);\n"
+            "  assign y = (a[1] &  a[2]) | ~a[0];\n"
+            "endmodule\n")
+    ast = VerilogParser(spans=True).parse(text)
+    assign = ast.description.definitions[0].items[0]
+    assert(text_of(assign) == 'assign y = (a[1] &  a[2]) | ~a[0];')
+    assert(text_of(assign.right.var) == '(a[1] &  a[2]) | ~a[0]')
+    assert(text_of(assign.right.var.left) == 'a[1] &  a[2]')
+    assert(text_of(assign.right.var.right.right) == 'a[0]')
+    assert(text_of(assign.left.var) == 'y')
+
+
+def test_tokenless():
+    text = ("module m(input a);\n"
+            "  reg [3:0] r;\n"
+            "  integer i;\n"
+            "endmodule\n")
+    ast = VerilogParser(spans=True).parse(text)
+    module = ast.description.definitions[0]
+    # no parameter list in the text
+    assert(module.paramlist.span is None)
+    assert(module.paramlist.source_text() is None)
+
+    # a node built by a declaration spans its width and its name
+    reg = module.items[0].list[0]
+    assert(text_of(reg) == '[3:0] r')
+    assert(text_of(reg.width) == '[3:0]')
+
+    # the implicit width of an integer has no text
+    integer = module.items[1].list[0]
+    assert(text_of(integer) == 'i')
+    assert(integer.width.span is None)
+
+
+def test_location(tmpdir):
+    tmpdir.join('body.vh').write("  assign y = a;\n")
+    top = tmpdir.join('top.v')
+    top.write("module top(input a, output y);\n"
+              "`include \"body.vh\"\n"
+              "  assign z = a;\n"
+              "endmodule\n")
+    ast, _ = parse([str(top)], preprocess_include=[str(tmpdir)], preprocess_engine='python',
+                   spans=True)
+    module = ast.description.definitions[0]
+    assign, other = module.items
+
+    # spans are mapped to the original files through the source map
+    assert(assign.span.location() ==
+           (str(tmpdir.join('body.vh')), 1, 3, ((str(top), 2),)))
+    assert(other.span.location() == (str(top), 3, 3, ()))
+    assert(module.span.end_location()[:3] == (str(top), 4, 10))
+
+    # without a source map, the location is in the parsed text
+    ast = VerilogParser(spans=True).parse("module m;\n  wire w;\nendmodule\n")
+    wire = ast.description.definitions[0].items[0]
+    assert(wire.span.location() == ('', 2, 3, ()))
+
+
+def test_unicode():
+    text = ("// été\n"
+            "module m;\n"
+            "  wire \\é ;\n"
+            "  assign \\é  = 1'b1;\n"
+            "endmodule\n")
+    ast = VerilogParser(spans=True).parse(text)
+    module = ast.description.definitions[0]
+    assert(text_of(module).startswith('module m;'))
+    assert(text_of(module.items[1]) == "assign \\é  = 1'b1;")
+
+
+def test_default():
+    ast, _ = parse([codedir + 'led.v'], preprocess_define=['STEP=100'])
+    assert(ast.description.definitions[0].source_text() is None)
+
+    ast, _ = parse([codedir + 'led.v'], preprocess_define=['STEP=100'], spans=True)
+    module = ast.description.definitions[0]
+    assert(text_of(module).startswith('module led'))
+    # the spans are not pickled
+    assert(pickle.loads(pickle.dumps(module)).source_text() is None)
+
+
+def test_intern():
+    # a shared node would have the span of one of its occurrences
+    with pytest.raises(ValueError):
+        VerilogParser(spans=True, intern=True)
+    with pytest.raises(ValueError):
+        parse([codedir + 'led.v'], preprocess_define=['STEP=100'], spans=True, intern=True)
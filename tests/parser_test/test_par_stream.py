@@ -0,0 +1,113 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+from pyverilog.vparser.parser import parse
+from pyverilog.vparser.stream import iter_modules, split_modules
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
+from pyverilog.dataflow.modulevisitor import ModuleVisitor
+from pyverilog.ast_code_generator.codegen import ASTCodeGenerator
+
+try:
+    from StringIO import StringIO
+except:
+    from io import StringIO
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+source = """\
+`timescale 1ns / 1ps
+module a(input x, output y); // endmodule in a comment
+  assign y = x;
+endmodule
+/* endmodule
+   in a block comment */
+`default_nettype none
+module b(input wire x, output wire y);
+  initial $display("endmodule");
+  assign y = ~x;
+endmodule module c; endmodule
+(* keep *)
+module d; endmodule
+// trailing comment
+`resetall
+"""
+
+
+def show(node):
+    output = StringIO()
+    node.show(buf=output)
+    return output.getvalue()
+
+
+def test_split():
+    chunks = list(split_modules(StringIO(source)))
+    assert([(lineno, significant) for lineno, _, significant in chunks] ==
+           [(1, True), (4, True), (11, True), (11, True), (13, False)])
+    assert(''.join(text for _, text, _ in chunks) == source)
+
+
+def test_stream():
+    ast, directives = parse([source])
+    stream = iter_modules([source])
+    definitions = list(stream)
+
+    assert([show(d) for d in definitions] == [show(d) for d in ast.description.definitions])
+    assert([d.default_nettype for d in definitions[:2]] == ['wire', 'none'])
+    assert(stream.get_directives() == directives)
+
+
+def test_stream_visitors():
+    filelist = [codedir + 'led_main.v']
+    include = [codedir]
+    define = ['STEP=100']
+    ast, directives = parse(filelist, preprocess_include=include, preprocess_define=define)
+
+    module_visitor = ModuleVisitor()
+    module_visitor.visit_stream(iter_modules(filelist, preprocess_include=include,
+                                             preprocess_define=define))
+    assert(list(module_visitor.get_modulenames()) == ['led', 'main'])
+
+    codegen = ASTCodeGenerator()
+    stream = iter_modules(filelist, preprocess_include=include, preprocess_define=define)
+    rslt = ''.join(codegen.visit_stream(stream))
+    assert(rslt == codegen.visit(ast))
+
+
+def test_no_preprocess():
+    filelist = [codedir + 'led.v', codedir + 'count.v']
+    ast, directives = parse(filelist)
+    definitions = list(iter_modules(filelist, preprocess=False))
+    assert([show(d) for d in definitions] == [show(d) for d in ast.description.definitions])
+
+
+def test_auto_preprocess():
+    # directive-free sources are not preprocessed: no engine is needed
+    filelist = [codedir + 'led.v', codedir + 'count.v']
+    definitions = list(iter_modules(filelist, preprocess_engine='unknown'))
+    assert([d.name for d in definitions] == ['led', 'TOP'])
+
+    try:
+        iter_modules([source], preprocess_engine='unknown')
+    except ValueError:
+        pass
+    else:
+        assert False, 'a source with directives must be preprocessed'
+
+
+def test_preprocess_lines():
+    filelist = [codedir + 'led_main.v']
+    pre = VerilogPreprocessor(filelist, include=[codedir], define=['STEP=100'],
+                              engine='python')
+    lines = list(pre.preprocess_lines())
+    assert(all(line.endswith('\n') for line in lines[:-1]))
+    assert(''.join(lines) == pre.preprocess_text())
+
+
+if __name__ == '__main__':
+    test_split()
+    test_stream()
+    test_stream_visitors()
+    test_no_preprocess()
+    test_auto_preprocess()
+    test_preprocess_lines()
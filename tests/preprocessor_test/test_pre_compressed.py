@@ -0,0 +1,74 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import gzip
+import lzma
+import bz2
+import pytest
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
+from pyverilog.vparser.parser import parse
+from pyverilog.vparser.stream import iter_modules
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+top = """\
+`include "cells.vh"
+module top (a, y);
+  input a;
+  output y;
+  INV u0 (.A(a), .Y(y));
+endmodule
+"""
+
+cells = """\
+module INV (A, Y);
+  input A;
+  output Y;
+  assign Y = ~A;
+endmodule
+"""
+
+
+def write(path, text, module=None):
+    if module is None:
+        with open(str(path), 'w') as f:
+            f.write(text)
+    else:
+        with module.open(str(path), 'wt') as f:
+            f.write(text)
+    return str(path)
+
+
+def test_compressed_sources(tmpdir):
+    text = open(codedir + 'led.v').read()
+    expected = VerilogPreprocessor([codedir + 'led.v'], engine='python').preprocess_text()
+    for suffix, module in (('.gz', gzip), ('.xz', lzma), ('.bz2', bz2)):
+        filename = write(tmpdir.join('led.v' + suffix), text, module)
+        pre = VerilogPreprocessor([filename], engine='python')
+        assert(pre.preprocess_text() == expected)
+
+        ast, directives = parse([filename], preprocess_engine='python')
+        assert(ast.description.definitions[0].name == 'led')
+
+
+def test_compressed_include(tmpdir):
+    write(tmpdir.join('cells.vh.gz'), cells, gzip)
+    filename = write(tmpdir.join('top.v.xz'), top, lzma)
+    ast, directives = parse([filename], preprocess_engine='python')
+    assert([d.name for d in ast.description.definitions] == ['INV', 'top'])
+
+
+def test_stream(tmpdir):
+    filename = write(tmpdir.join('cells.v.gz'), cells * 3, gzip)
+    names = [d.name for d in iter_modules([filename], preprocess=False)]
+    assert(names == ['INV'] * 3)
+
+
+def test_engine(tmpdir, monkeypatch):
+    monkeypatch.delenv('PYVERILOG_PREPROCESSOR', raising=False)
+    filename = write(tmpdir.join('cells.v.gz'), cells, gzip)
+    assert(VerilogPreprocessor([filename]).engine == 'python')
+
+    with pytest.raises(ValueError):
+        VerilogPreprocessor([filename], engine='iverilog')
@@ -0,0 +1,95 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+from pyverilog.vparser.preprocessor import VerilogPreprocessor, preprocess, PreprocessError
+
+codedir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '/verilogcode/'
+
+header = """\
+`define W 8
+`define ADD(a, b=1) ((a) + (b))
+`define MSG(x) `"x:x`" // comment
+`define CAT(p, q) p``q
+"""
+
+source = """\
+`ifdef W
+module top(input [`W-1:0] in, output [`W-1:0] out); // `ifdef in comment
+  /* `undef W */
+`ifndef NOPE
+  assign out = `ADD(in, 2) + `ADD(in);
+`elsif W
+  assign out = 0;
+`else
+  assign out = 1;
+`endif
+  wire `CAT(foo, bar);
+  initial $display(`MSG(hi), "`W");
+`undef W
+`ifdef W
+  wire bad;
+`endif
+endmodule
+`endif
+"""
+
+expected = """\
+
+
+
+
+
+module top(input [8-1:0] in, output [8-1:0] out); // `ifdef in comment
+  /* `undef W */
+
+  assign out = ((in) + (2)) + ((in) + (1));
+
+
+
+
+
+  wire foobar;
+  initial $display("hi:hi", "`W");
+
+
+
+
+endmodule
+
+"""
+
+
+def test_macros():
+    rslt = preprocess([header, source], engine='python')
+    print(rslt)
+    assert(expected == rslt)
+
+
+def test_led_main():
+    filelist = [codedir + 'led_main.v']
+    include = [codedir]
+    define = ['STEP=100']
+
+    pre = VerilogPreprocessor(filelist, include=include, define=define, engine='python')
+    rslt = pre.preprocess_text()
+
+    led = open(codedir + 'led.v').read()
+    main = open(codedir + 'led_main.v').read()
+    main = main.replace('`include "led.v"\n', led).replace('`STEP', '100')
+
+    assert(main == rslt)
+
+
+def test_undefined_macro():
+    try:
+        preprocess(['module top;\n  wire [`W:0] a;\nendmodule\n'], engine='python')
+    except PreprocessError as e:
+        assert('line:2' in str(e))
+        return
+    assert(False)
+
+
+if __name__ == '__main__':
+    test_macros()
+    test_led_main()